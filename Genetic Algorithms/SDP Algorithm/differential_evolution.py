@@ -0,0 +1,128 @@
+import numpy as np
+
+from charles import Individual
+from fitness import batch_fitness
+
+# Differential evolution over real-valued quantities (0..200 units of each food).
+# Same interface as charles.Population, but the population is one (size x foods) matrix
+# and every generation is a handful of whole-matrix operations plus one batched evaluation.
+
+
+# indices drawn per individual by each strategy; the population needs at least one more individual
+STRATEGY_INDICES = {"rand/1/bin": 3, "current-to-best/1": 2}
+
+
+def check_size(size, strategy):
+    if strategy not in STRATEGY_INDICES:
+        raise ValueError(f"Unknown strategy {strategy}")
+    if size < STRATEGY_INDICES[strategy] + 1:
+        raise ValueError(f"{strategy} needs a population of at least {STRATEGY_INDICES[strategy] + 1}, got {size}")
+
+
+def distinct_indices(rng, size, k):
+    '''For every row i, k indices in range(size) that are distinct and different from i'''
+    if size < k + 1:
+        raise ValueError(f"Cannot draw {k} distinct indices other than i from a population of {size}")
+    rows = np.arange(size)[:, None]
+    indices = rng.integers(0, size - 1, (size, k))
+    indices += indices >= rows  # skip i itself
+    for j in range(1, k):
+        # redraw the ones that collide with an earlier column
+        while True:
+            clash = (indices[:, j:j + 1] == indices[:, :j]).any(axis=1)
+            if not clash.any():
+                break
+            redraw = rng.integers(0, size - 1, clash.sum())
+            indices[clash, j] = redraw + (redraw >= rows[clash, 0])
+    return indices
+
+
+class DEPopulation:
+    def __init__(self, size, optim, sol_size=58, low=0, high=200, initial=None,
+                 fitness=batch_fitness, seed=None, **kwargs):
+        # no strategy works with fewer individuals than the smallest one needs
+        check_size(size, min(STRATEGY_INDICES, key=STRATEGY_INDICES.get))
+        self.size = size
+        self.optim = optim
+        self.low = low
+        self.high = high
+        self.fitness_function = fitness
+        self.rng = np.random.default_rng(seed)
+        if initial is None:
+            # same distribution as sdp_run.random_initialization
+            initial = self.rng.integers(low, high + 1, (size, sol_size))
+        self.vectors = np.array(initial, dtype=float)
+        self.fitness = self.fitness_function(self.vectors)
+
+    def bound(self, trial, parents):
+        '''Values outside [low, high] go halfway between the parent and the violated bound'''
+        below = trial < self.low
+        above = trial > self.high
+        trial[below] = (parents[below] + self.low) / 2
+        trial[above] = (parents[above] + self.high) / 2
+        return trial
+
+    def mutants(self, strategy, F):
+        x = self.vectors
+        if strategy == "rand/1/bin":
+            r = distinct_indices(self.rng, self.size, 3)
+            return x[r[:, 0]] + F * (x[r[:, 1]] - x[r[:, 2]])
+        if strategy == "current-to-best/1":
+            r = distinct_indices(self.rng, self.size, 2)
+            best = x[np.argmin(self.fitness)]
+            return x + F * (best - x) + F * (x[r[:, 0]] - x[r[:, 1]])
+        raise ValueError(f"Unknown strategy {strategy}")
+
+    def evolve(self, pop, generations, no_improvement_threshold, plot, strategy="rand/1/bin",
+               F=0.5, CR=0.9, target=None, **kwargs):
+        check_size(self.size, strategy)
+        fitness_history = []
+        generations_without_improvement = 0
+        previous_best_fitness = float("inf")
+
+        for _ in range(generations):
+            current_best_fitness = float(self.fitness.min())
+            fitness_history.append(current_best_fitness)
+
+            # Check for improvements
+            if current_best_fitness < previous_best_fitness:
+                generations_without_improvement = 0
+                previous_best_fitness = current_best_fitness
+            else:
+                generations_without_improvement += 1
+
+            # Stopping criterion
+            if generations_without_improvement >= no_improvement_threshold:
+                break
+            if target is not None and current_best_fitness <= target:
+                break
+
+            # Binomial crossover, with at least one gene taken from the mutant
+            mutant = self.mutants(strategy, F)
+            cross = self.rng.random(self.vectors.shape) < CR
+            cross[np.arange(self.size), self.rng.integers(0, self.vectors.shape[1], self.size)] = True
+            trial = self.bound(np.where(cross, mutant, self.vectors), self.vectors)
+
+            # One to one survivor selection
+            trial_fitness = self.fitness_function(trial)
+            improved = trial_fitness <= self.fitness
+            self.vectors[improved] = trial[improved]
+            self.fitness[improved] = trial_fitness[improved]
+
+        # Get the best solution and its fitness
+        best = int(np.argmin(self.fitness))
+        best_solution = Individual(representation=self.vectors[best].tolist(), fitness=float(self.fitness[best]))
+
+        if plot is not None:
+            from utils import print_nutrition
+            plot(fitness_history)
+            print(best_solution)
+            print_nutrition(best_solution)
+
+        return best_solution, fitness_history
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, position):
+        return Individual(representation=self.vectors[position].tolist(), fitness=float(self.fitness[position]))
@@ -0,0 +1,118 @@
+import os
+import sqlite3
+from time import time
+
+import numpy as np
+
+from problem import Problem
+
+# Hall of fame: the best diets found across runs, kept in SQLite next to the results.
+# Bounded to `capacity` diets and deduplicated on the genome. Every entry keeps its fitness
+# components, and seeds are re-scored with the current tables before they are handed out,
+# so a run on slightly changed data still starts from the diets that are best now.
+# Components and ranking come from the individual's problem, so meal plans are archived with
+# their own fitness next to single-day diets, and seeds hands out only genomes of the asked size.
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS hall_of_fame (
+    genome BLOB PRIMARY KEY,
+    fitness REAL NOT NULL,
+    total_cost REAL,
+    requirements_met INTEGER,
+    num_ingredients INTEGER,
+    nutritional_values BLOB,
+    deficit BLOB,
+    excess BLOB,
+    source TEXT,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS hall_of_fame_fitness ON hall_of_fame (fitness);
+'''
+
+
+def pack(values):
+    return np.asarray(values, dtype=np.float64).tobytes()
+
+
+def unpack(blob):
+    return np.frombuffer(blob, dtype=np.float64)
+
+
+class HallOfFame:
+    def __init__(self, path='hall_of_fame.db', capacity=100, timeout=60, problem=None):
+        '''problem: used for individuals without one and by seeds by default (the single-day diet)'''
+        self.path = path
+        self.capacity = capacity
+        self.timeout = timeout
+        self.problem = Problem() if problem is None else problem
+        self._connection = None
+        self._pid = None
+
+    def connection(self):
+        # one connection per process, as in results_store.ResultsStore
+        if self._connection is None or self._pid != os.getpid():
+            self._connection = sqlite3.connect(self.path, timeout=self.timeout)
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.executescript(SCHEMA)
+            self._pid = os.getpid()
+        return self._connection
+
+    def __getstate__(self):
+        return {'path': self.path, 'capacity': self.capacity, 'timeout': self.timeout, 'problem': self.problem}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def add(self, individuals, source=None):
+        '''Adds individuals (or one), then drops everything beyond the best `capacity` diets.
+        The fitness stored is the archive_fitness of the individual's problem (for the single-day
+        diet the default one of fitness.batch_fitness, whatever penalties the run used)'''
+        if not isinstance(individuals, (list, tuple)):
+            individuals = [individuals]
+        rows = []
+        for individual in individuals:
+            problem = getattr(individual, 'problem', None) or self.problem
+            individual = problem.components(individual)
+            genome = np.asarray(individual.representation, dtype=np.float64)
+            rows.append((genome.tobytes(), float(problem.archive_fitness(genome[None, :])[0]), individual.total_cost,
+                         individual.requirements_met, individual.num_ingredients,
+                         pack(individual.nutritional_values), pack(individual.deficit), pack(individual.excess),
+                         source, time()))
+        with self.connection() as conn:
+            # a diet already in the archive keeps its first entry
+            conn.executemany('INSERT OR IGNORE INTO hall_of_fame VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+            conn.execute('DELETE FROM hall_of_fame WHERE genome NOT IN '
+                         '(SELECT genome FROM hall_of_fame ORDER BY fitness LIMIT ?)', (self.capacity,))
+
+    def entries(self):
+        '''Archived diets, best first, as dicts with the genome and its fitness components'''
+        rows = self.connection().execute(
+            'SELECT genome, fitness, total_cost, requirements_met, num_ingredients, nutritional_values, '
+            'deficit, excess, source, created FROM hall_of_fame ORDER BY fitness').fetchall()
+        return [{'representation': unpack(genome), 'fitness': fitness, 'total_cost': total_cost,
+                 'requirements_met': requirements_met, 'num_ingredients': num_ingredients,
+                 'nutritional_values': unpack(values), 'deficit': unpack(deficit), 'excess': unpack(excess),
+                 'source': source, 'created': created}
+                for genome, fitness, total_cost, requirements_met, num_ingredients, values, deficit, excess,
+                source, created in rows]
+
+    def seeds(self, n, problem=None):
+        '''Representations of the n best archived genomes of a problem (self.problem by default),
+        ranked by its archive_fitness under the current tables. Genomes of another size (diets archived
+        for a different number of foods, meal plans of other lengths) are skipped: the archive does not
+        keep the food names to remap them (warm_start.rescore does, from the previous tables)'''
+        if n <= 0:
+            return []
+        problem = self.problem if problem is None else problem
+        genomes = [unpack(genome) for genome, in self.connection().execute('SELECT genome FROM hall_of_fame')]
+        genomes = [genome for genome in genomes if len(genome) == problem.genome_size]
+        if not genomes:
+            return []
+        genomes = np.array(genomes)
+        best = np.argsort(problem.archive_fitness(genomes), kind='stable')[:n]
+        # back to the genome type of sdp_run.random_initialization when the values are whole
+        return [genome.astype(int).tolist() if np.all(genome == np.round(genome)) else genome.tolist()
+                for genome in genomes[best]]
+
+    def __len__(self):
+        return self.connection().execute('SELECT COUNT(*) FROM hall_of_fame').fetchone()[0]
@@ -0,0 +1,89 @@
+import numpy as np
+
+from fitness import prices, nutrients, min_values
+
+# Population-level initializers: each call returns the whole initial population as one
+# (size x foods) integer matrix, for Population(initial=...), DEPopulation(initial=...)
+# or NSGA2Population(initial=...). The samplers spread the population over the 0..200 box
+# jointly, instead of drawing every individual on its own like sdp_run's initializers.
+
+try:
+    from scipy.stats import qmc
+    HAVE_SCIPY = True
+except ImportError:
+    HAVE_SCIPY = False
+
+PRIMES = np.array([2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47, 53, 59, 61, 67, 71, 73, 79, 83, 89, 97,
+                   101, 103, 107, 109, 113, 127, 131, 137, 139, 149, 151, 157, 163, 167, 173, 179, 181, 191, 193,
+                   197, 199, 211, 223, 227, 229, 233, 239, 241, 251, 257, 263, 269, 271])
+
+
+def to_quantities(unit, low=0, high=200):
+    '''Points of the unit cube to whole quantities in low..high, every value equally likely'''
+    return np.minimum(low + np.floor(unit * (high - low + 1)), high).astype(int)
+
+
+def lhs(size, sol_size=58, low=0, high=200, seed=None):
+    '''Latin hypercube across the population: for every food, each of `size` equal strata
+    of low..high holds exactly one individual'''
+    rng = np.random.default_rng(seed)
+    strata = np.argsort(rng.random((size, sol_size)), axis=0)  # one permutation per food
+    return to_quantities((strata + rng.random((size, sol_size))) / size, low, high)
+
+
+def halton(size, sol_size=58, low=0, high=200, seed=None):
+    '''Scrambled Halton sequence: radical inverse in the i-th prime base for food i, each digit
+    passed through a random permutation of the base (fixed per food and digit position)'''
+    if sol_size > len(PRIMES):
+        raise ValueError(f"halton supports up to {len(PRIMES)} foods")
+    rng = np.random.default_rng(seed)
+    bases = PRIMES[:sol_size]
+    index = np.arange(1, size + 1)[:, None] + rng.integers(0, size, sol_size)  # random start per food
+    unit = np.zeros((size, sol_size))
+    scale = np.ones(sol_size)
+    # enough digits to resolve a 1 / (high - low + 1) grid in the smallest base
+    for _ in range(int(np.ceil(np.log(max(size, high - low + 1)) / np.log(2))) + 1):
+        table = np.zeros((sol_size, bases.max()), dtype=int)
+        for food, base in enumerate(bases):
+            table[food, :base] = rng.permutation(base)
+        scale = scale / bases
+        unit += table[np.arange(sol_size), index % bases] * scale
+        index = index // bases
+    return to_quantities(unit, low, high)
+
+
+def sobol(size, sol_size=58, low=0, high=200, seed=None):
+    '''Owen-scrambled Sobol points (needs scipy). Balance is best with a power of two size'''
+    if not HAVE_SCIPY:
+        raise ImportError("sobol initialization needs scipy; use lhs or halton instead")
+    sampler = qmc.Sobol(d=sol_size, scramble=True, seed=seed)
+    return to_quantities(sampler.random(size), low, high)
+
+
+def feasibility_biased(size, sol_size=58, low=0, high=200, passes=10, seed=None):
+    """Randomized greedy diets built from the nutrient matrix: starting from low, the nutrients are
+    visited in random order and, for every individual still below a minimum, one food is drawn with
+    probability proportional to that nutrient per unit of price and topped up to cover the deficit
+    (up to high). A pass over all nutrients is repeated until every minimum is met or `passes` is spent
+    """
+    rng = np.random.default_rng(seed)
+    food_nutrients = nutrients[:sol_size]
+    value = food_nutrients / prices[:sol_size, None]  # foods x nutrients
+    quantities = np.full((size, sol_size), float(low))
+    rows = np.arange(size)
+
+    for _ in range(passes):
+        if np.all(quantities @ food_nutrients >= min_values):
+            break
+        for nutrient in rng.permutation(len(min_values)):
+            deficit = min_values[nutrient] - quantities @ food_nutrients[:, nutrient]
+            # roulette over the foods with room left, one spin per individual
+            weights = np.where(quantities < high, value[:, nutrient], 0).cumsum(axis=1)
+            spin = rng.random(size) * weights[:, -1]
+            food = np.minimum((weights < spin[:, None]).sum(axis=1), sol_size - 1)
+            amount = np.ceil(np.maximum(deficit, 0) / np.maximum(food_nutrients[food, nutrient], 1e-12))
+            quantities[rows, food] = np.minimum(quantities[rows, food] + amount, high)
+    return quantities.astype(int)
+
+
+initializers = {'lhs': lhs, 'halton': halton, 'sobol': sobol, 'feasibility_biased': feasibility_biased}
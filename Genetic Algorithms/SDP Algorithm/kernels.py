@@ -0,0 +1,114 @@
+import numpy as np
+
+from fitness import prices, nutrients, min_values, max_values, nutrient_range
+
+# Optional compiled kernels for the fitness function and the main operators.
+# With numba installed they are compiled once and cached on disk (cache=True, next to
+# this file in __pycache__ or in NUMBA_CACHE_DIR), so worker processes load the machine
+# code instead of compiling it again. Without numba every name below falls back to the
+# pure Python / NumPy version with the same signature.
+
+try:
+    from numba import njit, prange
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+
+if HAVE_NUMBA:
+    @njit(parallel=True, cache=True)
+    def fitness_kernel(population, prices, nutrients, min_values, max_values, nutrient_range,
+                       under_penalty, over_penalty):
+        size, n_foods = population.shape
+        n_nutrients = nutrients.shape[1]
+        result = np.empty(size)
+        for p in prange(size):
+            total_cost = 0.0
+            values = np.zeros(n_nutrients)
+            for f in range(n_foods):
+                quantity = population[p, f]
+                if quantity != 0:
+                    total_cost += quantity * prices[f]
+                    for n in range(n_nutrients):
+                        values[n] += quantity * nutrients[f, n]
+            penalty = 0.0
+            for n in range(n_nutrients):
+                if values[n] < min_values[n]:
+                    penalty += (min_values[n] - values[n]) / nutrient_range[n] * under_penalty
+                elif values[n] > max_values[n]:
+                    penalty += (values[n] - max_values[n]) / nutrient_range[n] * over_penalty
+            result[p] = total_cost + penalty
+        return result
+
+    @njit(cache=True)
+    def random_mutation_kernel(genome, elem_mute_rate):
+        for i in range(genome.shape[0]):
+            if np.random.random() < elem_mute_rate:
+                new_value = np.random.randint(0, 51)
+                while new_value == genome[i]:
+                    new_value = np.random.randint(0, 51)
+                genome[i] = new_value
+        return genome
+
+    @njit(cache=True)
+    def uniform_co_kernel(p1, p2):
+        offspring1 = p1.copy()
+        offspring2 = p2.copy()
+        for i in range(p1.shape[0]):
+            if np.random.random() >= 0.5:
+                offspring1[i] = p2[i]
+                offspring2[i] = p1[i]
+        return offspring1, offspring2
+
+    @njit(cache=True)
+    def fps_kernel(fitness_values):
+        spin = np.random.uniform(0, fitness_values.sum())
+        position = 0.0
+        for i in range(fitness_values.shape[0]):
+            position += fitness_values[i]
+            if position > spin:
+                return i
+        return fitness_values.shape[0] - 1
+
+    def batch_fitness(population, under_penalty=500000, over_penalty=5):
+        population = np.ascontiguousarray(population, dtype=np.float64)
+        if population.ndim == 1:
+            return fitness_kernel(population[None, :], prices, nutrients, min_values, max_values,
+                                  nutrient_range, under_penalty, over_penalty)[0]
+        return fitness_kernel(population, prices, nutrients, min_values, max_values,
+                              nutrient_range, under_penalty, over_penalty)
+
+    def get_fitness(self):
+        return float(batch_fitness(self.representation))
+
+    def random_mutation(individual, elem_mute_rate=0.2):
+        return random_mutation_kernel(np.array(individual), elem_mute_rate).tolist()
+
+    def uniform_co(p1, p2):
+        p1, p2 = np.asarray(p1), np.asarray(p2)
+        dtype = np.result_type(p1, p2)
+        offspring1, offspring2 = uniform_co_kernel(p1.astype(dtype), p2.astype(dtype))
+        return offspring1.tolist(), offspring2.tolist()
+
+    def fps(population):
+        '''Fitness Proportional selection Implementation'''
+        return population[fps_kernel(np.array([i.fitness for i in population]))]
+
+else:
+    from fitness import batch_fitness
+    from mutation import random_mutation
+    from crossover import uniform_co
+    from selection import fps
+
+    def get_fitness(self):
+        return float(batch_fitness([self.representation])[0])
+
+
+def warm_up():
+    '''Loads (or compiles) every kernel, e.g. in a worker process initializer'''
+    if HAVE_NUMBA:
+        for genome in ([q for q in range(len(prices))], [float(q) for q in range(len(prices))]):
+            batch_fitness(np.array([genome]))
+            random_mutation(genome)
+            uniform_co(genome, genome)
+        fps_kernel(np.ones(2))
@@ -0,0 +1,192 @@
+import json
+import os
+from time import time
+
+import numpy as np
+
+from charles import Individual
+from fitness import batch_fitness
+
+# Population stored in memory-mapped files, for populations that do not fit in RAM.
+# Quantities use the smallest unsigned dtype that holds 0..high (uint8 for 0..200).
+# Two generations live in two mapped files: offspring are written into the other buffer
+# chunk by chunk, then the buffers swap. Worker processes attach to the same files by
+# directory, so only the directory and index ranges cross process boundaries.
+
+META = 'population.json'
+
+
+def quantity_dtype(high):
+    return np.uint8 if high <= np.iinfo(np.uint8).max else np.uint16
+
+
+class MappedPopulation:
+    def __init__(self, size, optim, directory, sol_size=58, low=0, high=200, chunk_size=65536,
+                 seed=None, fitness=batch_fitness, initial=None, **kwargs):
+        self.size = size
+        self.optim = optim
+        self.directory = directory
+        self.sol_size = sol_size
+        self.low = low
+        self.high = high
+        self.chunk_size = chunk_size
+        self.fitness_function = fitness
+        self.dtype = np.dtype(quantity_dtype(high))
+        self.current = 0
+        self.rng = np.random.default_rng(seed)
+        # tells workers that still hold an older population of the same directory to re-attach
+        self.created = f'{time()}-{os.getpid()}'
+
+        os.makedirs(directory, exist_ok=True)
+        self.save_meta()
+        self.genomes = [self._map(f'genomes_{b}.dat', 'w+', self.dtype, (size, sol_size)) for b in (0, 1)]
+        self.fitness = [self._map(f'fitness_{b}.dat', 'w+', np.float64, (size,)) for b in (0, 1)]
+
+        # random initialization (same distribution as sdp_run.random_initialization), chunk by chunk
+        for start, stop in self.chunks():
+            if initial is None:
+                self.genomes[0][start:stop] = self.rng.integers(low, high + 1, (stop - start, sol_size))
+            else:
+                self.genomes[0][start:stop] = initial[start:stop]
+            self.evaluate(0, start, stop)
+
+    @classmethod
+    def attach(cls, directory, fitness=batch_fitness):
+        '''Opens an existing mapped population (e.g. in a worker process) without copying it.
+        fitness: the fitness function of the population, which is not stored with the files'''
+        with open(os.path.join(directory, META)) as f:
+            meta = json.load(f)
+        pop = cls.__new__(cls)
+        pop.__dict__.update(meta)
+        pop.dtype = np.dtype(meta['dtype'])
+        pop.created = meta.get('created')
+        pop.fitness_function = fitness
+        pop.rng = np.random.default_rng()
+        pop.genomes = [pop._map(f'genomes_{b}.dat', 'r+', pop.dtype, (pop.size, pop.sol_size)) for b in (0, 1)]
+        pop.fitness = [pop._map(f'fitness_{b}.dat', 'r+', np.float64, (pop.size,)) for b in (0, 1)]
+        return pop
+
+    def _map(self, name, mode, dtype, shape):
+        return np.memmap(os.path.join(self.directory, name), mode=mode, dtype=dtype, shape=shape)
+
+    def save_meta(self):
+        meta = {'size': self.size, 'optim': self.optim, 'directory': self.directory, 'sol_size': self.sol_size,
+                'low': self.low, 'high': self.high, 'chunk_size': self.chunk_size,
+                'dtype': self.dtype.name, 'current': self.current, 'created': self.created}
+        with open(os.path.join(self.directory, META), 'w') as f:
+            json.dump(meta, f)
+
+    def chunks(self, start=0):
+        for chunk_start in range(start, self.size, self.chunk_size):
+            yield chunk_start, min(chunk_start + self.chunk_size, self.size)
+
+    def evaluate(self, buffer, start, stop):
+        self.fitness[buffer][start:stop] = self.fitness_function(self.genomes[buffer][start:stop].astype(float))
+
+    def breed(self, start, stop, tournament_size=2, mutation_rate=0.5, elem_mute_rate=0.2, rng=None):
+        '''Writes offspring start:stop of the next generation and evaluates them.
+        Tournament selection, uniform crossover and random mutation (new values 0..50, as
+        mutation.random_mutation), vectorized over the chunk'''
+        rng = self.rng if rng is None else rng
+        parents, fitness = self.genomes[self.current], self.fitness[self.current]
+        n = stop - start
+
+        def tournament():
+            contestants = rng.integers(0, self.size, (n, tournament_size))
+            return contestants[np.arange(n), np.argmin(fitness[contestants], axis=1)]
+
+        # the first parents in index order for sequential reads of the mapped file; their mates
+        # follow the same permutation, so the pairs stay as random as the tournaments drew them
+        first, second = tournament(), tournament()
+        order = np.argsort(first, kind='stable')
+        first, second = parents[first[order]], parents[second[order]]
+        offspring = np.where(rng.random((n, self.sol_size)) < 0.5, first, second)
+
+        mutated = (rng.random(n) < mutation_rate)[:, None] & (rng.random((n, self.sol_size)) < elem_mute_rate)
+        offspring[mutated] = rng.integers(0, 51, mutated.sum())
+
+        target = 1 - self.current
+        self.genomes[target][start:stop] = offspring
+        self.evaluate(target, start, stop)
+
+    def evolve(self, pop, generations, no_improvement_threshold, plot, tournament_size=2, mutation_rate=0.5,
+               elem_mute_rate=0.2, elite_size=2, pool=None, **kwargs):
+        '''pool: optional multiprocessing pool; its workers attach to the mapped files and breed chunks'''
+        fitness_history = []
+        generations_without_improvement = 0
+        previous_best_fitness = float("inf")
+
+        for generation in range(generations):
+            current_fitness = self.fitness[self.current]
+            current_best_fitness = float(current_fitness.min())
+            fitness_history.append(current_best_fitness)
+
+            # Check for improvements
+            if current_best_fitness < previous_best_fitness:
+                generations_without_improvement = 0
+                previous_best_fitness = current_best_fitness
+            else:
+                generations_without_improvement += 1
+
+            # Stopping criterion
+            if generations_without_improvement >= no_improvement_threshold:
+                break
+
+            # Elitism: the best individuals go first in the other buffer
+            target = 1 - self.current
+            elite = np.argpartition(current_fitness, elite_size)[:elite_size] if elite_size else []
+            self.genomes[target][:elite_size] = self.genomes[self.current][elite]
+            self.fitness[target][:elite_size] = current_fitness[elite]
+
+            params = {'tournament_size': tournament_size, 'mutation_rate': mutation_rate,
+                      'elem_mute_rate': elem_mute_rate}
+            chunks = list(self.chunks(elite_size))
+            if pool is None:
+                for start, stop in chunks:
+                    self.breed(start, stop, **params)
+            else:
+                self.flush()
+                seeds = self.rng.integers(0, 2 ** 63, len(chunks))
+                pool.starmap(breed_chunk, [(self.directory, self.created, self.fitness_function, self.current,
+                                            start, stop, int(s), params)
+                                           for (start, stop), s in zip(chunks, seeds)])
+
+            # Swap the buffers
+            self.current = target
+            self.save_meta()
+
+        best_solution = self[int(np.argmin(self.fitness[self.current]))]
+        if plot is not None:
+            from utils import print_nutrition
+            plot(fitness_history)
+            print(best_solution)
+            print_nutrition(best_solution)
+
+        return best_solution, fitness_history
+
+    def flush(self):
+        for mapped in self.genomes + self.fitness:
+            mapped.flush()
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, position):
+        return Individual(representation=self.genomes[self.current][position].tolist(),
+                          fitness=float(self.fitness[self.current][position]))
+
+
+attached = {}
+
+
+def breed_chunk(directory, created, fitness, current, start, stop, seed, params):
+    '''Pool task: breeds offspring start:stop from the mapped population in directory and scores
+    them with fitness. A worker attaches once per population: a new population in the same
+    directory has another created stamp'''
+    pop = attached.get(directory)
+    if pop is None or pop.created != created:
+        pop = attached[directory] = MappedPopulation.attach(directory, fitness)
+    pop.fitness_function = fitness
+    pop.current = current
+    pop.breed(start, stop, rng=np.random.default_rng(seed), **params)
+    pop.flush()
@@ -0,0 +1,167 @@
+from copy import copy
+from time import perf_counter
+
+import numpy as np
+
+try:
+    from scipy.spatial import cKDTree
+    HAVE_SCIPY = True
+except ImportError:
+    HAVE_SCIPY = False
+
+# Niching for Population.evolve(niching=...): clearing or fitness sharing, so the population keeps
+# several structurally different cheap diets instead of converging on copies of one.
+# Both need the neighbours of an individual within `radius` (L1 distance between genomes,
+# as in charles.mean_l1_distance). A spatial index is built once per generation:
+#   "kdtree" - scipy's KD-tree, exact, good up to ~20 dimensions
+#   "lsh"    - random projection LSH for L1 (Cauchy projections), for high dimensions such as 58 foods
+#   "brute"  - one distance vector per query, O(P) each
+# so a query costs about the number of real neighbours instead of P.
+
+
+class BruteIndex:
+    def __init__(self, points, radius, **kwargs):
+        self.points = points
+        self.radius = radius
+
+    def query(self, i):
+        distances = np.abs(self.points - self.points[i]).sum(axis=1)
+        neighbours = np.flatnonzero(distances <= self.radius)
+        return neighbours, distances[neighbours]
+
+
+class KDTreeIndex(BruteIndex):
+    def __init__(self, points, radius, **kwargs):
+        super().__init__(points, radius)
+        self.tree = cKDTree(points)
+
+    def query(self, i):
+        neighbours = np.array(self.tree.query_ball_point(self.points[i], self.radius, p=1), dtype=int)
+        return neighbours, np.abs(self.points[neighbours] - self.points[i]).sum(axis=1)
+
+
+class LSHIndex(BruteIndex):
+    '''p-stable LSH for L1: each of `tables` hash tables cuts `projections` Cauchy random projections
+    into buckets of width bucket_width * radius. Points within radius share a bucket in at least one
+    table with high probability; candidates are checked with the exact distance'''
+
+    def __init__(self, points, radius, tables=16, projections=3, bucket_width=4, seed=None, **kwargs):
+        super().__init__(points, radius)
+        rng = np.random.default_rng(seed)
+        width = bucket_width * max(radius, 1e-12)
+        directions = rng.standard_cauchy((points.shape[1], tables * projections))
+        offsets = rng.uniform(0, width, tables * projections)
+        cells = np.floor((points @ directions + offsets) / width).astype(np.int64).reshape(len(points), tables, projections)
+        # one integer key per point and table
+        keys = (cells * rng.integers(1, 2 ** 31, projections)).sum(axis=2)
+
+        self.order, self.start, self.stop, self.group = [], [], [], []
+        for table in range(tables):
+            order = np.argsort(keys[:, table], kind='stable')
+            sorted_keys = keys[order, table]
+            boundaries = np.flatnonzero(np.diff(sorted_keys)) + 1
+            group_of_sorted = np.zeros(len(points), dtype=int)
+            group_of_sorted[boundaries] = 1
+            group_of_sorted = np.cumsum(group_of_sorted)
+            group = np.empty(len(points), dtype=int)
+            group[order] = group_of_sorted
+            self.order.append(order)
+            self.start.append(np.concatenate([[0], boundaries]))
+            self.stop.append(np.concatenate([boundaries, [len(points)]]))
+            self.group.append(group)
+
+    def query(self, i):
+        candidates = np.unique(np.concatenate([
+            order[start[group[i]]:stop[group[i]]]
+            for order, start, stop, group in zip(self.order, self.start, self.stop, self.group)]))
+        distances = np.abs(self.points[candidates] - self.points[i]).sum(axis=1)
+        close = distances <= self.radius
+        return candidates[close], distances[close]
+
+
+indexes = {'brute': BruteIndex, 'kdtree': KDTreeIndex, 'lsh': LSHIndex}
+
+
+def build_index(points, radius, method='auto', **kwargs):
+    if method == 'auto':
+        method = 'kdtree' if HAVE_SCIPY and points.shape[1] <= 20 else 'lsh'
+    if method == 'kdtree' and not HAVE_SCIPY:
+        raise ImportError("the kdtree index needs scipy; use lsh or brute instead")
+    return indexes[method](points, radius, **kwargs)
+
+
+def clearing(fitness, index, capacity=1):
+    '''Clearing (minimisation): the best individual not yet in a niche becomes a leader, the best
+    capacity individuals of its niche (itself included) keep their fitness and the rest are cleared.
+    Returns the leaders and the mask of cleared individuals'''
+    order = np.argsort(fitness, kind='stable')
+    assigned = np.zeros(len(fitness), dtype=bool)
+    cleared = np.zeros(len(fitness), dtype=bool)
+    leaders = []
+    for i in order:
+        if assigned[i]:
+            continue
+        leaders.append(i)
+        neighbours, _ = index.query(i)
+        neighbours = neighbours[~assigned[neighbours]]
+        neighbours = neighbours[np.argsort(fitness[neighbours], kind='stable')]
+        assigned[neighbours] = True
+        cleared[neighbours[capacity:]] = True
+    return np.array(leaders, dtype=int), cleared
+
+
+def niche_counts(index, size, alpha=1):
+    '''Sharing niche count of every individual: sum over neighbours of 1 - (d / radius) ** alpha'''
+    counts = np.empty(size)
+    for i in range(size):
+        _, distances = index.query(i)
+        counts[i] = (1 - (distances / index.radius) ** alpha).sum()
+    return counts
+
+
+class Niching:
+    def __init__(self, radius=400, method='clearing', index='auto', capacity=1, alpha=1, **index_options):
+        '''radius: niche radius in L1 distance (random diets are ~3900 apart, converged ones a few hundred).
+        The LSH index is fast while the radius is well below the typical distance between individuals.
+        method: "clearing" (cleared individuals get the worst fitness of the population) or
+        "sharing" (fitness multiplied by the niche count, costs are positive).
+        index: "auto", "kdtree", "lsh" or "brute"; index_options go to the index (e.g. tables, seed)'''
+        self.radius = radius
+        self.method = method
+        self.index = index
+        self.capacity = capacity
+        self.alpha = alpha
+        self.index_options = index_options
+        self.timings = []
+
+    def shared(self, population):
+        '''Copies of the individuals with the niched fitness, for the selection of one generation'''
+        start_time = perf_counter()
+        points = np.array([individual.representation for individual in population], dtype=float)
+        fitness = np.array([individual.fitness for individual in population], dtype=float)
+        index = build_index(points, self.radius, self.index, **self.index_options)
+        if self.method == 'clearing':
+            leaders, cleared = clearing(fitness, index, self.capacity)
+            niched = np.where(cleared, fitness.max(), fitness)
+            self.niches = len(leaders)
+        elif self.method == 'sharing':
+            counts = niche_counts(index, len(points), self.alpha)
+            niched = fitness * counts
+            self.niches = None
+        else:
+            raise ValueError(f"Unknown niching method {self.method}")
+        self.timings.append(perf_counter() - start_time)
+
+        parents = []
+        for individual, value in zip(population, niched):
+            parent = copy(individual)
+            parent.fitness = float(value)
+            parents.append(parent)
+        return parents
+
+    def leaders(self, population, count=None):
+        '''Distinct niche leaders, best first: no two of them are within radius of each other'''
+        points = np.array([individual.representation for individual in population], dtype=float)
+        fitness = np.array([individual.fitness for individual in population], dtype=float)
+        leaders, _ = clearing(fitness, build_index(points, self.radius, self.index, **self.index_options))
+        return [population[i] for i in leaders[:count]]
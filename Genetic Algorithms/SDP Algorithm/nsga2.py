@@ -0,0 +1,177 @@
+from bisect import bisect_left
+from random import random
+
+import numpy as np
+
+from charles import Individual
+from fitness import fitness_components, batch_fitness
+from crossover import uniform_co
+from mutation import random_mutation
+
+# NSGA-II: cost and nutrient violations are separate objectives (all minimised), so one run
+# returns the whole cost / violation Pareto front instead of one point per penalty weight.
+
+
+def diet_objectives(population, per_nutrient=False):
+    '''Objective matrix (individuals x objectives): total cost, then either the summed deficit and
+    summed excess (3 objectives) or the violation of every nutrient (1 + 14 objectives)'''
+    total_cost, under, over = fitness_components(population)
+    if per_nutrient:
+        return np.column_stack([total_cost, under + over])
+    return np.column_stack([total_cost, under.sum(axis=1), over.sum(axis=1)])
+
+
+def dominates(a, b):
+    '''Rows of a that dominate the point b'''
+    return np.all(a <= b, axis=-1) & np.any(a < b, axis=-1)
+
+
+def non_dominated_sort(objectives):
+    '''Front number of every row (0 is the Pareto front).
+    Two objectives: Jensen-style sweep, O(N log N). More objectives: efficient non-dominated sort
+    with binary search over the fronts (ENS-BS), each front check vectorized over its members'''
+    objectives = np.asarray(objectives, dtype=float)
+    n, m = objectives.shape
+    ranks = np.empty(n, dtype=int)
+    # lexicographic order: nobody is dominated by a solution that comes after it
+    order = np.lexsort(objectives.T[::-1])
+
+    if m == 2:
+        # the last member of every front has its smallest f2; keys of those members increase with the front
+        last_keys = []
+        for i in order:
+            key = (objectives[i, 1], objectives[i, 0])
+            front = bisect_left(last_keys, key)
+            if front == len(last_keys):
+                last_keys.append(key)
+            else:
+                last_keys[front] = key
+            ranks[i] = front
+        return ranks
+
+    # members of every front kept in a growing array, so each check is one vectorized comparison
+    fronts = []
+    sizes = []
+    for i in order:
+        point = objectives[i]
+        low, high = 0, len(fronts)
+        while low < high:
+            middle = (low + high) // 2
+            if dominates(fronts[middle][:sizes[middle]], point).any():
+                low = middle + 1
+            else:
+                high = middle
+        if low == len(fronts):
+            fronts.append(np.empty((16, m)))
+            sizes.append(0)
+        elif sizes[low] == len(fronts[low]):
+            fronts[low] = np.concatenate([fronts[low], np.empty_like(fronts[low])])
+        fronts[low][sizes[low]] = point
+        sizes[low] += 1
+        ranks[i] = low
+    return ranks
+
+
+def crowding_distance(objectives, ranks):
+    '''Crowding distance of every row within its front, vectorized over objectives'''
+    objectives = np.asarray(objectives, dtype=float)
+    n, m = objectives.shape
+    distance = np.zeros(n)
+    for front in np.unique(ranks):
+        members = np.flatnonzero(ranks == front)
+        if len(members) <= 2:
+            distance[members] = np.inf
+            continue
+        values = objectives[members]
+        order = np.argsort(values, axis=0)
+        sorted_values = np.take_along_axis(values, order, axis=0)
+        span = sorted_values[-1] - sorted_values[0]
+        span[span == 0] = 1
+        gaps = np.zeros_like(values)
+        gaps[1:-1] = (sorted_values[2:] - sorted_values[:-2]) / span
+        gaps[0] = gaps[-1] = np.inf
+        # back from sorted position to member position, then sum over objectives
+        contribution = np.empty_like(gaps)
+        np.put_along_axis(contribution, order, gaps, axis=0)
+        distance[members] = contribution.sum(axis=1)
+    return distance
+
+
+class NSGA2Population:
+    def __init__(self, size, optim, sol_size=58, initial=None, objectives=diet_objectives, **kwargs):
+        self.size = size
+        self.optim = optim
+        self.objective_function = objectives
+        if initial is None:
+            # same distribution as sdp_run.random_initialization
+            initial = np.random.randint(0, 201, (size, sol_size))
+        self.vectors = np.array(initial, dtype=float)
+        self.objectives = self.objective_function(self.vectors)
+        self.ranks = non_dominated_sort(self.objectives)
+        self.crowding = crowding_distance(self.objectives, self.ranks)
+
+    def tournament(self):
+        '''Binary tournament on (front, -crowding distance)'''
+        a, b = np.random.randint(0, self.size, 2)
+        if self.ranks[a] != self.ranks[b]:
+            return a if self.ranks[a] < self.ranks[b] else b
+        return a if self.crowding[a] >= self.crowding[b] else b
+
+    def evolve(self, pop, generations, plot, crossover=uniform_co, mutate=random_mutation,
+               mutation_rate=0.5, **kwargs):
+        self.history = []
+
+        for _ in range(generations):
+            front = self.ranks == 0
+            self.history.append({'front_size': int(front.sum()),
+                                 'min_cost': float(self.objectives[front, 0].min())})
+
+            # Offspring with the usual operators, parents chosen by crowded tournament
+            offspring = []
+            while len(offspring) < self.size:
+                parent1 = self.vectors[self.tournament()].tolist()
+                parent2 = self.vectors[self.tournament()].tolist()
+                offspring1, offspring2 = crossover(parent1, parent2)
+                if random() < mutation_rate:
+                    offspring1 = mutate(individual=offspring1)
+                if random() < mutation_rate:
+                    offspring2 = mutate(individual=offspring2)
+                offspring.extend([offspring1, offspring2])
+            offspring = np.clip(np.array(offspring[:self.size], dtype=float), 0, 200)
+
+            # Elitist environmental selection over parents + offspring
+            vectors = np.vstack([self.vectors, offspring])
+            objectives = np.vstack([self.objectives, self.objective_function(offspring)])
+            ranks = non_dominated_sort(objectives)
+            crowding = crowding_distance(objectives, ranks)
+            survivors = np.lexsort((-crowding, ranks))[:self.size]
+
+            self.vectors = vectors[survivors]
+            self.objectives = objectives[survivors]
+            self.ranks = ranks[survivors]
+            self.crowding = crowding[survivors]
+
+        pareto_front = self.pareto_front()
+        if plot is not None:
+            plot(self.objectives[self.ranks == 0])
+
+        return pareto_front, self.history
+
+    def pareto_front(self):
+        '''Non dominated individuals sorted by cost, each with its objective vector'''
+        members = np.flatnonzero(self.ranks == 0)
+        members = members[np.argsort(self.objectives[members, 0])]
+        front = []
+        for i in members:
+            individual = Individual(representation=self.vectors[i].tolist(),
+                                    fitness=float(batch_fitness(self.vectors[i:i + 1])[0]))
+            individual.objectives = self.objectives[i]
+            front.append(individual)
+        return front
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, position):
+        return Individual(representation=self.vectors[position].tolist(),
+                          fitness=float(batch_fitness(self.vectors[position:position + 1])[0]))
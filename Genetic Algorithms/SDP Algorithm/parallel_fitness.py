@@ -0,0 +1,98 @@
+import os
+from math import ceil
+from multiprocessing import Pool
+from multiprocessing.shared_memory import SharedMemory
+from time import perf_counter
+
+import numpy as np
+
+from fitness import batch_fitness
+
+# Fitness of one large population split across a persistent pool of worker processes.
+# The genomes and the fitness values live in shared memory: workers attach to it once when
+# they start, and each task is only a (start, stop) index range. The chunk size follows the
+# latency measured in the previous call, so every task takes about target_latency seconds.
+
+shared = {}
+
+
+def attach(genome_name, fitness_name, shape, fitness_function):
+    '''Pool initializer: maps the shared blocks once per worker'''
+    shared['blocks'] = (SharedMemory(name=genome_name), SharedMemory(name=fitness_name))
+    shared['genomes'] = np.ndarray(shape, dtype=np.float64, buffer=shared['blocks'][0].buf)
+    shared['fitness'] = np.ndarray(shape[0], dtype=np.float64, buffer=shared['blocks'][1].buf)
+    shared['function'] = fitness_function
+
+
+def evaluate_range(start, stop):
+    '''Pool task: scores genomes start:stop in place and returns how long it took'''
+    start_time = perf_counter()
+    shared['fitness'][start:stop] = shared['function'](shared['genomes'][start:stop])
+    return perf_counter() - start_time
+
+
+class ParallelEvaluator:
+    '''Drop-in for fitness.batch_fitness (a matrix in, one fitness per row out), e.g. as
+    DEPopulation(fitness=...) or Population.evolve(evaluate=...). Use it as a context manager,
+    or call close(), to stop the workers and free the shared memory'''
+
+    def __init__(self, processes=None, fitness=batch_fitness, target_latency=0.02, min_chunk=256):
+        self.processes = processes or os.cpu_count()
+        self.fitness_function = fitness
+        self.target_latency = target_latency
+        self.min_chunk = min_chunk
+        self.chunk_size = None
+        self.pool = None
+        self.blocks = None
+        self.latencies = []
+
+    def allocate(self, shape):
+        '''Shared blocks for up to shape[0] genomes; the pool restarts only when they must grow'''
+        if self.blocks is not None and self.genomes.shape[0] >= shape[0] and self.genomes.shape[1] == shape[1]:
+            return
+        self.close()
+        self.blocks = (SharedMemory(create=True, size=8 * shape[0] * shape[1]),
+                       SharedMemory(create=True, size=8 * shape[0]))
+        self.genomes = np.ndarray(shape, dtype=np.float64, buffer=self.blocks[0].buf)
+        self.fitness = np.ndarray(shape[0], dtype=np.float64, buffer=self.blocks[1].buf)
+        self.pool = Pool(self.processes, initializer=attach,
+                         initargs=(self.blocks[0].name, self.blocks[1].name, shape, self.fitness_function))
+
+    def __call__(self, population):
+        population = np.asarray(population, dtype=np.float64)
+        self.allocate(population.shape)
+        self.genomes[:len(population)] = population
+        return self.evaluate_shared(len(population))
+
+    def evaluate_shared(self, size):
+        '''Scores the first `size` rows already written to self.genomes'''
+        if self.chunk_size is None:
+            self.chunk_size = max(self.min_chunk, ceil(size / (4 * self.processes)))
+        ranges = [(start, min(start + self.chunk_size, size)) for start in range(0, size, self.chunk_size)]
+        latencies = self.pool.starmap(evaluate_range, ranges)
+
+        # next chunk size: rows that take target_latency at the measured speed, but never so
+        # large that some workers get nothing
+        seconds_per_row = sum(latencies) / size
+        self.latencies.append(float(np.mean(latencies)))
+        self.chunk_size = int(min(max(self.target_latency / max(seconds_per_row, 1e-12), self.min_chunk),
+                                  max(ceil(size / self.processes), 1)))
+        return self.fitness[:size].copy()
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+        if self.blocks is not None:
+            self.genomes = self.fitness = None
+            for block in self.blocks:
+                block.close()
+                block.unlink()
+            self.blocks = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,93 @@
+from time import time
+
+from charles import Population
+
+# IPOP-style restarts: when a run stagnates (no_improvement_threshold generations without
+# improvement) the remaining budget is not thrown away. The best individual of the run goes to
+# an archive and a new population starts, growth times larger (up to max_size), with a
+# reseed_fraction of it taken from the archive. This repeats until the evaluation or time
+# budget (or max_restarts) runs out, and the best individual across all restarts is returned.
+
+
+class RestartStrategy:
+    def __init__(self, size, optim, problem=None, growth=2, max_size=None, reseed_fraction=0.0,
+                 max_evaluations=None, max_time=None, max_restarts=None, **kwargs):
+        if max_evaluations is None and max_time is None and max_restarts is None:
+            raise ValueError("RestartStrategy needs max_evaluations, max_time or max_restarts")
+        self.size = size
+        self.optim = optim
+        self.problem = problem
+        self.growth = growth
+        self.max_size = max_size
+        self.reseed_fraction = reseed_fraction
+        self.max_evaluations = max_evaluations
+        self.max_time = max_time
+        self.max_restarts = max_restarts
+
+    def exhausted(self, evaluations, upcoming=0):
+        '''True when the budget is spent, or when `upcoming` more evaluations would overshoot it'''
+        if self.max_evaluations is not None and (evaluations >= self.max_evaluations
+                                                 or evaluations + upcoming > self.max_evaluations):
+            return True
+        return self.max_time is not None and time() - self.start_time >= self.max_time
+
+    def evolve(self, pop, generations, elite_size, no_improvement_threshold, plot, **kwargs):
+        '''pop is ignored (every restart makes its own population); generations is the limit of one
+        restart and the other arguments go to Population.evolve.
+        fitness_history is the best fitness of every generation of every restart, one after the
+        other; self.restarts holds the position in it where each restart begins and self.history
+        the records of Population.history with the restart number and population size'''
+        if self.max_evaluations is not None and self.size > self.max_evaluations:
+            raise ValueError(f"max_evaluations {self.max_evaluations} is smaller than the first population {self.size}")
+        self.start_time = time()
+        self.archive = []
+        self.restarts = []
+        self.history = []
+        fitness_history = []
+        evaluations = 0
+        size = self.size
+
+        while True:
+            # part of the new population from the best individuals found so far
+            best_first = sorted(self.archive, key=lambda x: x.fitness)
+            initial = [individual.representation for individual in best_first[:int(size * self.reseed_fraction)]]
+            population = Population(size=size, optim=self.optim, problem=self.problem, initial=initial or None)
+            before = evaluations + size
+
+            def stop():
+                # the initial population and the offspring bred so far, and whether the next
+                # generation (children come in pairs, so one more than the gap) still fits
+                return self.exhausted(before + population.evaluations, len(population) - elite_size + 1)
+
+            best_individual, run_history = population.evolve(pop=population, generations=generations,
+                                                             elite_size=elite_size,
+                                                             no_improvement_threshold=no_improvement_threshold,
+                                                             plot=None, stop=stop, **kwargs)
+            evaluations = before + population.evaluations
+
+            self.restarts.append(len(fitness_history))
+            fitness_history.extend(run_history)
+            for record in population.history:
+                self.history.append({**record, 'restart': len(self.restarts) - 1, 'population_size': size})
+            self.archive.append(best_individual)
+
+            if self.exhausted(evaluations):
+                break
+            if self.max_restarts is not None and len(self.restarts) > self.max_restarts:
+                break
+            size = size * self.growth if self.max_size is None else min(size * self.growth, self.max_size)
+            if self.exhausted(evaluations, size):
+                break  # no room left for the initial population of another restart
+
+        self.evaluations = evaluations
+        best_solution = min(self.archive, key=lambda x: x.fitness)
+        if plot is not None:
+            from utils import print_nutrition
+            plot(fitness_history)
+            print(best_solution)
+            print_nutrition(best_solution)
+
+        return best_solution, fitness_history
+
+    def __len__(self):
+        return self.size
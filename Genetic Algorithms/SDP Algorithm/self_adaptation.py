@@ -0,0 +1,64 @@
+from inspect import signature
+from math import exp, log
+from random import gauss, random
+
+# Self-adaptive mutation: every individual carries its own mutation_rate (probability of mutating
+# an offspring) and elem_mute_rate (probability of changing each gene), and they evolve with it,
+# as the step sizes of evolution strategies do. A child takes the mean of its parents' rates,
+# perturbs them with log-normal noise on the odds r / (1 - r) (so they stay inside (0, 1)) and
+# is then mutated with the new rates. Individuals with useful rates leave more offspring, so
+# selection tunes the rates during the run.
+
+
+def logit(rate):
+    return log(rate / (1 - rate))
+
+
+def expit(value):
+    return 1 / (1 + exp(-value))
+
+
+class SelfAdaptation:
+    def __init__(self, mutation_rate=0.5, elem_mute_rate=0.2, tau=0.22, bounds=(0.01, 0.99)):
+        '''mutation_rate, elem_mute_rate: centre of the initial rates.
+        tau: learning rate, the standard deviation of the log-normal noise on the odds
+        (0.22 is the usual choice for self-adaptive mutation probabilities)'''
+        self.start = {'mutation_rate': mutation_rate, 'elem_mute_rate': elem_mute_rate}
+        self.tau = tau
+        self.bounds = bounds
+        self.takes_rate = {}
+
+    def clip(self, rate):
+        return min(max(rate, self.bounds[0]), self.bounds[1])
+
+    def perturb(self, rate):
+        return self.clip(expit(logit(rate) + self.tau * gauss(0, 1)))
+
+    def strategy(self, individual):
+        '''Rates of an individual; the initial population gets rates spread around the start values'''
+        if getattr(individual, 'strategy', None) is None:
+            individual.strategy = {name: self.perturb(rate) for name, rate in self.start.items()}
+        return individual.strategy
+
+    def child_strategy(self, parent1, parent2):
+        strategy1, strategy2 = self.strategy(parent1), self.strategy(parent2)
+        # intermediate recombination on the odds, then log-normal mutation of every rate
+        return {name: self.perturb(expit((logit(strategy1[name]) + logit(strategy2[name])) / 2))
+                for name in strategy1}
+
+    def mutate(self, mutate, representation, parent1, parent2):
+        '''Mutates one offspring of parent1 and parent2 with its own rates; returns it with the rates'''
+        strategy = self.child_strategy(parent1, parent2)
+        if random() < strategy['mutation_rate']:
+            if mutate not in self.takes_rate:
+                self.takes_rate[mutate] = 'elem_mute_rate' in signature(mutate).parameters
+            if self.takes_rate[mutate]:
+                representation = mutate(individual=representation, elem_mute_rate=strategy['elem_mute_rate'])
+            else:
+                representation = mutate(individual=representation)
+        return representation, strategy
+
+    def summary(self, population):
+        '''Mean rates of a population, for Population.history'''
+        strategies = [self.strategy(individual) for individual in population]
+        return {name: sum(s[name] for s in strategies) / len(strategies) for name in self.start}
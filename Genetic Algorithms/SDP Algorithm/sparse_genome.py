@@ -0,0 +1,113 @@
+from random import randint, random, randrange
+
+import numpy as np
+
+from fitness import prices, nutrients, violations
+
+# Sparse diets: a good diet uses a handful of foods, so a genome can be kept as the foods
+# it contains (sorted food indices) and their quantities, and a population as CSR rows
+# (indptr, indices, quantities). Fitness then costs O(foods used x nutrients) instead of
+# O(all foods x nutrients), and the operators below never build the dense vector.
+# A sparse genome is a pair (indices, quantities) of NumPy arrays without zero quantities.
+
+n_foods = len(prices)
+
+
+def to_sparse(representation):
+    representation = np.asarray(representation)
+    indices = np.flatnonzero(representation)
+    return indices, representation[indices]
+
+
+def to_dense(genome, size=n_foods):
+    indices, quantities = genome
+    representation = np.zeros(size, dtype=quantities.dtype)
+    representation[indices] = quantities
+    return representation.tolist()
+
+
+def to_csr(population):
+    '''CSR rows (indptr, indices, quantities) of a list of sparse genomes'''
+    lengths = [len(indices) for indices, _ in population]
+    indptr = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+    if not population:
+        return indptr, np.empty(0, dtype=np.int64), np.empty(0)
+    return indptr, np.concatenate([g[0] for g in population]), np.concatenate([g[1] for g in population])
+
+
+def from_csr(csr):
+    indptr, indices, quantities = csr
+    return [(indices[start:stop], quantities[start:stop]) for start, stop in zip(indptr[:-1], indptr[1:])]
+
+
+def csr_components(csr):
+    '''Same as fitness.fitness_components for CSR rows; every stored quantity is visited once'''
+    indptr, indices, quantities = csr
+    size = len(indptr) - 1
+    rows = np.repeat(np.arange(size), np.diff(indptr))
+    total_cost = np.bincount(rows, weights=quantities * prices[indices], minlength=size)
+
+    # one bincount over (row, nutrient) cells instead of a dense (individuals x foods) product
+    n_nutrients = nutrients.shape[1]
+    contributions = quantities[:, None] * nutrients[indices]
+    cells = (rows[:, None] * n_nutrients + np.arange(n_nutrients)).ravel()
+    nutritional_values = np.bincount(cells, weights=contributions.ravel(),
+                                     minlength=size * n_nutrients).reshape(size, n_nutrients)
+    under, over = violations(nutritional_values)
+    return total_cost, under, over
+
+
+def csr_fitness(csr, under_penalty=500000, over_penalty=5):
+    '''Same values as fitness.batch_fitness, for CSR rows'''
+    total_cost, under, over = csr_components(csr)
+    return total_cost + under.sum(axis=-1) * under_penalty + over.sum(axis=-1) * over_penalty
+
+
+def sparse_fitness(genome, under_penalty=500000, over_penalty=5):
+    '''Fitness of one sparse genome'''
+    indices, quantities = genome
+    under, over = violations(quantities @ nutrients[indices])
+    return float(quantities @ prices[indices] + under.sum() * under_penalty + over.sum() * over_penalty)
+
+
+def sparse_uniform_co(p1, p2):
+    '''crossover.uniform_co on sparse genomes: only foods present in one of the parents can
+    change, so the coin is tossed for the union of their foods only'''
+    foods = np.union1d(p1[0], p2[0])
+    q1 = np.zeros(len(foods), dtype=np.result_type(p1[1], p2[1]))
+    q2 = np.zeros_like(q1)
+    q1[np.searchsorted(foods, p1[0])] = p1[1]
+    q2[np.searchsorted(foods, p2[0])] = p2[1]
+
+    swap = np.random.random(len(foods)) >= 0.5
+    offspring1 = np.where(swap, q2, q1)
+    offspring2 = np.where(swap, q1, q2)
+    return (foods[offspring1 != 0], offspring1[offspring1 != 0]), (foods[offspring2 != 0], offspring2[offspring2 != 0])
+
+
+def sparse_insert_delete_mutation(genome, size=n_foods):
+    '''mutation.insert_delete_mutation on a sparse genome: insert a food that is not in the diet
+    (1 to 10 units) or delete one that is'''
+    indices, quantities = genome
+    if random() < 0.5:
+        if len(indices) == size:
+            return genome
+        # rejection sampling is cheap while the diet uses a small part of the catalogue
+        while True:
+            food = randrange(size)
+            position = np.searchsorted(indices, food)
+            if position == len(indices) or indices[position] != food:
+                break
+        return np.insert(indices, position, food), np.insert(quantities, position, randint(1, 10))
+
+    if len(indices) == 0:
+        return genome
+    position = randrange(len(indices))
+    return np.delete(indices, position), np.delete(quantities, position)
+
+
+def densified(operator, size=n_foods):
+    '''Wraps an operator of mutation.py (one dense genome in, one out) to work on sparse genomes'''
+    def sparse_operator(individual, **kwargs):
+        return to_sparse(operator(individual=to_dense(individual, size), **kwargs))
+    return sparse_operator
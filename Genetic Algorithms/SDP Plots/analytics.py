@@ -0,0 +1,91 @@
+import sys
+import numpy as np
+import matplotlib.pyplot as plt
+import seaborn as sns
+
+from results_store import ResultsStore
+
+# Plots from stored results instead of re-running the experiments.
+# Runs stopped by no_improvement_threshold have shorter histories, so they are padded
+# with their last value (the best fitness stays where it stopped) before averaging; runs with
+# no history at all are NaN and left out of the averages (np.nanmean and the like).
+
+metrics = ['Time Elapsed', 'Final Fitness', 'Final Cost', 'Number of Iterations', 'Final Quantity', 'Number of Requirements met']
+
+
+def pad_histories(histories, length=None, dtype=np.float32):
+    '''Ragged fitness histories as one (runs x generations) array, each run carried forward
+    with its last value; a run with no history at all is NaN throughout.
+    Built with a single gather into a preallocated array'''
+    histories = [np.asarray(history, dtype=dtype) for history in histories]
+    lengths = np.array([len(history) for history in histories])
+    if length is None:
+        length = lengths.max() if len(lengths) else 0
+    padded = np.empty((len(histories), length), dtype=dtype)
+    if len(histories) == 0 or length == 0:
+        return padded
+
+    empty = lengths == 0
+    if empty.all():
+        padded.fill(np.nan)
+        return padded
+    flat = np.concatenate(histories)
+    starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    generation = np.minimum(np.arange(length)[None, :], np.maximum(lengths[:, None] - 1, 0))
+    # empty runs gather any valid value and are overwritten below
+    np.take(flat, np.minimum(starts[:, None] + generation, len(flat) - 1), out=padded)
+    padded[empty] = np.nan
+    return padded
+
+
+def bands(padded, quantiles=(0.25, 0.5, 0.75)):
+    '''Mean, min, max and quantiles over runs for every generation; the NaN rows of runs with no
+    history (see pad_histories) are ignored'''
+    summary = {'mean': np.nanmean(padded, axis=0), 'min': np.nanmin(padded, axis=0),
+               'max': np.nanmax(padded, axis=0)}
+    for q, values in zip(quantiles, np.nanquantile(padded, quantiles, axis=0)):
+        summary[q] = values
+    return summary
+
+
+def load_histories(store, experiment, config=None, ids=None):
+    '''{config: padded histories} for one experiment. ids: only these runs (one sweep), None for all'''
+    return {name: pad_histories(histories)
+            for name, histories in store.histories(experiment, config, ids).items()}
+
+
+def plot_bands(store, experiment, label='', band=('min', 'max'), ax=None, ids=None):
+    '''The line-band figure of the plot_ scripts: mean best fitness and its range per configuration'''
+    if ax is None:
+        fig, ax = plt.subplots(figsize=(10, 6))
+    for name, padded in load_histories(store, experiment, ids=ids).items():
+        summary = bands(padded)
+        generations = range(padded.shape[1])
+        ax.plot(generations, summary['mean'], label=f'{label} {name}'.strip())
+        ax.fill_between(generations, summary[band[0]], summary[band[1]], alpha=0.3)
+    ax.set_xlabel('Generations')
+    ax.set_ylabel('Mean Best Fitness')
+    ax.set_title('Mean Best Fitness Progression')
+    ax.legend()
+    return ax
+
+
+def plot_boxplots(store, experiment, metrics=metrics, ids=None):
+    '''The boxplot figure of the boxplot_ scripts, one box per configuration for every metric'''
+    results = store.runs(experiment, ids=ids)
+    fig, axs = plt.subplots(nrows=3, ncols=2, figsize=(15, 15))
+    for ax, metric in zip(axs.flatten(), metrics):
+        sns.boxplot(x='config', y=metric, data=results, ax=ax)
+        ax.set_xlabel('')
+    plt.tight_layout()
+    return axs
+
+
+if __name__ == '__main__':
+    # python analytics.py <experiment> [results.db] [latest | all | first-last]
+    experiment = sys.argv[1]
+    store = ResultsStore(sys.argv[2] if len(sys.argv) > 2 else 'results.db')
+    ids = store.sweep_ids(experiment, sys.argv[3] if len(sys.argv) > 3 else 'latest')
+    plot_bands(store, experiment, ids=ids)
+    plot_boxplots(store, experiment, ids=ids)
+    plt.show()
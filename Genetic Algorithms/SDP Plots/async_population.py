@@ -0,0 +1,263 @@
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from random import Random, uniform
+from threading import Lock
+from time import perf_counter, sleep
+
+import numpy as np
+
+from charles import Individual, mean_l1_distance
+from fitness import batch_fitness
+from problem import random_initialization
+
+# Asynchronous master-worker evolution for slow fitness functions (a pricing service, a simulation).
+# Population.evolve waits for the whole generation, so every worker idles until the slowest
+# evaluation of the generation is back. Here up to max_in_flight offspring are being evaluated
+# at once; as soon as any evaluation finishes, the child is inserted steady-state (it replaces
+# the worst individual if it is better) and a new child is bred from the current population
+# and submitted, so the workers never wait for each other.
+# LatencyStub stands in for the slow fitness locally, with configurable latency distributions.
+
+
+def genome_fitness(genome):
+    '''fitness.batch_fitness of one genome'''
+    return float(batch_fitness(np.asarray(genome, dtype=float)[None, :])[0])
+
+
+class LatencyStub:
+    def __init__(self, fitness=genome_fitness, distribution='exponential', mean=0.01, sigma=1.0,
+                 straggler_rate=0.0, straggler_factor=20, seed=None):
+        '''A fitness of one genome that first waits, like a call to a remote service.
+        distribution of the wait, with the given mean in seconds: "constant", "uniform" (0 to 2 x mean),
+        "exponential" or "lognormal" (sigma of the log). A straggler_rate of the calls take
+        straggler_factor times longer. self.waited is the total time spent waiting'''
+        if distribution not in ('constant', 'uniform', 'exponential', 'lognormal'):
+            raise ValueError(f"Unknown latency distribution {distribution}")
+        self.fitness_function = fitness
+        self.distribution = distribution
+        self.mean = mean
+        self.sigma = sigma
+        self.straggler_rate = straggler_rate
+        self.straggler_factor = straggler_factor
+        self.rng = Random(seed)
+        self.lock = Lock()
+        self.calls = 0
+        self.waited = 0.0
+
+    def latency(self):
+        if self.distribution == 'constant':
+            latency = self.mean
+        elif self.distribution == 'uniform':
+            latency = self.rng.uniform(0, 2 * self.mean)
+        elif self.distribution == 'exponential':
+            latency = self.rng.expovariate(1 / self.mean)
+        else:
+            # mean of a lognormal is exp(mu + sigma^2 / 2)
+            latency = self.rng.lognormvariate(np.log(self.mean) - self.sigma ** 2 / 2, self.sigma)
+        if self.rng.random() < self.straggler_rate:
+            latency *= self.straggler_factor
+        return latency
+
+    def __call__(self, genome):
+        latency = self.latency()
+        sleep(latency)
+        with self.lock:
+            self.calls += 1
+            self.waited += latency
+        return self.fitness_function(genome)
+
+    def __getstate__(self):
+        # for process pools: every process gets its own lock and counters
+        state = self.__dict__.copy()
+        del state['lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = Lock()
+
+
+class AsyncPopulation:
+    def __init__(self, size, optim, evaluator=genome_fitness, workers=8, executor=None, max_in_flight=None,
+                 initial=None, problem=None, **kwargs):
+        '''evaluator: fitness of one genome (e.g. a LatencyStub), called in the workers.
+        executor: a concurrent.futures executor; by default a ThreadPoolExecutor of `workers` threads,
+        which suits evaluators that wait on a service (a ProcessPoolExecutor suits CPU-bound ones).
+        max_in_flight: most evaluations submitted and not finished yet (default 2 x workers).
+        initial: representations of the first individuals, the rest are random (problem.initialize
+        when a problem is given). The initial population is evaluated through the executor too; a
+        genome whose evaluation raises is replaced by a new random one (self.initial_failed of them),
+        and after more than size failures the constructor gives up with a RuntimeError.
+        Use it as a context manager, or call close(), to stop its own executor.
+        Only optim="min" is supported: the steady-state insertion replaces the highest fitness'''
+        if optim != "min":
+            raise ValueError(f"AsyncPopulation only minimises, got optim={optim!r}")
+        self.size = size
+        self.optim = optim
+        self.evaluator = evaluator
+        self.workers = workers
+        self.own_executor = executor is None
+        self.executor = ThreadPoolExecutor(workers) if executor is None else executor
+        self.max_in_flight = max_in_flight or 2 * workers
+        self.problem = problem
+
+        genomes = [] if initial is None else np.asarray(initial).tolist()[:size]
+        initialize = random_initialization if problem is None else problem.initialize
+        genomes += [initialize(None) for _ in range(size - len(genomes))]
+        try:
+            self.individuals = self.evaluate_initial(genomes, initialize)
+        except BaseException:
+            # the executor the population started would otherwise be left running
+            self.close()
+            raise
+
+    def evaluate_initial(self, genomes, initialize):
+        '''Individuals of the initial genomes, evaluated through the executor; the genomes whose
+        evaluation raised are redrawn with initialize and evaluated again'''
+        individuals = []
+        self.initial_failed = 0
+        futures = []
+        try:
+            while genomes:
+                futures = [(genome, self.executor.submit(self.evaluator, genome)) for genome in genomes]
+                genomes = []
+                for genome, future in futures:
+                    try:
+                        fitness = float(future.result())
+                    except Exception as error:
+                        self.initial_failed += 1
+                        if self.initial_failed > self.size:
+                            raise RuntimeError(f"{self.initial_failed} evaluations of the initial population "
+                                               f"failed") from error
+                        genomes.append(initialize(None))
+                        continue
+                    individuals.append(Individual(representation=genome, fitness=fitness, problem=self.problem))
+        finally:
+            for _, future in futures:
+                future.cancel()
+        return individuals
+
+    def breed(self, select, mutate, mutation_rate, crossover):
+        '''Two children of parents selected from the current population'''
+        parent1 = select(self)
+        parent2 = select(self)
+        offspring1, offspring2 = crossover(parent1.representation, parent2.representation)
+        if uniform(0, 1) < mutation_rate:
+            offspring1 = mutate(individual=offspring1)
+        if uniform(0, 1) < mutation_rate:
+            offspring2 = mutate(individual=offspring2)
+        return [offspring1, offspring2]
+
+    def insert(self, individual, genomes):
+        '''Steady-state replacement: the child takes the place of the worst individual if it is better
+        and not already in the population'''
+        key = tuple(individual.representation)
+        if key in genomes:
+            return False
+        worst = max(range(len(self.individuals)), key=lambda i: self.individuals[i].fitness)
+        if individual.fitness >= self.individuals[worst].fitness:
+            return False
+        genomes.discard(tuple(self.individuals[worst].representation))
+        genomes.add(key)
+        self.individuals[worst] = individual
+        return True
+
+    def evolve(self, pop, generations, select, mutate, mutation_rate, crossover, no_improvement_threshold, plot,
+               diversity=mean_l1_distance, stop=None, **kwargs):
+        '''fitness_history gets one value (the best fitness) for the initial population and then every
+        size finished evaluations, generations values in all, so the budget and the history compare
+        with Population.evolve.
+        self.history records, for every size evaluations: best, mean, diversity, the children
+        inserted, the failed evaluations, the evaluations in flight and the seconds since the start.
+        An evaluation that raises counts as finished and failed (self.failed in total) and its child is
+        dropped. elite_size is not needed: the steady-state insertion never replaces the best individual'''
+        fitness_history = []
+        self.history = []
+        generations_without_improvement = 0
+        previous_best_fitness = float("inf")
+        budget = (generations - 1) * self.size
+        submitted = finished = inserted = failed = 0
+        self.failed = 0
+        children = []
+        in_flight = {}
+        genomes = {tuple(individual.representation) for individual in self.individuals}
+        start_time = perf_counter()
+
+        try:
+            while True:
+                # a generation's worth of evaluations has finished: report and check the stopping criteria
+                if finished >= len(fitness_history) * self.size:
+                    current_best_fitness = min(individual.fitness for individual in self.individuals)
+                    fitness_history.append(current_best_fitness)
+                    self.history.append({
+                        'best': current_best_fitness,
+                        'mean': sum(individual.fitness for individual in self.individuals) / self.size,
+                        'diversity': diversity(self) if diversity is not None else None,
+                        'inserted': inserted,
+                        'failed': failed,
+                        'in_flight': len(in_flight),
+                        'seconds': perf_counter() - start_time})
+                    inserted = failed = 0
+                    if current_best_fitness < previous_best_fitness:
+                        generations_without_improvement = 0
+                        previous_best_fitness = current_best_fitness
+                    else:
+                        generations_without_improvement += 1
+                    if generations_without_improvement >= no_improvement_threshold:
+                        break
+                    if stop is not None and stop():
+                        break
+                    if finished >= budget:
+                        break
+
+                # keep the queue full
+                while len(in_flight) < self.max_in_flight and submitted < budget:
+                    if not children:
+                        children = self.breed(select, mutate, mutation_rate, crossover)
+                    representation = children.pop()
+                    in_flight[self.executor.submit(self.evaluator, representation)] = representation
+                    submitted += 1
+
+                # the first evaluations back go into the population right away
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    representation = in_flight.pop(future)
+                    finished += 1
+                    try:
+                        fitness = float(future.result())
+                    except Exception:
+                        # one evaluation failing (a service error, a timeout) does not stop the run
+                        failed += 1
+                        self.failed += 1
+                        continue
+                    individual = Individual(representation=representation, fitness=fitness, problem=self.problem)
+                    inserted += self.insert(individual, genomes)
+        finally:
+            # evaluations still running are not needed any more
+            for future in in_flight:
+                future.cancel()
+        self.evaluations = finished
+
+        best_solution = min(self.individuals, key=lambda x: x.fitness)
+        if plot is not None:
+            from utils import print_nutrition
+            plot(fitness_history)
+            print(best_solution)
+            print_nutrition(best_solution)
+
+        return best_solution, fitness_history
+
+    def close(self):
+        if self.own_executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, position):
+        return self.individuals[position]
@@ -0,0 +1,63 @@
+from concurrent.futures import ThreadPoolExecutor
+from random import seed
+from time import perf_counter
+import numpy as np
+import pandas as pd
+
+from charles import Population
+from problem import Problem
+from async_population import AsyncPopulation, LatencyStub
+
+from selection import tournament_selection
+from mutation import random_mutation
+from crossover import multi_point_co
+
+# A slow fitness (LatencyStub: 5 ms on average, 2% of the calls 20 times slower) on 8 workers:
+# the generational Population.evolve, which waits for the slowest evaluation of every generation,
+# against the asynchronous steady-state AsyncPopulation, for the same number of generations.
+# Times are of evolve only (the initial population is left out). Utilization is the time the
+# workers spent in evaluations over 8 x that time.
+
+workers = 8
+generations = 50
+runs = 3
+latencies = {'Constant': {'distribution': 'constant'},
+             'Exponential': {'distribution': 'exponential'},
+             'Lognormal': {'distribution': 'lognormal', 'sigma': 1.0}}
+operators = {'select': tournament_selection, 'mutate': random_mutation, 'mutation_rate': 0.5,
+             'crossover': multi_point_co, 'no_improvement_threshold': 1000, 'plot': None}
+
+rows = []
+executor = ThreadPoolExecutor(workers)
+for latency_name, latency in latencies.items():
+    for run_seed in range(runs):
+        stub = LatencyStub(mean=0.005, straggler_rate=0.02, seed=run_seed, **latency)
+        seed(run_seed)
+        pop = Population(size=50, optim="min", problem=Problem(fitness=lambda individual: stub(individual.representation)))
+        calls, waited = stub.calls, stub.waited
+        start_time = perf_counter()
+        best_individual, _ = pop.evolve(pop=pop, generations=generations, elite_size=2,
+                                        evaluate=lambda matrix: np.array(list(executor.map(stub, matrix.tolist()))),
+                                        **operators)
+        elapsed = perf_counter() - start_time
+        rows.append({'Latency': latency_name, 'Mode': 'Generational', 'Evaluations': stub.calls - calls,
+                     'Wall (s)': elapsed, 'Utilization': (stub.waited - waited) / (workers * elapsed),
+                     'Final Fitness': best_individual.fitness})
+
+        for max_in_flight in [workers, 2 * workers]:
+            stub = LatencyStub(mean=0.005, straggler_rate=0.02, seed=run_seed, **latency)
+            seed(run_seed)
+            with AsyncPopulation(size=50, optim="min", evaluator=stub, workers=workers,
+                                 max_in_flight=max_in_flight) as pop:
+                calls, waited = stub.calls, stub.waited
+                start_time = perf_counter()
+                best_individual, _ = pop.evolve(pop=pop, generations=generations, **operators)
+                elapsed = perf_counter() - start_time
+            rows.append({'Latency': latency_name, 'Mode': f'Async, {max_in_flight} in flight',
+                         'Evaluations': stub.calls - calls, 'Wall (s)': elapsed,
+                         'Utilization': (stub.waited - waited) / (workers * elapsed),
+                         'Final Fitness': best_individual.fitness})
+executor.shutdown()
+
+results = pd.DataFrame(rows)
+print(results.groupby(['Latency', 'Mode'], sort=False).median().to_string(float_format='%.2f'))
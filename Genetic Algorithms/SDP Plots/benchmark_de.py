@@ -0,0 +1,84 @@
+from time import time
+from random import seed
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+
+from charles import Population, Individual
+from differential_evolution import DEPopulation
+from sdp_run import get_fitness, random_initialization
+
+from selection import tournament_selection
+from mutation import random_mutation
+from crossover import multi_point_co
+
+# Time-to-target of the GA against the vectorized differential evolution
+Individual.get_fitness = get_fitness
+Individual.initialize = random_initialization
+
+target = 1500  # fitness of a cheap diet that meets every minimum
+generations = 300
+runs = 20
+
+
+def time_to_target(fitness_history, elapsed):
+    '''Wall time until the best fitness first reaches the target, assuming every generation costs the same'''
+    reached = np.flatnonzero(np.asarray(fitness_history) <= target)
+    if len(reached) == 0:
+        return np.nan
+    return elapsed * (reached[0] + 1) / len(fitness_history)
+
+
+def run_ga(run_seed):
+    seed(run_seed)
+    pop = Population(size=50, optim="min")
+    return pop.evolve(pop=pop, generations=generations, select=tournament_selection, mutate=random_mutation,
+                      mutation_rate=0.5, crossover=multi_point_co, elite_size=6,
+                      no_improvement_threshold=1000, plot=None)
+
+
+def run_de(strategy):
+    def run(run_seed):
+        pop = DEPopulation(size=50, optim="min", seed=run_seed)
+        return pop.evolve(pop=pop, generations=generations, no_improvement_threshold=1000, plot=None,
+                          strategy=strategy, F=0.5, CR=0.9)
+    return run
+
+
+optimizers = {'GA': run_ga, 'DE rand/1/bin': run_de("rand/1/bin"),
+              'DE current-to-best/1': run_de("current-to-best/1")}
+
+rows = []
+histories = {}
+for name, run in optimizers.items():
+    print(name)
+    histories[name] = []
+    for run_seed in range(runs):
+        start_time = time()
+        best_individual, fitness_history = run(run_seed)
+        elapsed = time() - start_time
+        rows.append({'Optimizer': name,
+                     'Time Elapsed': elapsed,
+                     'Time to Target': time_to_target(fitness_history, elapsed),
+                     'Final Fitness': best_individual.fitness})
+        histories[name].append(fitness_history)
+
+results = pd.DataFrame(rows)
+summary = results.groupby('Optimizer', sort=False).agg(
+    runs_reaching_target=('Time to Target', 'count'),
+    median_time_to_target=('Time to Target', 'median'),
+    mean_time_elapsed=('Time Elapsed', 'mean'),
+    median_final_fitness=('Final Fitness', 'median'))
+print(summary)
+
+fig, ax = plt.subplots(figsize=(10, 6))
+for name, fitness_values in histories.items():
+    mean_fitness = np.mean(fitness_values, axis=0)
+    ax.plot(range(len(mean_fitness)), mean_fitness, label=name)
+ax.axhline(target, color='gray', linestyle='--', label='Target')
+ax.set_yscale('log')
+ax.set_xlabel('Generations')
+ax.set_ylabel('Mean Best Fitness')
+ax.set_title('GA against Differential Evolution')
+ax.legend()
+plt.show()
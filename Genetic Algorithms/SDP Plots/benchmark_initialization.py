@@ -0,0 +1,120 @@
+from time import time
+from random import seed
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+
+from charles import Population, Individual
+from sdp_run import get_fitness, random_initialization, initialize_latin_hypercube, initialize_goodfoods
+from fitness import fitness_components
+from initialization import lhs, halton, sobol, feasibility_biased
+
+from selection import tournament_selection
+from mutation import random_mutation
+from crossover import multi_point_co
+
+# Time to the first feasible diet (no nutrient below its minimum) and to the first feasible diet
+# with fitness <= target, for sdp_run's per-individual initializers and the population-level ones.
+# Initialization time is included in both.
+Individual.get_fitness = get_fitness
+
+target = 1500  # fitness of a cheap diet that meets every minimum, as in benchmark_de.py
+pop_size = 64
+generations = 300
+runs = 20
+
+
+class FirstFeasible:
+    '''Passed as evolve(log=...): notes when the population first holds a feasible diet and first
+    reaches the target. Its own checks are kept out of the times'''
+
+    def __init__(self, pop, start_time):
+        self.pop = pop
+        self.start_time = start_time
+        self.overhead = 0
+        self.feasible = None
+        self.on_target = None
+        self.feasible_share = None
+
+    def write(self, generation, record):
+        check_start = time()
+        _, under, _ = fitness_components([individual.representation for individual in self.pop])
+        feasible = under.sum(axis=1) == 0
+        if self.feasible_share is None:
+            self.feasible_share = feasible.mean()
+        elapsed = check_start - self.start_time - self.overhead
+        if self.feasible is None and feasible.any():
+            self.feasible = (generation, elapsed)
+        if self.on_target is None and record['best'] <= target and feasible.any():
+            self.on_target = (generation, elapsed)
+        self.overhead += time() - check_start
+
+
+def per_individual(initialize):
+    def initial(size, run_seed):
+        Individual.initialize = initialize
+        return None
+    return initial
+
+
+def population_level(sampler):
+    def initial(size, run_seed):
+        Individual.initialize = random_initialization
+        return sampler(size, seed=run_seed)
+    return initial
+
+
+initializers = {'Random': per_individual(random_initialization),
+                'Latin Hypercube (per gene)': per_individual(initialize_latin_hypercube),
+                'Good Foods': per_individual(initialize_goodfoods),
+                'LHS': population_level(lhs),
+                'Halton': population_level(halton),
+                'Sobol': population_level(sobol),
+                'Feasibility biased': population_level(feasibility_biased)}
+
+rows = []
+histories = {}
+for name, initial in initializers.items():
+    print(name)
+    histories[name] = []
+    for run_seed in range(runs):
+        seed(run_seed)
+        start_time = time()
+        pop = Population(size=pop_size, optim="min", initial=initial(pop_size, run_seed))
+        monitor = FirstFeasible(pop, start_time)
+        best_individual, fitness_history = pop.evolve(pop=pop, generations=generations, select=tournament_selection,
+                                                      mutate=random_mutation, mutation_rate=0.5,
+                                                      crossover=multi_point_co, elite_size=6,
+                                                      no_improvement_threshold=1000, plot=None,
+                                                      diversity=None, log=monitor)
+        rows.append({'Initialization': name,
+                     'Feasible at Start': monitor.feasible_share,
+                     'Generations to Feasible': monitor.feasible[0] if monitor.feasible else np.nan,
+                     'Time to Feasible': monitor.feasible[1] if monitor.feasible else np.nan,
+                     'Generations to Target': monitor.on_target[0] if monitor.on_target else np.nan,
+                     'Time to Target': monitor.on_target[1] if monitor.on_target else np.nan,
+                     'Initial Fitness': fitness_history[0],
+                     'Final Fitness': best_individual.fitness})
+        histories[name].append(fitness_history)
+
+results = pd.DataFrame(rows)
+summary = results.groupby('Initialization', sort=False).agg(
+    feasible_at_start=('Feasible at Start', 'mean'),
+    median_time_to_feasible=('Time to Feasible', 'median'),
+    runs_reaching_target=('Time to Target', 'count'),
+    median_time_to_target=('Time to Target', 'median'),
+    median_initial_fitness=('Initial Fitness', 'median'),
+    median_final_fitness=('Final Fitness', 'median'))
+print(summary.to_string())
+
+fig, ax = plt.subplots(figsize=(10, 6))
+for name, fitness_values in histories.items():
+    mean_fitness = np.mean(fitness_values, axis=0)
+    ax.plot(range(len(mean_fitness)), mean_fitness, label=name)
+ax.axhline(target, color='gray', linestyle='--', label='Target')
+ax.set_yscale('log')
+ax.set_xlabel('Generations')
+ax.set_ylabel('Mean Best Fitness')
+ax.set_title('Initialization: Mean Best Fitness Progression')
+ax.legend()
+plt.show()
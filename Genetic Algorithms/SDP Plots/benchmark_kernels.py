@@ -0,0 +1,44 @@
+from timeit import timeit
+import numpy as np
+import pandas as pd
+from random import randrange
+
+import kernels
+from fitness import batch_fitness
+from sdp_run import get_fitness
+from selection import fps
+from mutation import random_mutation
+from crossover import uniform_co
+from charles import Individual
+
+# Speedup of every compiled kernel over the pure Python path it replaces
+if not kernels.HAVE_NUMBA:
+    print("numba is not installed, kernels.py falls back to the pure Python functions")
+
+kernels.warm_up()
+
+Individual.get_fitness = get_fitness
+population = [Individual(representation=[randrange(201) for _ in range(58)]) for _ in range(50)]
+genome = population[0].representation
+matrix = np.array([i.representation for i in population], dtype=float)
+large_matrix = np.random.randint(0, 201, (100000, 58)).astype(float)
+
+benchmarks = [
+    ('get_fitness (one individual)', lambda: get_fitness(population[0]), lambda: kernels.get_fitness(population[0]), 2000),
+    ('batch fitness (50 x 58)', lambda: batch_fitness(matrix), lambda: kernels.batch_fitness(matrix), 2000),
+    ('batch fitness (100000 x 58)', lambda: batch_fitness(large_matrix), lambda: kernels.batch_fitness(large_matrix), 10),
+    ('random_mutation', lambda: random_mutation(list(genome)), lambda: kernels.random_mutation(genome), 2000),
+    ('uniform_co', lambda: uniform_co(genome, genome), lambda: kernels.uniform_co(genome, genome), 2000),
+    ('fps (50 individuals)', lambda: fps(population), lambda: kernels.fps(population), 2000),
+]
+
+rows = []
+for name, python_version, kernel_version, number in benchmarks:
+    python_time = timeit(python_version, number=number) / number
+    kernel_time = timeit(kernel_version, number=number) / number
+    rows.append({'Kernel': name,
+                 'Python (us)': python_time * 1e6,
+                 'Kernel (us)': kernel_time * 1e6,
+                 'Speedup': python_time / kernel_time})
+
+print(pd.DataFrame(rows).to_string(index=False, float_format='%.2f'))
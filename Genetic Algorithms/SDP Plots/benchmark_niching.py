@@ -0,0 +1,67 @@
+from time import perf_counter
+from random import seed
+import numpy as np
+import pandas as pd
+
+from charles import Population
+from problem import Problem
+from niching import Niching, build_index, clearing, HAVE_SCIPY
+
+from selection import tournament_selection
+from mutation import random_mutation
+from crossover import uniform_co
+
+# Cost of one generation of clearing (index build + neighbour queries) per index and population
+# size, on a converged population (diets around 50 centres) and a random one, and the share of
+# the exact clearing's cleared individuals that the LSH index finds. Then a GA run with niching
+# and its niche leaders.
+
+radius = 400
+rng = np.random.default_rng(0)
+
+
+def converged(size):
+    centres = rng.integers(0, 201, (50, 58))
+    return (centres[rng.integers(0, 50, size)] + rng.integers(-5, 6, (size, 58))).astype(float)
+
+
+def random_population(size):
+    return rng.integers(0, 201, (size, 58)).astype(float)
+
+
+methods = ['brute', 'kdtree', 'lsh'] if HAVE_SCIPY else ['brute', 'lsh']
+rows = []
+for population_name, make in [('converged', converged), ('random', random_population)]:
+    for size in [1000, 5000, 10000, 20000]:
+        points = make(size)
+        fitness = rng.random(size)
+        exact = None
+        for method in methods:
+            if method == 'brute' and size > 5000:
+                continue  # O(P^2), minutes at this size
+            if method == 'kdtree' and population_name == 'random' and size > 5000:
+                continue  # the KD-tree degrades to worse than brute force in 58 dimensions
+            start_time = perf_counter()
+            leaders, cleared = clearing(fitness, build_index(points, radius, method, seed=1))
+            elapsed = perf_counter() - start_time
+            if exact is None:
+                exact = cleared
+            rows.append({'Population': population_name, 'Size': size, 'Index': method,
+                         'Time (s)': elapsed, 'Niches': len(leaders),
+                         'Cleared Found': (cleared & exact).sum() / exact.sum() if exact.any() else np.nan})
+
+print(pd.DataFrame(rows).to_string(index=False, float_format='%.3f'))
+
+# A run with clearing: several distinct cheap diets instead of copies of one
+seed(0)
+niching = Niching(radius=radius, method='clearing', index='lsh', seed=1)
+pop = Population(size=200, optim="min", problem=Problem())
+best_individual, fitness_history = pop.evolve(pop=pop, generations=200, select=tournament_selection,
+                                              mutate=random_mutation, mutation_rate=0.5, crossover=uniform_co,
+                                              elite_size=2, no_improvement_threshold=1000, plot=None,
+                                              niching=niching)
+print(f"\nmean niching time per generation: {np.mean(niching.timings) * 1e3:.1f} ms")
+print(f"{len(pop.niche_leaders)} niche leaders, the 10 best:")
+for leader in pop.niche_leaders[:10]:
+    foods = np.flatnonzero(leader.representation)
+    print(f"fitness {leader.fitness:9.1f}  foods used {len(foods):2d}")
@@ -0,0 +1,49 @@
+import os
+from timeit import timeit
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+
+from fitness import batch_fitness
+from parallel_fitness import ParallelEvaluator
+
+# Strong scaling of the chunked parallel evaluation: one generation of a large population
+# scored on 1, 2, 4, ... worker processes, against the single process batch_fitness.
+# Efficiency is the speedup over one worker divided by the number of workers.
+
+if __name__ == '__main__':
+    population = np.random.randint(0, 201, (500000, 58)).astype(float)
+    repeats = 5
+    core_counts = sorted({2 ** k for k in range(int(np.log2(os.cpu_count())) + 1)} | {os.cpu_count()})
+
+    serial_time = timeit(lambda: batch_fitness(population), number=repeats) / repeats
+
+    rows = []
+    for processes in core_counts:
+        with ParallelEvaluator(processes=processes) as evaluate:
+            # the first calls start the pool and settle the chunk size
+            for _ in range(3):
+                evaluate(population)
+            parallel_time = timeit(lambda: evaluate(population), number=repeats) / repeats
+            rows.append({'Processes': processes,
+                         'Chunk Size': evaluate.chunk_size,
+                         'Chunk Latency (ms)': evaluate.latencies[-1] * 1e3,
+                         'Time (ms)': parallel_time * 1e3})
+
+    results = pd.DataFrame(rows)
+    one_worker = results['Time (ms)'].iloc[0]
+    results['Speedup'] = one_worker / results['Time (ms)']
+    results['Efficiency'] = results['Speedup'] / results['Processes']
+    results['Speedup vs batch_fitness'] = serial_time * 1e3 / results['Time (ms)']
+
+    print(f"batch_fitness in one process: {serial_time * 1e3:.1f} ms for {len(population)} individuals")
+    print(results.to_string(index=False, float_format='%.2f'))
+
+    fig, ax = plt.subplots(figsize=(10, 6))
+    ax.plot(results['Processes'], results['Speedup'], marker='o', label='Measured')
+    ax.plot(results['Processes'], results['Processes'], linestyle='--', color='gray', label='Linear')
+    ax.set_xlabel('Worker Processes')
+    ax.set_ylabel('Speedup over one worker')
+    ax.set_title('Parallel Fitness Evaluation Scaling')
+    ax.legend()
+    plt.show()
@@ -0,0 +1,82 @@
+from functools import partial
+from random import seed
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+
+from charles import Population
+from problem import Problem
+from analytics import pad_histories
+from self_adaptation import SelfAdaptation
+
+from selection import tournament_selection
+from mutation import random_mutation
+from crossover import multi_point_co
+
+# Generations to target of self-adaptive mutation rates against fixed rates
+# (mutation_rate / elem_mute_rate of random_mutation), on the same seeds.
+
+target = 1500  # fitness of a cheap diet that meets every minimum, as in benchmark_de.py
+generations = 300
+runs = 20
+problem = Problem()
+
+configs = {'Fixed 0.5 / 0.2': {'mutation_rate': 0.5, 'mutate': random_mutation},
+           'Fixed 0.2 / 0.05': {'mutation_rate': 0.2, 'mutate': partial(random_mutation, elem_mute_rate=0.05)},
+           'Fixed 0.8 / 0.4': {'mutation_rate': 0.8, 'mutate': partial(random_mutation, elem_mute_rate=0.4)},
+           'Self-adaptive': {'mutation_rate': None, 'mutate': random_mutation,
+                             'adaptation': SelfAdaptation(mutation_rate=0.5, elem_mute_rate=0.2)}}
+
+
+def generations_to_target(fitness_history):
+    reached = np.flatnonzero(np.asarray(fitness_history) <= target)
+    return reached[0] if len(reached) else np.nan
+
+
+rows = []
+histories = {}
+rates = []
+for name, config in configs.items():
+    print(name)
+    histories[name] = []
+    for run_seed in range(runs):
+        seed(run_seed)
+        pop = Population(size=50, optim="min", problem=problem)
+        best_individual, fitness_history = pop.evolve(pop=pop, generations=generations, select=tournament_selection,
+                                                      crossover=multi_point_co, elite_size=6,
+                                                      no_improvement_threshold=1000, plot=None, **config)
+        rows.append({'Mutation': name,
+                     'Generations to Target': generations_to_target(fitness_history),
+                     'Final Fitness': best_individual.fitness})
+        histories[name].append(fitness_history)
+        if 'adaptation' in config:
+            rates.append([(record['mutation_rate'], record['elem_mute_rate']) for record in pop.history])
+
+results = pd.DataFrame(rows)
+summary = results.groupby('Mutation', sort=False).agg(
+    runs_reaching_target=('Generations to Target', 'count'),
+    median_generations_to_target=('Generations to Target', 'median'),
+    median_final_fitness=('Final Fitness', 'median'))
+adaptive = summary.loc['Self-adaptive', 'median_generations_to_target']
+summary['speedup of self-adaptive'] = summary['median_generations_to_target'] / adaptive
+print(summary.to_string())
+
+fig, axs = plt.subplots(ncols=2, figsize=(15, 6))
+for name, fitness_values in histories.items():
+    mean_fitness = np.nanmean(pad_histories(fitness_values), axis=0)
+    axs[0].plot(range(len(mean_fitness)), mean_fitness, label=name)
+axs[0].axhline(target, color='gray', linestyle='--', label='Target')
+axs[0].set_yscale('log')
+axs[0].set_xlabel('Generations')
+axs[0].set_ylabel('Mean Best Fitness')
+axs[0].set_title('Fixed against Self-adaptive Mutation Rates')
+axs[0].legend()
+
+mean_rates = np.mean(rates, axis=0)
+axs[1].plot(mean_rates[:, 0], label='mutation_rate')
+axs[1].plot(mean_rates[:, 1], label='elem_mute_rate')
+axs[1].set_xlabel('Generations')
+axs[1].set_ylabel('Population Mean Rate')
+axs[1].set_title('Self-adapted Rates')
+axs[1].legend()
+plt.show()
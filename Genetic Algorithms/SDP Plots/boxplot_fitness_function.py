@@ -3,7 +3,10 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 
-from charles import Population, Individual
+from charles import Population
+from problem import Problem
+from results_store import ResultsStore
+from fitness import cached_components
 from sdp_data import data, min_nutrients, max_nutrients
 from sdp_run import random_initialization
 
@@ -11,8 +14,10 @@ from selection import fps
 from mutation import random_mutation
 from crossover import multi_point_co
 
-results = pd.DataFrame(columns=['Fitness Function', 'Time Elapsed', 'Final Fitness', 'Final Cost',
-                                'Number of Iterations', 'Final Quantity', 'Number of Requirements met'])
+store = ResultsStore('results.db')
+# ids of the runs of this sweep: the store also keeps the runs of earlier sweeps
+run_ids = []
+rows = []
 
 def get_fitness_single_penalty(self):
         """A fitness function that returns the
@@ -88,7 +93,6 @@ def get_fitness_percentage_penalty(self):
 
 fitness_functions = [[get_fitness_single_penalty, 'Sinlge Penalty'],[ get_fitness_percentage_penalty, 'Percentage Penalty']]
 
-Individual.initialize = random_initialization
 
 fitness_values = []
 
@@ -98,14 +102,15 @@ for fitness_function in fitness_functions:
 
     function_fitness_values = []  # Store fitness values for each run
 
-    Individual.get_fitness = fitness_function[0]
+    problem = Problem(fitness=fitness_function[0], initialize=random_initialization, name=fitness_function[1])
 
     for _ in range(10):
         pop = Population(size=50,
                          optim="min",
                          sol_size=len(data),
                          valid_set=range(len(data)),
-                         replacement=True)
+                         replacement=True,
+                         problem=problem)
         start_time = time()
         best_individual, fitness_history = pop.evolve(pop=pop,
                                                      generations=300,
@@ -118,24 +123,11 @@ for fitness_function in fitness_functions:
                                                      plot=None)
         end_time = time()
 
-        # Initialize counts and metrics
-        num_requirements_met = 0
-        final_cost = 0
-        nutritional_values = [0] * 14
-
-        # Calculate nutritional values and other metrics
-        for index, quantity in enumerate(best_individual.representation):
-            for j in range(14):
-                nutritional_values[j] += data[index][j + 2] * quantity
-
-                if quantity > 0:
-                    final_cost += data[index][1] * quantity
-
-        for j, (nutrient, min_req) in enumerate(min_nutrients):
-            if min_nutrients[j][1] <= nutritional_values[j] <= max_nutrients[j][1]:
-                num_requirements_met += 1
-
-        final_fitness = best_individual.get_fitness()
+        # Metrics cached on the individual when its fitness was computed
+        cached_components(best_individual)
+        final_cost = best_individual.total_cost
+        num_requirements_met = best_individual.requirements_met
+        final_fitness = best_individual.fitness
         num_iterations = len(fitness_history)
         final_qnt_ingredients = sum(best_individual.representation)
 
@@ -148,15 +140,19 @@ for fitness_function in fitness_functions:
                     'Final Quantity': final_qnt_ingredients,
                     'Number of Requirements met': num_requirements_met}
 
-        results = pd.concat([results, pd.DataFrame(row_data, index=[0])], ignore_index=True)
+        rows.append(row_data)
+        run_ids.append(store.append(experiment='boxplot_fitness_function', config=row_data['Fitness Function'],
+                                    metrics=row_data, history=fitness_history))
 
         # Save fitness values at each iteration
         function_fitness_values.append(fitness_history)
 
     fitness_values.append(function_fitness_values)
 
+results = pd.DataFrame(rows)
 print(results.head(5))
-results.to_csv('results.csv', index=False)
+# this sweep for analytics.py and comparison.py
+print(f"Runs {run_ids[0]}-{run_ids[-1]} in results.db")
 
 
 
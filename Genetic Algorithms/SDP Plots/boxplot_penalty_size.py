@@ -3,7 +3,10 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 
-from charles import Population, Individual
+from charles import Population
+from problem import Problem
+from results_store import ResultsStore
+from fitness import cached_components
 from sdp_data import data, min_nutrients, max_nutrients
 from sdp_run import random_initialization
 
@@ -11,60 +14,30 @@ from selection import fps
 from mutation import random_mutation
 from crossover import multi_point_co
 
-results = pd.DataFrame(columns=['Penalty Size', 'Time Elapsed', 'Final Fitness', 'Final Cost',
-                                'Number of Iterations', 'Final Quantity', 'Number of Requirements met'])
+store = ResultsStore('results.db')
+# ids of the runs of this sweep: the store also keeps the runs of earlier sweeps
+run_ids = []
+rows = []
 
 penalty_sizes = [0.001, 0.1, 10, 10000, 50000, 100000, 500000]
 
 fitness_values = []
 
-Individual.initialize = random_initialization
-
 for penalty_size in penalty_sizes:
     print("Penalty Size:", penalty_size)
 
     elite_fitness_values = []  # Store fitness values for each run
 
-    def get_fitness(self):
-        """A fitness function that returns the
-        price of the food if it meets the requirements, otherwise the fitness gets a penalty
-        """
-        total_cost = 0
-        nutritional_values = [0] * 14  # Initialize nutritional values list with 0s
-
-        for index, quantity in enumerate(self.representation):
-            total_cost += quantity * data[index][1]  # Accessing the price of the ingredient at the given index
-            for i in range(14):
-                nutritional_values[i] +=quantity + data[index][i + 2]  # Accessing and accumulating nutritional values
-
-        # Calculate penalty for not meeting the nutritional requirements
-
-        penalty = 0
-
-        #min nutrients
-        for i in range(len(min_nutrients)):
-            if nutritional_values[i] < min_nutrients[i][1]:
-                nutrient_range = max_nutrients[i][1] - min_nutrients[i][1]
-                nutrient_penalty = (min_nutrients[i][1] - nutritional_values[i]) / nutrient_range
-                penalty += nutrient_penalty * penalty_size  # Apply a penalty for each nutrient bellow requirement
-
-        #max nutrients
-        for i in range(len(max_nutrients)):
-            if nutritional_values[i] > max_nutrients[i][1]:
-                nutrient_range = max_nutrients[i][1] - min_nutrients[i][1]
-                nutrient_penalty = (nutritional_values[i] - max_nutrients[i][1]) / nutrient_range
-                penalty += nutrient_penalty * 5  # Apply a penalty for each nutrient above requirement
-
-        return total_cost + penalty
-
-    Individual.get_fitness = get_fitness  # Monkey patch the get_fitness method
+    # price of the food plus the penalties, with this penalty for nutrients below the minimum
+    problem = Problem(initialize=random_initialization, under_penalty=penalty_size)
 
     for _ in range(3):
         pop = Population(size=10,
                          optim="min",
                          sol_size=len(data),
                          valid_set=range(len(data)),
-                         replacement=True)
+                         replacement=True,
+                         problem=problem)
         start_time = time()
         best_individual, fitness_history = pop.evolve(pop=pop,
                                                      generations=100,
@@ -77,24 +50,11 @@ for penalty_size in penalty_sizes:
                                                      plot=None)
         end_time = time()
 
-        # Initialize counts and metrics
-        num_requirements_met = 0
-        final_cost = 0
-        nutritional_values = [0] * 14
-
-        # Calculate nutritional values and other metrics
-        for index, quantity in enumerate(best_individual.representation):
-            for j in range(14):
-                nutritional_values[j] += data[index][j + 2] * quantity
-
-                if quantity > 0:
-                    final_cost += data[index][1] * quantity
-
-        for j, (nutrient, min_req) in enumerate(min_nutrients):
-            if min_nutrients[j][1] <= nutritional_values[j] <= max_nutrients[j][1]:
-                num_requirements_met += 1
-
-        final_fitness = best_individual.get_fitness()  
+        # Metrics cached on the individual when its fitness was computed
+        cached_components(best_individual)
+        final_cost = best_individual.total_cost
+        num_requirements_met = best_individual.requirements_met
+        final_fitness = best_individual.fitness
         num_iterations = len(fitness_history)
         final_qnt_ingredients = sum(best_individual.representation)
 
@@ -107,15 +67,19 @@ for penalty_size in penalty_sizes:
                     'Final Quantity': final_qnt_ingredients,
                     'Number of Requirements met': num_requirements_met}
 
-        results = pd.concat([results, pd.DataFrame(row_data, index=[0])], ignore_index=True)
+        rows.append(row_data)
+        run_ids.append(store.append(experiment='boxplot_penalty_size', config=row_data['Penalty Size'],
+                                    metrics=row_data, history=fitness_history))
 
         # Save fitness values at each iteration
         elite_fitness_values.append(fitness_history)
 
     fitness_values.append(elite_fitness_values)
 
+results = pd.DataFrame(rows)
 print(results.head(5))
-results.to_csv('results.csv', index=False)
+# this sweep for analytics.py and comparison.py
+print(f"Runs {run_ids[0]}-{run_ids[-1]} in results.db")
 
 # List of metrics you want to observe
 metrics = ['Time Elapsed', 'Final Fitness', 'Final Cost', 'Number of Iterations', 'Final Quantity', 'Number of Requirements met']
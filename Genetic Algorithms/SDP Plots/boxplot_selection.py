@@ -4,6 +4,9 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 
 from charles import Population, Individual
+from results_store import ResultsStore
+from comparison import compare, print_comparison
+from fitness import cached_components
 from sdp_data import data, min_nutrients, max_nutrients
 from sdp_run import get_fitness
 
@@ -12,9 +15,10 @@ from selection import fps, ranking_selection, tournament_selection
 from mutation import random_mutation
 from crossover import single_point_co
 
-results = pd.DataFrame(columns=['Selection Method', 'Time Elapsed', 'Final Fitness',
-                                'Num Iterations', 'Final Num Ingredients', 'Num Requirements Met',
-                                'Num Requirements Unmet'])
+store = ResultsStore('results.db')
+# ids of the runs of this sweep: the store also keeps the runs of earlier sweeps
+run_ids = []
+rows = []
 
 # Your list of selection methods
 selection_methods = [fps, ranking_selection, tournament_selection]
@@ -43,27 +47,11 @@ for i in range(3):
                    plot=None)
         end_time = time()
 
-        # Initialize counts
-        num_requirements_met = 0
-        num_requirements_unmet = 0
-        final_cost=0
-
-        # Calculate nutritional values of the best individual
-        nutritional_values = [0] * 14  # Initialize nutritional values list with 0s
-        for index, quantity in enumerate(best_individual.representation):
-            for j in range(14):
-                nutritional_values[j] += data[index][j + 2] * quantity  # Accessing and accumulating nutritional values
-
-                if quantity > 0:
-                    final_cost += data[index][1] * quantity # Accessing the price of the ingredient at the given index
-
-        # Check requirements
-        for j, (nutrient, min_req) in enumerate(min_nutrients):
-            if min_nutrients[j][1] <= nutritional_values[j] <= max_nutrients[j][1]:
-                num_requirements_met += 1
-
-        # Calculate other metrics here
-        final_fitness = best_individual.get_fitness()
+        # Metrics cached on the individual when its fitness was computed
+        cached_components(best_individual)
+        final_cost = best_individual.total_cost
+        num_requirements_met = best_individual.requirements_met
+        final_fitness = best_individual.fitness
         num_iterations = len(fitness_history)
         final_qnt_ingredients = sum(best_individual.representation)
 
@@ -76,16 +64,21 @@ for i in range(3):
             'Final Quantity': final_qnt_ingredients,
             'Number of Requirements met': num_requirements_met}
         
-        results = pd.concat([results, pd.DataFrame(row_data, index=[0])], ignore_index=True)
+        rows.append(row_data)
+        run_ids.append(store.append(experiment='boxplot_selection', config=row_data['Selection Method'],
+                                    metrics=row_data, history=fitness_history))
 
+results = pd.DataFrame(rows)
 print(results.head(5))
 
-results.to_csv('results.csv', index=False)
-
-df = pd.read_csv('results.csv')
+df = store.runs(experiment='boxplot_selection', ids=run_ids)
 
 print(df.head(5))
 
+# Ranked table of the selection methods: bootstrap CIs, rank tests and A12 effect sizes
+table, pairs = compare(results, metric='Final Fitness', config='Selection Method')
+print_comparison(table, pairs)
+
 # List of metrics you want to observe
 metrics = ['Time Elapsed', 'Final Fitness', 'Final Cost', 'Number of Iterations', 'Final Quantity', 'Number of Requirements met']
 
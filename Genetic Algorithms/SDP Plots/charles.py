@@ -1,15 +1,34 @@
-from utils import print_nutrition
 from random import randint,  uniform, randrange
+import numpy as np
+
+
+def mean_l1_distance(population, pairs=100):
+    """Population diversity: mean L1 distance between randomly sampled pairs of individuals.
+    Estimated from a fixed number of pairs, so it costs O(pairs * genes) instead of O(P^2 * genes)
+    """
+    if len(population) < 2:
+        return 0.0
+    representations = np.array([individual.representation for individual in population], dtype=float)
+    first = np.random.randint(0, len(representations), pairs)
+    second = (first + np.random.randint(1, len(representations), pairs)) % len(representations)
+    return float(np.abs(representations[first] - representations[second]).sum(axis=1).mean())
+
 
 class Individual:
-    def __init__(self, representation=None):
-    
+    def __init__(self, representation=None, fitness=None, problem=None):
+        # problem: a problem.Problem with the fitness and initializer; without it the
+        # monkey patched get_fitness and initialize are used
+        self.problem = problem
+
         # Initialize the representation random
         if representation is None:
-            self.representation = self.initialize()
+            self.representation = self.initialize() if problem is None else problem.initialize(self)
         else:
             self.representation = representation
-        self.fitness = self.get_fitness()
+        # fitness can be given when it was already computed for the whole population at once
+        if fitness is None:
+            fitness = self.get_fitness() if problem is None else problem.get_fitness(self)
+        self.fitness = fitness
 
     def get_fitness(self):
         raise Exception("You need to monkey patch the fitness path.")
@@ -31,17 +50,56 @@ class Individual:
 
 
 class Population:
-    def __init__(self, size, optim, **kwargs):
+    def __init__(self, size, optim, archive=None, seed_fraction=0.0, initial=None, problem=None,
+                 initial_fitness=None, **kwargs):
+        """archive: a hall_of_fame.HallOfFame; seed_fraction of the individuals start from its best diets.
+        initial: representations (e.g. a matrix from initialization.py) for the next individuals.
+        The rest are initialized as usual.
+        problem: a problem.Problem given to every individual of this population (None to use the
+        monkey patched Individual methods)
+        initial_fitness: fitness of the initial representations when it is already known
+        (e.g. re-scored by warm_start.py), so they are not evaluated again"""
         self.individuals = []
         self.size = size
         self.optim = optim
-        for _ in range(size):
+        self.problem = problem
+        seeds = archive.seeds(int(size * seed_fraction), problem) if archive is not None else []
+        known = [None] * len(seeds)
+        if initial is not None:
+            seeds = seeds + np.asarray(initial).tolist()
+            known = known + (list(initial_fitness) if initial_fitness is not None else [None] * len(initial))
+        seeds = seeds[:size]
+        for representation, fitness in zip(seeds, known):
+            self.individuals.append(
+                Individual(representation=representation, fitness=fitness, problem=problem)
+            )
+        for _ in range(size - len(seeds)):
             self.individuals.append(
-                Individual()
+                Individual(problem=problem)
             )
 
-    def evolve(self, pop, generations, select, mutate, mutation_rate, crossover, elite_size, no_improvement_threshold, plot):
+    def evolve(self, pop, generations, select, mutate, mutation_rate, crossover, elite_size, no_improvement_threshold, plot,
+               duplicates=None, duplicate_mutations=5, diversity=mean_l1_distance, log=None, evaluate=None,
+               adaptation=None, stop=None, niching=None):
+        """duplicates: what to do with an offspring whose genome is already in the new generation.
+        None keeps the copy (reusing the fitness already computed), "fresh" replaces it with a new
+        random individual and "mutate" with the copy mutated duplicate_mutations times.
+        diversity: function of the population reported every generation in self.history (None to skip)
+        log: a run_log.RunLog that gets every record of self.history as soon as it is computed
+        evaluate: batch fitness function (e.g. a parallel_fitness.ParallelEvaluator) that scores all the
+        offspring of a generation in one call instead of one Individual at a time. It must give the same
+        values as Individual.get_fitness; duplicates are then kept as they are
+        adaptation: a self_adaptation.SelfAdaptation; every individual then carries its own mutation
+        rates (individual.strategy), used instead of mutation_rate and the elem_mute_rate of mutate
+        stop: function without arguments checked every generation, the run ends when it returns True
+        (e.g. an evaluation or time budget). self.evaluations counts the offspring bred so far (the
+        individuals of every new generation but the elite), so a budget can be checked against it
+        niching: a niching.Niching; parents are then selected on the cleared or shared fitness and
+        the distinct niche leaders of the last population are kept in self.niche_leaders
+        """
         fitness_history = []
+        self.history = []
+        self.evaluations = 0
         generations_without_improvement = 0
         previous_best_fitness = float("inf")
 
@@ -50,6 +108,16 @@ class Population:
             sorted_population = sorted(pop, key=lambda x: x.fitness)
             current_best_fitness = sorted_population[0].fitness
             fitness_history.append(current_best_fitness)
+            self.history.append({
+                'best': current_best_fitness,
+                'mean': sum(individual.fitness for individual in pop) / len(pop),
+                'diversity': diversity(pop) if diversity is not None else None,
+                'duplicates': len(pop) - len({tuple(individual.representation) for individual in pop})
+            })
+            if adaptation is not None:
+                self.history[-1].update(adaptation.summary(pop))
+            if log is not None:
+                log.write(len(self.history) - 1, self.history[-1])
             
             # Check for improvements
             if current_best_fitness < previous_best_fitness:
@@ -61,38 +129,83 @@ class Population:
             # Stopping criterion
             if generations_without_improvement >= no_improvement_threshold:
                 break
+            if stop is not None and stop():
+                break
             
             # Elitism: Preserve the best individuals
             new_population.extend(sorted_population[:elite_size])
+            seen = {tuple(individual.representation): individual.fitness for individual in new_population}
 
             # Crossover and mutation
-            while len(new_population) < len(pop):
-                parent1 = select(pop)
-                parent2 = select(pop)
+            parents = pop
+            if niching is not None:
+                parents = niching.shared(pop)
+                self.history[-1]['niches'] = niching.niches
+            offspring = []
+            while len(new_population) + len(offspring) < len(pop):
+                parent1 = select(parents)
+                parent2 = select(parents)
                 offspring1, offspring2 = crossover(parent1.representation, parent2.representation)
                 
-                if uniform(0, 1) < mutation_rate:
-                    offspring1 = mutate(individual=offspring1)
-                if uniform(0, 1) < mutation_rate:
-                    offspring2 = mutate(individual=offspring2)
-                
-
-                new_population.append(Individual(representation=offspring1))
-                new_population.append(Individual(representation=offspring2))
+                if adaptation is None:
+                    if uniform(0, 1) < mutation_rate:
+                        offspring1 = mutate(individual=offspring1)
+                    if uniform(0, 1) < mutation_rate:
+                        offspring2 = mutate(individual=offspring2)
+                    children = [(offspring1, None), (offspring2, None)]
+                else:
+                    children = [adaptation.mutate(mutate, child, parent1, parent2) for child in (offspring1, offspring2)]
+
+                for representation, strategy in children:
+                    if evaluate is None:
+                        individual = self.offspring(representation, seen, duplicates, mutate, duplicate_mutations)
+                        individual.strategy = strategy
+                        new_population.append(individual)
+                    else:
+                        offspring.append((representation, strategy))
+
+            if offspring:
+                fitness_values = evaluate(np.array([representation for representation, _ in offspring], dtype=float))
+                for (representation, strategy), fitness in zip(offspring, fitness_values):
+                    individual = Individual(representation=representation, fitness=float(fitness), problem=self.problem)
+                    individual.strategy = strategy
+                    new_population.append(individual)
             
             # Update population
             pop.individuals = new_population
+            self.evaluations += len(new_population) - min(elite_size, len(sorted_population))
 
         # Get the best solution and its fitness
         best_solution = sorted(pop, key=lambda x: x.fitness)[0]
+        if niching is not None:
+            self.niche_leaders = niching.leaders(pop)
         
         if plot is not None:
+            # reporting (matplotlib, pandas) is only imported when it is used
+            from utils import print_nutrition
             plot(fitness_history)
             print(best_solution)
             print_nutrition(best_solution)
 
         return best_solution, fitness_history
 
+    def offspring(self, representation, seen, duplicates, mutate, duplicate_mutations):
+        """Individual for a new genome; seen maps the genomes already in the new generation to their fitness"""
+        key = tuple(representation)
+        if key not in seen:
+            individual = Individual(representation=representation, problem=self.problem)
+        elif duplicates == "fresh":
+            individual = Individual(problem=self.problem)
+        elif duplicates == "mutate":
+            for _ in range(duplicate_mutations):
+                representation = mutate(individual=representation)
+            individual = Individual(representation=representation, problem=self.problem)
+        else:
+            # A copy: no need to evaluate it again
+            return Individual(representation=representation, fitness=seen[key], problem=self.problem)
+        seen.setdefault(tuple(individual.representation), individual.fitness)
+        return individual
+
     def __len__(self):
         return len(self.individuals)
 
@@ -0,0 +1,45 @@
+import subprocess
+import sys
+
+# Import-time budget of the core engine: a worker process that only evolves populations
+# must not pay for matplotlib, pandas or openpyxl. Run before committing changes to the
+# core modules: python check_import_time.py  (exits with status 1 when over budget)
+
+CORE_MODULES = ['charles', 'selection', 'crossover', 'mutation', 'fitness', 'sdp_run']
+FORBIDDEN = ['matplotlib', 'pandas', 'openpyxl', 'seaborn', 'sdp_data', 'utils']
+BUDGET_MS = 250
+
+
+def import_times(modules):
+    '''{module: cumulative import time in ms} from python -X importtime, in a fresh interpreter'''
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {', '.join(modules)}"],
+                            capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, name = line.split('|')
+        times[name.strip()] = int(cumulative_us) / 1000
+    return times
+
+
+if __name__ == '__main__':
+    # the first import may rebuild the diet_tables.npz cache from the spreadsheet
+    subprocess.run([sys.executable, '-c', 'import fitness'], check=True)
+
+    times = import_times(CORE_MODULES)
+    total = sum(times[module] for module in CORE_MODULES if module in times)
+    loaded = [module for module in FORBIDDEN if module in times]
+
+    for module in CORE_MODULES:
+        print(f"{module:<12} {times.get(module, 0):8.1f} ms")
+    print(f"{'total':<12} {total:8.1f} ms (budget {BUDGET_MS} ms)")
+
+    failed = False
+    if loaded:
+        print(f"FAIL: the core engine imports {', '.join(loaded)}")
+        failed = True
+    if total > BUDGET_MS:
+        print("FAIL: import time over budget")
+        failed = True
+    sys.exit(1 if failed else 0)
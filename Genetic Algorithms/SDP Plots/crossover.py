@@ -70,3 +70,13 @@ def geometric_co(parent1, parent2):
         o2.append(new_gene)    
 
     return o1, o2
+
+def day_crossover(p1, p2, days, crossover=uniform_co):
+    """Crossover of multi-day plans (meal_plan.py, one day's foods after the other) that keeps every
+    day whole: the days are the genes of crossover (uniform_co, single_point_co or multi_point_co).
+    Use it with functools.partial(day_crossover, days=7)"""
+    foods = len(p1) // days
+    days1 = [list(p1[d * foods:(d + 1) * foods]) for d in range(days)]
+    days2 = [list(p2[d * foods:(d + 1) * foods]) for d in range(days)]
+    o1, o2 = crossover(days1, days2)
+    return [q for day in o1 for q in day], [q for day in o2 for q in day]
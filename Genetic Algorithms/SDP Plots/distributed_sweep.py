@@ -0,0 +1,52 @@
+import sys
+from itertools import product
+
+from charles import Individual
+from sdp_run import get_fitness, random_initialization
+from results_store import ResultsStore
+from run_queue import Coordinator, start_local_workers
+
+from selection import fps, ranking_selection, tournament_selection
+from mutation import random_mutation, geometric_mutation, insert_delete_mutation
+from crossover import single_point_co, uniform_co, multi_point_co, arithmetic_co
+
+# Monkey Patching
+Individual.get_fitness = get_fitness
+Individual.initialize = random_initialization
+
+# The operator sweep, 10 seeds per combination, run by workers on any number of hosts.
+# On each worker host (same repository, in SDP Algorithm or SDP Plots):
+#     python run_queue.py worker <coordinator host>:50000
+# Everything on this machine, with 4 local workers:
+#     python distributed_sweep.py 4
+
+selection_methods = {'FPS': fps, 'Ranking': ranking_selection, 'Tournament': tournament_selection}
+mutation_methods = {'Random': random_mutation, 'Geometric': geometric_mutation, 'Insert-Delete': insert_delete_mutation}
+crossover_methods = {'Single Point': single_point_co, 'Uniform': uniform_co,
+                     'Multi Point': multi_point_co, 'Arithmetic': arithmetic_co}
+
+sweep = {}
+for (s_name, select), (m_name, mutate), (c_name, crossover) in product(selection_methods.items(),
+                                                                      mutation_methods.items(),
+                                                                      crossover_methods.items()):
+    sweep[f'{s_name} / {m_name} / {c_name}'] = {'pop_size': 50,
+                                                'select': select,
+                                                'mutate': mutate,
+                                                'mutation_rate': 0.5,
+                                                'crossover': crossover,
+                                                'elite_size': 6}
+
+if __name__ == '__main__':
+    local_workers = int(sys.argv[1]) if len(sys.argv) > 1 else 0
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else 50000
+
+    coordinator = Coordinator(sweep, ResultsStore('results.db'), experiment='distributed_sweep',
+                              seeds=range(10), generations=300, address=('', port))
+    coordinator.serve()
+    workers = start_local_workers(local_workers, port)
+    result = coordinator.run()
+
+    print(result['status'])
+    for failure in result['failed']:
+        print(f"{failure['task']['config']} seed {failure['task']['seed']} failed on {failure['worker']}:")
+        print(failure['error'])
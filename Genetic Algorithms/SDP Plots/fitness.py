@@ -0,0 +1,139 @@
+import os
+import numpy as np
+
+# The diet tables as arrays, so a whole population (one row per individual) is scored
+# with two matrix products instead of a loop over every food and nutrient.
+# They are cached in diet_tables.npz, so importing the fitness (e.g. in a worker process)
+# needs only NumPy: sdp_data (pandas + openpyxl) is imported only to rebuild the cache
+# when complete_diet.xlsx or sdp_data.py changed. The tables replaced by a rebuild are kept in
+# diet_tables.previous.npz, so warm_start.py can re-optimise for what changed.
+directory = os.path.dirname(os.path.abspath(__file__))
+TABLES_PATH = os.path.join(directory, 'diet_tables.npz')
+PREVIOUS_PATH = os.path.join(directory, 'diet_tables.previous.npz')
+SOURCES = [os.path.join(directory, 'complete_diet.xlsx'), os.path.join(directory, 'sdp_data.py')]
+
+
+def load_tables():
+    stamp = np.array([os.path.getmtime(path) for path in SOURCES])
+    try:
+        with np.load(TABLES_PATH) as cached:
+            if np.array_equal(cached['stamp'], stamp):
+                return {name: cached[name] for name in cached.files}
+    except (OSError, KeyError, ValueError):
+        pass
+
+    from sdp_data import data, min_nutrients, max_nutrients
+    tables = {'names': np.array([str(food[0]) for food in data]),
+              'prices': np.array([food[1] for food in data], dtype=float),
+              'nutrients': np.array([food[2:] for food in data], dtype=float),  # foods x 14 nutrients
+              'nutrient_names': np.array([name for name, _ in min_nutrients]),
+              'min_values': np.array([value for _, value in min_nutrients], dtype=float),
+              'max_values': np.array([value for _, value in max_nutrients], dtype=float),
+              'stamp': stamp}
+    # write then rename, so parallel workers never read a half-written cache
+    temporary = f'{TABLES_PATH}.{os.getpid()}.tmp'
+    with open(temporary, 'wb') as f:
+        np.savez(f, **tables)
+    if not current_stamp_is(stamp):
+        # another worker may have rebuilt the cache meanwhile: only older tables become the previous ones
+        try:
+            os.replace(TABLES_PATH, PREVIOUS_PATH)
+        except OSError:
+            pass
+    os.replace(temporary, TABLES_PATH)
+    return tables
+
+
+def current_stamp_is(stamp):
+    try:
+        with np.load(TABLES_PATH) as cached:
+            return np.array_equal(cached['stamp'], stamp)
+    except (OSError, KeyError, ValueError):
+        return False
+
+
+tables = load_tables()
+names = tables['names']
+prices = tables['prices']
+nutrients = tables['nutrients']
+nutrient_names = tables['nutrient_names']
+min_values = tables['min_values']
+max_values = tables['max_values']
+nutrient_range = max_values - min_values
+
+
+def fitness_components(population):
+    """Total cost and, per nutrient, how far below the minimum (under) and above the maximum (over)
+    every individual is, as a fraction of the nutrient's allowed range
+    """
+    population = np.asarray(population, dtype=float)
+    total_cost = population @ prices
+    under, over = violations(population @ nutrients)
+    return total_cost, under, over
+
+
+def violations(nutritional_values):
+    """Per nutrient, how far the totals are below the minimum (under) and above the maximum (over),
+    as a fraction of the nutrient's allowed range"""
+    under = np.maximum(min_values - nutritional_values, 0) / nutrient_range
+    over = np.maximum(nutritional_values - max_values, 0) / nutrient_range
+    return under, over
+
+
+def batch_fitness(population, under_penalty=500000, over_penalty=5):
+    """Vectorized version of sdp_run.get_fitness for a matrix of quantities (individuals x foods):
+    price of the food plus a penalty for each nutrient below the minimum and above the maximum
+    """
+    total_cost, under, over = fitness_components(population)
+    return total_cost + under.sum(axis=-1) * under_penalty + over.sum(axis=-1) * over_penalty
+
+
+def evaluate(individual, under_penalty=500000, over_penalty=5):
+    """Fitness of one individual (same value as batch_fitness) that also keeps the intermediates on it:
+    total_cost, nutritional_values (14 totals), deficit and excess per nutrient (in the nutrient's unit),
+    requirements_met (nutrients between minimum and maximum) and num_ingredients (foods with quantity > 0)
+    """
+    representation = np.asarray(individual.representation, dtype=float)
+    individual.total_cost = float(representation @ prices)
+    individual.nutritional_values = representation @ nutrients
+    individual.deficit = np.maximum(min_values - individual.nutritional_values, 0)
+    individual.excess = np.maximum(individual.nutritional_values - max_values, 0)
+    individual.requirements_met = int(((individual.deficit == 0) & (individual.excess == 0)).sum())
+    individual.num_ingredients = int((representation > 0).sum())
+
+    penalty = (individual.deficit / nutrient_range).sum() * under_penalty \
+        + (individual.excess / nutrient_range).sum() * over_penalty
+    return float(individual.total_cost + penalty)
+
+
+def cached_components(individual):
+    """The individual with the intermediates of evaluate, computing them only when the
+    fitness function that scored it did not keep them. An individual with a problem gets the
+    components of its problem (e.g. per period for a meal plan)"""
+    if hasattr(individual, 'total_cost'):
+        return individual
+    problem = getattr(individual, 'problem', None)
+    if problem is not None:
+        return problem.components(individual)
+    if len(individual.representation) != len(prices):
+        raise ValueError(f"A genome of {len(individual.representation)} genes has no components under the "
+                         f"{len(prices)}-food tables; give the individual its problem")
+    evaluate(individual)
+    return individual
+
+
+def penalty_scores(components, under_penalties, over_penalties=5):
+    """Fitness of every individual under K penalty configurations in one step (individuals x K).
+    components is the output of fitness_components, computed once for the population.
+    Each penalty is a scalar, a vector with one weight per configuration (K) or a matrix
+    with one weight per configuration and nutrient (K x 14)
+    """
+    total_cost, under, over = components
+
+    def weighted(violations, weights):
+        weights = np.asarray(weights, dtype=float)
+        if weights.ndim == 2:
+            return violations @ weights.T
+        return violations.sum(axis=1)[:, None] * np.atleast_1d(weights)[None, :]
+
+    return total_cost[:, None] + weighted(under, under_penalties) + weighted(over, over_penalties)
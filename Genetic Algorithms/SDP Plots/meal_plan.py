@@ -0,0 +1,125 @@
+from random import randrange
+
+import numpy as np
+
+import fitness as diet_tables
+from problem import Problem
+
+# Multi-day meal plans: the genome holds the quantities of the 58 foods for every day, day after
+# day (days x foods flattened, so it hashes, copies and mutates like a single day's genome).
+# The nutrient totals are constrained per period of `period` days (7 for weekly totals, 1 for
+# the daily limits of the single-day problem) and a food may appear at most max_consecutive days
+# in a row. A whole population is scored at once: a single einsum contracts
+# population x days x foods with foods x nutrients and days x periods.
+# Crossover and mutation that keep days whole: crossover.day_crossover, mutation.day_mutation and
+# mutation.swap_days_mutation. The reports (components, describe) are per period and per day.
+
+
+def period_matrix(days, period):
+    '''(days x periods) 0/1 matrix assigning every day to its period; the last period may be shorter'''
+    periods = -(-days // period)
+    matrix = np.zeros((days, periods))
+    matrix[np.arange(days), np.arange(days) // period] = 1
+    return matrix
+
+
+def consecutive_violations(plans, max_consecutive):
+    '''For every plan (population x days x foods), the number of windows of max_consecutive + 1
+    consecutive days in which the same food appears every day'''
+    present = (plans > 0).astype(np.int32)
+    days = present.shape[1]
+    if max_consecutive is None or days <= max_consecutive:
+        return np.zeros(len(plans))
+    counts = np.concatenate([np.zeros_like(present[:, :1]), np.cumsum(present, axis=1)], axis=1)
+    window = counts[:, max_consecutive + 1:] - counts[:, :days - max_consecutive]
+    return (window == max_consecutive + 1).sum(axis=(1, 2)).astype(float)
+
+
+class MealPlanProblem(Problem):
+    def __init__(self, days=7, period=7, max_consecutive=None, variety_penalty=100, under_penalty=500000,
+                 over_penalty=5, cache_size=100000, name=None):
+        '''days: length of the plan. period: days whose nutrient totals must lie between the daily
+        minimum and maximum times the number of days (7: weekly totals, 1: every day).
+        max_consecutive: most days in a row a food may appear (None for no variety constraint);
+        every longer run costs variety_penalty per extra day'''
+        super().__init__(under_penalty=under_penalty, over_penalty=over_penalty, cache_size=cache_size,
+                         name=name or f'{days}-day meal plan')
+        self.days = days
+        self.foods = len(diet_tables.prices)
+        self.period = period
+        self.max_consecutive = max_consecutive
+        self.variety_penalty = variety_penalty
+        self.periods = period_matrix(days, period)
+        self.period_days = self.periods.sum(axis=0)
+
+    @property
+    def genome_size(self):
+        return self.days * self.foods
+
+    def initialize(self, individual):
+        # every day drawn as sdp_run.random_initialization
+        return [randrange(201) for _ in range(self.days * self.foods)]
+
+    def plans(self, population):
+        '''(population x days x foods) array of flat genomes'''
+        return np.asarray(population, dtype=float).reshape(-1, self.days, self.foods)
+
+    def plan_components(self, population):
+        '''Total cost, nutrient totals per period (population x periods x nutrients) and the
+        number of variety violations of every plan'''
+        plans = self.plans(population)
+        total_cost = np.einsum('pdf,f->p', plans, diet_tables.prices)
+        totals = np.einsum('pdf,fn,dw->pwn', plans, diet_tables.nutrients, self.periods, optimize=True)
+        return total_cost, totals, consecutive_violations(plans, self.max_consecutive)
+
+    def batch(self, population):
+        '''Fitness of every row of a (individuals x days * foods) matrix'''
+        total_cost, totals, variety = self.plan_components(population)
+        scale = self.period_days[:, None]
+        under = np.maximum(diet_tables.min_values * scale - totals, 0) / (diet_tables.nutrient_range * scale)
+        over = np.maximum(totals - diet_tables.max_values * scale, 0) / (diet_tables.nutrient_range * scale)
+        return (total_cost + under.sum(axis=(1, 2)) * self.under_penalty
+                + over.sum(axis=(1, 2)) * self.over_penalty + variety * self.variety_penalty)
+
+    def score(self, individual):
+        # caching is left to Problem.get_fitness
+        return float(self.batch([individual.representation])[0])
+
+    def components(self, individual):
+        '''The individual with the components of the reports, per period where the single-day problem
+        has them per day: nutritional_values, deficit and excess are (periods x nutrients),
+        requirements_met counts the (period, nutrient) pairs within bounds, num_ingredients the foods
+        used on any day, variety_violations as in batch'''
+        if hasattr(individual, 'total_cost'):
+            return individual
+        if len(individual.representation) != self.genome_size:
+            raise ValueError(f"{self.name} expects {self.genome_size} genes, got {len(individual.representation)}")
+        total_cost, totals, variety = self.plan_components([individual.representation])
+        scale = self.period_days[:, None]
+        individual.total_cost = float(total_cost[0])
+        individual.nutritional_values = totals[0]
+        individual.deficit = np.maximum(diet_tables.min_values * scale - totals[0], 0)
+        individual.excess = np.maximum(totals[0] - diet_tables.max_values * scale, 0)
+        individual.requirements_met = int(((individual.deficit == 0) & (individual.excess == 0)).sum())
+        individual.num_ingredients = int((self.plans([individual.representation])[0] > 0).any(axis=0).sum())
+        individual.variety_violations = int(variety[0])
+        return individual
+
+    def describe(self, individual):
+        '''Fitness, cost and requirements met per period, then one line per day: cost and number of
+        foods, then the variety violations of the plan'''
+        self.components(individual)
+        print('Fitness:', individual.fitness)
+        print(f"Total cost: {individual.total_cost}")
+        print(f"Foods used: {individual.num_ingredients}")
+        met = (individual.deficit == 0) & (individual.excess == 0)
+        for period, period_met in enumerate(met):
+            print(f"Period {period + 1} ({int(self.period_days[period])} days): "
+                  f"{int(period_met.sum())}/{len(period_met)} requirements met")
+        plan = self.plans([individual.representation])[0]
+        for day, quantities in enumerate(plan):
+            print(f"Day {day + 1:2d}: cost {quantities @ diet_tables.prices:8.2f}, {int((quantities > 0).sum())} foods")
+        print(f"Variety violations: {individual.variety_violations}")
+
+    def archive_fitness(self, genomes):
+        return self.batch(genomes)
@@ -1,4 +1,4 @@
-from random import randint, choice, random
+from random import randint, choice, random, sample
 
 #changes the quantity of the food
 def random_mutation(individual, elem_mute_rate=0.2):
@@ -50,4 +50,30 @@ def insert_delete_mutation(individual):
 
     return mutated_individual
 
+# multi-day plans (meal_plan.py): the foods of one day after the other
+def day_mutation(individual, days, mutate=random_mutation, day_mute_rate=0.3, elem_mute_rate=None):
+    """Mutates each day of the plan with mutate (e.g. random_mutation) with probability day_mute_rate.
+    Use it with functools.partial(day_mutation, days=7)"""
+    foods = len(individual) // days
+    mutated_individual = list(individual)
+    for d in range(days):
+        if random() < day_mute_rate:
+            day = mutated_individual[d * foods:(d + 1) * foods]
+            if elem_mute_rate is None:
+                day = mutate(individual=day)
+            else:
+                day = mutate(individual=day, elem_mute_rate=elem_mute_rate)
+            mutated_individual[d * foods:(d + 1) * foods] = day
+    return mutated_individual
 
+def swap_days_mutation(individual, days):
+    """Swaps two days of the plan, which breaks up runs of the same food on consecutive days.
+    A one-day plan is returned unchanged"""
+    foods = len(individual) // days
+    mutated_individual = list(individual)
+    if days < 2:
+        return mutated_individual
+    first, second = sample(range(days), 2)
+    mutated_individual[first * foods:(first + 1) * foods] = individual[second * foods:(second + 1) * foods]
+    mutated_individual[second * foods:(second + 1) * foods] = individual[first * foods:(first + 1) * foods]
+    return mutated_individual
@@ -4,6 +4,9 @@ import numpy as np
 import matplotlib.pyplot as plt
 
 from charles import Population, Individual
+from results_store import ResultsStore
+from analytics import pad_histories
+from fitness import cached_components
 from sdp_data import data, min_nutrients, max_nutrients
 from sdp_run import get_fitness
 
@@ -11,8 +14,10 @@ from selection import fps
 from mutation import random_mutation
 from crossover import single_point_co, uniform_co, multi_point_co, arithmetic_co, geometric_co
 
-results = pd.DataFrame(columns=['Crossover Operator', 'Time Elapsed', 'Final Fitness', 'Final Cost',
-                                'Number of Iterations', 'Final Quantity', 'Number of Requirements met'])
+store = ResultsStore('results.db')
+# ids of the runs of this sweep: the store also keeps the runs of earlier sweeps
+run_ids = []
+rows = []
 
 crossover_operators =[single_point_co, uniform_co, multi_point_co, arithmetic_co, geometric_co]
 crossover_names= ['Single Point', 'Uniform', 'Multi Point', 'Arithmetic', 'Geometric']
@@ -46,24 +51,11 @@ for i in range(5):
                                                      plot=None)
         end_time = time()
 
-        # Initialize counts and metrics
-        num_requirements_met = 0
-        final_cost = 0
-        nutritional_values = [0] * 15
-
-        # Calculate nutritional values and other metrics
-        for index, quantity in enumerate(best_individual.representation):
-            for j in range(15):
-                nutritional_values[j] += data[index][j + 2] * quantity
-
-                if quantity > 0:
-                    final_cost += data[index][1] * quantity
-
-        for j, (nutrient, min_req) in enumerate(min_nutrients):
-            if min_nutrients[j][1] <= nutritional_values[j] <= max_nutrients[j][1]:
-                num_requirements_met += 1
-
-        final_fitness = best_individual.get_fitness()
+        # Metrics cached on the individual when its fitness was computed
+        cached_components(best_individual)
+        final_cost = best_individual.total_cost
+        num_requirements_met = best_individual.requirements_met
+        final_fitness = best_individual.fitness
         num_iterations = len(fitness_history)
         final_qnt_ingredients = sum(best_individual.representation)
 
@@ -76,7 +68,9 @@ for i in range(5):
                     'Final Quantity': final_qnt_ingredients,
                     'Number of Requirements met': num_requirements_met}
 
-        results = pd.concat([results, pd.DataFrame(row_data, index=[0])], ignore_index=True)
+        rows.append(row_data)
+        run_ids.append(store.append(experiment='plot_crossover', config=row_data['Crossover Operator'],
+                                    metrics=row_data, history=fitness_history))
 
         # Save fitness values at each iteration
         if crossover_operators[i] == single_point_co:
@@ -90,10 +84,10 @@ for i in range(5):
         elif crossover_operators[i] == geometric_co:
             geometric_fitness_values.append(fitness_history)
 
+results = pd.DataFrame(rows)
 print(results.head(5))
-results.to_csv('results.csv', index=False)
 
-df = pd.read_csv('results.csv')
+df = store.runs(experiment='plot_crossover', ids=run_ids)
 print(df.head(5))
 
 # Combine fitness values 
@@ -106,23 +100,23 @@ metrics = ['Time Elapsed', 'Final Fitness', 'Final Cost', 'Number of Iterations'
 fig, ax = plt.subplots(figsize=(10, 6))
 
 # Calculate the mean fitness values 
-single_mean_fitness = np.mean(single_fitness_values, axis=0)
-uniform_mean_fitness = np.mean(uniform_fitness_values, axis=0)
-multi_mean_fitness = np.mean(multi_fitness_values, axis=0)
-arithmetic_mean_fitness = np.mean(arithmetic_fitness_values, axis=0)
-geometric_mean_fitness = np.mean(geometric_fitness_values, axis=0)
+single_mean_fitness = np.nanmean(pad_histories(single_fitness_values), axis=0)
+uniform_mean_fitness = np.nanmean(pad_histories(uniform_fitness_values), axis=0)
+multi_mean_fitness = np.nanmean(pad_histories(multi_fitness_values), axis=0)
+arithmetic_mean_fitness = np.nanmean(pad_histories(arithmetic_fitness_values), axis=0)
+geometric_mean_fitness = np.nanmean(pad_histories(geometric_fitness_values), axis=0)
 
 # Calculate the minimum and maximum fitness values 
-single_min_fitness = np.min(single_fitness_values, axis=0)
-single_max_fitness = np.max(single_fitness_values, axis=0)
-uniform_min_fitness = np.min(uniform_fitness_values, axis=0)
-uniform_max_fitness = np.max(uniform_fitness_values, axis=0)
-multi_min_fitness = np.min(multi_fitness_values, axis=0)
-multi_max_fitness = np.max(multi_fitness_values, axis=0)
-arithmetic_min_fitness = np.min(arithmetic_fitness_values, axis=0)
-arithmetic_max_fitness = np.max(arithmetic_fitness_values, axis=0)
-geometric_min_fitness = np.min(geometric_fitness_values, axis=0)
-geometric_max_fitness = np.max(geometric_fitness_values, axis=0)
+single_min_fitness = np.nanmin(pad_histories(single_fitness_values), axis=0)
+single_max_fitness = np.nanmax(pad_histories(single_fitness_values), axis=0)
+uniform_min_fitness = np.nanmin(pad_histories(uniform_fitness_values), axis=0)
+uniform_max_fitness = np.nanmax(pad_histories(uniform_fitness_values), axis=0)
+multi_min_fitness = np.nanmin(pad_histories(multi_fitness_values), axis=0)
+multi_max_fitness = np.nanmax(pad_histories(multi_fitness_values), axis=0)
+arithmetic_min_fitness = np.nanmin(pad_histories(arithmetic_fitness_values), axis=0)
+arithmetic_max_fitness = np.nanmax(pad_histories(arithmetic_fitness_values), axis=0)
+geometric_min_fitness = np.nanmin(pad_histories(geometric_fitness_values), axis=0)
+geometric_max_fitness = np.nanmax(pad_histories(geometric_fitness_values), axis=0)
 
 # Plot the line chart and fill the range for single point
 ax.plot(range(len(single_mean_fitness)), single_mean_fitness, label='Single Point')
@@ -4,22 +4,26 @@ import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 
-from charles import Population, Individual
+from charles import Population
+from problem import Problem
+from results_store import ResultsStore
+from analytics import pad_histories
+from fitness import cached_components
 from sdp_data import data, min_nutrients, max_nutrients
-from sdp_run import get_fitness, random_initialization, initialize_latin_hypercube, initialize_goodfoods
+from sdp_run import random_initialization, initialize_latin_hypercube, initialize_goodfoods
 
 from selection import fps
 from mutation import random_mutation
 from crossover import single_point_co
 
-results = pd.DataFrame(columns=['Initialization Method', 'Time Elapsed', 'Final Fitness', 'Final Cost',
-                                'Number of Iterations', 'Final Quantity', 'Number of Requirements met'])
+store = ResultsStore('results.db')
+# ids of the runs of this sweep: the store also keeps the runs of earlier sweeps
+run_ids = []
+rows = []
 
 init_methods =[random_initialization, initialize_latin_hypercube, initialize_goodfoods]
 init_names= ['Random', 'Latin Hypercube Sampling', 'Good Foods']
 
-Individual.get_fitness = get_fitness
-
 # Lists to store fitness values for each iteration
 random_fitness_values = []
 latin_fitness_values = []
@@ -27,13 +31,14 @@ goodfoods_fitness_values = []
 
 for i in range(3):
     print(init_names[i])
-    Individual.initialize = init_methods[i]
+    problem = Problem(initialize=init_methods[i], name=init_names[i])
     for _ in range(50):
         pop = Population(size=50,
                          optim="min",
                          sol_size=len(data),
                          valid_set=range(len(data)),
-                         replacement=True)
+                         replacement=True,
+                         problem=problem)
         start_time = time()
         best_individual, fitness_history = pop.evolve(pop=pop,
                                                      generations=300,
@@ -46,24 +51,11 @@ for i in range(3):
                                                      plot=None)
         end_time = time()
 
-        # Initialize counts and metrics
-        num_requirements_met = 0
-        final_cost = 0
-        nutritional_values = [0] * 15
-
-        # Calculate nutritional values and other metrics
-        for index, quantity in enumerate(best_individual.representation):
-            for j in range(15):
-                nutritional_values[j] += data[index][j + 2] * quantity
-
-                if quantity > 0:
-                    final_cost += data[index][1] * quantity
-
-        for j, (nutrient, min_req) in enumerate(min_nutrients):
-            if min_nutrients[j][1] <= nutritional_values[j] <= max_nutrients[j][1]:
-                num_requirements_met += 1
-
-        final_fitness = best_individual.get_fitness()
+        # Metrics cached on the individual when its fitness was computed
+        cached_components(best_individual)
+        final_cost = best_individual.total_cost
+        num_requirements_met = best_individual.requirements_met
+        final_fitness = best_individual.fitness
         num_iterations = len(fitness_history)
         final_qnt_ingredients = sum(best_individual.representation)
 
@@ -76,7 +68,9 @@ for i in range(3):
                     'Final Quantity': final_qnt_ingredients,
                     'Number of Requirements met': num_requirements_met}
 
-        results = pd.concat([results, pd.DataFrame(row_data, index=[0])], ignore_index=True)
+        rows.append(row_data)
+        run_ids.append(store.append(experiment='plot_initialization', config=row_data['Initialization Method'],
+                                    metrics=row_data, history=fitness_history))
 
         # Save fitness values at each iteration
         if init_methods[i] == random_initialization:
@@ -86,10 +80,10 @@ for i in range(3):
         elif init_methods[i] == initialize_goodfoods:
             goodfoods_fitness_values.append(fitness_history)
 
+results = pd.DataFrame(rows)
 print(results.head(5))
-results.to_csv('results.csv', index=False)
 
-df = pd.read_csv('results.csv')
+df = store.runs(experiment='plot_initialization', ids=run_ids)
 print(df.head(5))
 
 # List of metrics you want to observe
@@ -100,17 +94,17 @@ fig, ax = plt.subplots(figsize=(10, 6))
 
 
 # Calculate the mean fitness values 
-random_mean_fitness = np.mean(random_fitness_values, axis=0)
-latin_mean_fitness = np.mean(latin_fitness_values, axis=0)
-goodfoods_mean_fitness = np.mean(goodfoods_fitness_values, axis=0)
+random_mean_fitness = np.nanmean(pad_histories(random_fitness_values), axis=0)
+latin_mean_fitness = np.nanmean(pad_histories(latin_fitness_values), axis=0)
+goodfoods_mean_fitness = np.nanmean(pad_histories(goodfoods_fitness_values), axis=0)
 
 # Calculate the minimum and maximum fitness values 
-random_min_fitness = np.min(random_fitness_values, axis=0)
-random_max_fitness = np.max(random_fitness_values, axis=0)
-latin_min_fitness = np.min(latin_fitness_values, axis=0)
-latin_max_fitness = np.max(latin_fitness_values, axis=0)
-goodfoods_min_fitness = np.min(goodfoods_fitness_values, axis=0)
-goodfoods_max_fitness = np.max(goodfoods_fitness_values, axis=0)
+random_min_fitness = np.nanmin(pad_histories(random_fitness_values), axis=0)
+random_max_fitness = np.nanmax(pad_histories(random_fitness_values), axis=0)
+latin_min_fitness = np.nanmin(pad_histories(latin_fitness_values), axis=0)
+latin_max_fitness = np.nanmax(pad_histories(latin_fitness_values), axis=0)
+goodfoods_min_fitness = np.nanmin(pad_histories(goodfoods_fitness_values), axis=0)
+goodfoods_max_fitness = np.nanmax(pad_histories(goodfoods_fitness_values), axis=0)
 
 # Plot the line chart and fill the range for random
 ax.plot(range(len(random_mean_fitness)), random_mean_fitness, label='Random')
@@ -0,0 +1,69 @@
+from functools import partial
+from random import seed
+from time import perf_counter
+import numpy as np
+import matplotlib.pyplot as plt
+
+from charles import Population
+from meal_plan import MealPlanProblem
+from analytics import pad_histories
+
+from selection import tournament_selection
+from mutation import insert_delete_mutation, day_mutation
+from crossover import uniform_co, day_crossover
+
+# A week of meals with weekly nutrient totals and at most 3 days in a row of the same food:
+# crossover that swaps whole days against uniform crossover of single foods, on the same seeds.
+# Then the time of the batched einsum fitness against scoring the plans one at a time.
+
+days = 7
+generations = 300
+runs = 10
+problem = MealPlanProblem(days=days, period=7, max_consecutive=3)
+
+# insert_delete_mutation on every day: zero quantities are what break up runs of the same food
+mutate = partial(day_mutation, days=days, mutate=insert_delete_mutation, day_mute_rate=1)
+configs = {'Uniform (foods)': uniform_co,
+           'Uniform (whole days)': partial(day_crossover, days=days, crossover=uniform_co)}
+
+histories = {}
+best = {}
+for name, crossover in configs.items():
+    print(name)
+    histories[name] = []
+    for run_seed in range(runs):
+        seed(run_seed)
+        pop = Population(size=50, optim="min", problem=problem)
+        best_individual, fitness_history = pop.evolve(pop=pop, generations=generations, select=tournament_selection,
+                                                      mutation_rate=0.5, elite_size=2, no_improvement_threshold=1000,
+                                                      plot=None, evaluate=problem.batch, mutate=mutate,
+                                                      crossover=crossover)
+        histories[name].append(fitness_history)
+        if name not in best or best_individual.fitness < best[name].fitness:
+            best[name] = best_individual
+    print(f"median final fitness {np.median([history[-1] for history in histories[name]]):.1f}")
+    problem.describe(best[name])
+
+# Batched fitness against one plan at a time
+for plan_days in [7, 30]:
+    timing_problem = MealPlanProblem(days=plan_days, period=7, max_consecutive=3)
+    plans = np.random.randint(0, 201, (1000, plan_days * timing_problem.foods)).astype(float)
+    start_time = perf_counter()
+    timing_problem.batch(plans)
+    batched = perf_counter() - start_time
+    start_time = perf_counter()
+    for plan in plans:
+        timing_problem.batch(plan[None])
+    one_at_a_time = perf_counter() - start_time
+    print(f"{plan_days} days, 1000 plans: batched {batched * 1e3:.1f} ms, one at a time {one_at_a_time * 1e3:.1f} ms")
+
+fig, ax = plt.subplots(figsize=(10, 6))
+for name, fitness_values in histories.items():
+    mean_fitness = np.nanmean(pad_histories(fitness_values), axis=0)
+    ax.plot(range(len(mean_fitness)), mean_fitness, label=name)
+ax.set_yscale('log')
+ax.set_xlabel('Generations')
+ax.set_ylabel('Mean Best Fitness')
+ax.set_title(f'{days}-day Meal Plan: Crossover of Foods against Whole Days')
+ax.legend()
+plt.show()
@@ -4,6 +4,9 @@ import numpy as np
 import matplotlib.pyplot as plt
 
 from charles import Population, Individual
+from results_store import ResultsStore
+from analytics import pad_histories
+from fitness import cached_components
 from sdp_data import data, min_nutrients, max_nutrients
 from sdp_run import get_fitness
 
@@ -11,8 +14,10 @@ from selection import fps
 from mutation import random_mutation, geometric_mutation, insert_delete_mutation
 from crossover import single_point_co
 
-results = pd.DataFrame(columns=['Mutation Operator', 'Time Elapsed', 'Final Fitness', 'Final Cost',
-                                'Number of Iterations', 'Final Quantity', 'Number of Requirements met'])
+store = ResultsStore('results.db')
+# ids of the runs of this sweep: the store also keeps the runs of earlier sweeps
+run_ids = []
+rows = []
 
 mutation_operators =[random_mutation, geometric_mutation, insert_delete_mutation]
 mutation_names= ['Random', 'Geometric', 'Insert Delete']
@@ -44,24 +49,11 @@ for i in range(3):
                                                      plot=None)
         end_time = time()
 
-        # Initialize counts and metrics
-        num_requirements_met = 0
-        final_cost = 0
-        nutritional_values = [0] * 14
-
-        # Calculate nutritional values and other metrics
-        for index, quantity in enumerate(best_individual.representation):
-            for j in range(14):
-                nutritional_values[j] += data[index][j + 2] * quantity
-
-                if quantity > 0:
-                    final_cost += data[index][1] * quantity
-
-        for j, (nutrient, min_req) in enumerate(min_nutrients):
-            if min_nutrients[j][1] <= nutritional_values[j] <= max_nutrients[j][1]:
-                num_requirements_met += 1
-
-        final_fitness = best_individual.get_fitness()
+        # Metrics cached on the individual when its fitness was computed
+        cached_components(best_individual)
+        final_cost = best_individual.total_cost
+        num_requirements_met = best_individual.requirements_met
+        final_fitness = best_individual.fitness
         num_iterations = len(fitness_history)
         final_qnt_ingredients = sum(best_individual.representation)
 
@@ -74,7 +66,9 @@ for i in range(3):
                     'Final Quantity': final_qnt_ingredients,
                     'Number of Requirements met': num_requirements_met}
 
-        results = pd.concat([results, pd.DataFrame(row_data, index=[0])], ignore_index=True)
+        rows.append(row_data)
+        run_ids.append(store.append(experiment='plot_mutation', config=row_data['Mutation Operator'],
+                                    metrics=row_data, history=fitness_history))
 
         # Save fitness values at each iteration
         if mutation_operators[i] == random_mutation:
@@ -85,10 +79,10 @@ for i in range(3):
             insdel_fitness_values.append(fitness_history)
 
 
+results = pd.DataFrame(rows)
 print(results.head(5))
-results.to_csv('results.csv', index=False)
 
-df = pd.read_csv('results.csv')
+df = store.runs(experiment='plot_mutation', ids=run_ids)
 print(df.head(5))
 
 # Combine fitness values 
@@ -101,17 +95,17 @@ metrics = ['Time Elapsed', 'Final Fitness', 'Final Cost', 'Number of Iterations'
 fig, ax = plt.subplots(figsize=(10, 6))
 
 # Calculate the mean fitness values 
-random_mean_fitness = np.mean(random_fitness_values, axis=0)
-geometric_mean_fitness = np.mean(geometric_fitness_values, axis=0)
-insdel_mean_fitness = np.mean(insdel_fitness_values, axis=0)
+random_mean_fitness = np.nanmean(pad_histories(random_fitness_values), axis=0)
+geometric_mean_fitness = np.nanmean(pad_histories(geometric_fitness_values), axis=0)
+insdel_mean_fitness = np.nanmean(pad_histories(insdel_fitness_values), axis=0)
 
 # Calculate the minimum and maximum fitness values 
-random_min_fitness = np.min(random_fitness_values, axis=0)
-random_max_fitness = np.max(random_fitness_values, axis=0)
-geometric_min_fitness = np.min(geometric_fitness_values, axis=0)
-geometric_max_fitness = np.max(geometric_fitness_values, axis=0)
-insdel_min_fitness = np.min(insdel_fitness_values, axis=0)
-insdel_max_fitness = np.max(insdel_fitness_values, axis=0)
+random_min_fitness = np.nanmin(pad_histories(random_fitness_values), axis=0)
+random_max_fitness = np.nanmax(pad_histories(random_fitness_values), axis=0)
+geometric_min_fitness = np.nanmin(pad_histories(geometric_fitness_values), axis=0)
+geometric_max_fitness = np.nanmax(pad_histories(geometric_fitness_values), axis=0)
+insdel_min_fitness = np.nanmin(pad_histories(insdel_fitness_values), axis=0)
+insdel_max_fitness = np.nanmax(pad_histories(insdel_fitness_values), axis=0)
 
 # Plot the line chart and fill the range for random
 ax.plot(range(len(random_mean_fitness)), random_mean_fitness, label='Random')
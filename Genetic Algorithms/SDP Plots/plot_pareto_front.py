@@ -0,0 +1,29 @@
+import numpy as np
+import matplotlib.pyplot as plt
+
+from nsga2 import NSGA2Population
+from mutation import random_mutation
+from crossover import uniform_co
+
+# One NSGA-II run gives the trade-off that plot_penalty_size.py samples with one GA sweep per penalty
+pop = NSGA2Population(size=200, optim="min")
+pareto_front, history = pop.evolve(pop=pop,
+                                   generations=300,
+                                   crossover=uniform_co,
+                                   mutate=random_mutation,
+                                   mutation_rate=0.5,
+                                   plot=None)
+
+objectives = np.array([individual.objectives for individual in pareto_front])
+print(f"Pareto front with {len(pareto_front)} diets")
+feasible = objectives[(objectives[:, 1] == 0) & (objectives[:, 2] == 0)]
+if len(feasible):
+    print(f"Cheapest diet meeting every requirement: {feasible[:, 0].min():.2f}")
+
+fig, ax = plt.subplots(figsize=(10, 6))
+points = ax.scatter(objectives[:, 0], objectives[:, 1], c=objectives[:, 2], cmap='viridis')
+fig.colorbar(points, ax=ax, label='Total Excess')
+ax.set_xlabel('Total Cost')
+ax.set_ylabel('Total Deficit')
+ax.set_title('Cost / Nutrient Violation Pareto Front')
+plt.show()
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+
+from charles import Population, Individual
+from fitness import fitness_components, penalty_scores
+from sdp_run import get_fitness, random_initialization
+
+from selection import fps
+from mutation import random_mutation
+from crossover import multi_point_co
+
+# Penalty sensitivity on a fixed set of diets: the cost and violations are computed once and
+# scored against every penalty size in one step, instead of one GA sweep per penalty size
+penalty_sizes = [0.001, 0.1, 10, 10000, 50000, 100000, 500000]
+
+Individual.get_fitness = get_fitness
+Individual.initialize = random_initialization
+
+# Every individual of the final populations of a few runs
+diets = []
+for _ in range(10):
+    pop = Population(size=50, optim="min")
+    pop.evolve(pop=pop,
+               generations=300,
+               select=fps,
+               mutate=random_mutation,
+               mutation_rate=0.5,
+               crossover=multi_point_co,
+               elite_size=6,
+               no_improvement_threshold=1000,
+               plot=None)
+    diets.extend(individual.representation for individual in pop)
+diets = np.array(diets, dtype=float)
+
+total_cost, under, over = components = fitness_components(diets)
+scores = penalty_scores(components, under_penalties=penalty_sizes)  # diets x penalty sizes
+
+# The diet each penalty size would pick as the best one
+best = scores.argmin(axis=0)
+results = pd.DataFrame({'Penalty Size': penalty_sizes,
+                        'Final Fitness': scores[best, np.arange(len(penalty_sizes))],
+                        'Final Cost': total_cost[best],
+                        'Total Deficit': under[best].sum(axis=1),
+                        'Number of Requirements met': ((under[best] == 0) & (over[best] == 0)).sum(axis=1)})
+print(results.to_string(index=False))
+
+fig, axs = plt.subplots(ncols=2, figsize=(15, 6))
+axs[0].plot(penalty_sizes, results['Final Cost'], marker='o')
+axs[0].set_ylabel('Cost of the Best Diet')
+axs[1].plot(penalty_sizes, results['Number of Requirements met'], marker='o')
+axs[1].set_ylabel('Number of Requirements met')
+for ax in axs:
+    ax.set_xscale('log')
+    ax.set_xlabel('Penalty Size')
+plt.tight_layout()
+plt.show()
@@ -3,7 +3,11 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 
-from charles import Population, Individual
+from charles import Population
+from problem import Problem
+from results_store import ResultsStore
+from analytics import pad_histories
+from fitness import cached_components
 from sdp_data import data, min_nutrients, max_nutrients
 from sdp_run import random_initialization
 
@@ -11,13 +15,13 @@ from selection import fps
 from mutation import random_mutation
 from crossover import multi_point_co
 
-results = pd.DataFrame(columns=['Penalty Size', 'Time Elapsed', 'Final Fitness', 'Final Cost',
-                                'Number of Iterations', 'Final Quantity', 'Number of Requirements met'])
+store = ResultsStore('results.db')
+# ids of the runs of this sweep: the store also keeps the runs of earlier sweeps
+run_ids = []
+rows = []
 
 penalty_sizes = [0.001, 0.1, 10, 10000, 50000, 100000, 500000]
 
-Individual.initialize = random_initialization
-
 fitness_values = []
 
 for penalty_size in penalty_sizes:
@@ -25,48 +29,16 @@ for penalty_size in penalty_sizes:
     print("Penalty Size:", penalty_size)
 
     penalty_size_fitness_values = []  # Store fitness values for each run
-    def get_fitness(self):
-        """A fitness function that returns the
-        price of the food if it meets the requirements, otherwise the fitness gets a penalty
-        """
-        total_cost = 0
-        nutritional_values = [0] * 14  # Initialize nutritional values list with 0s
-
-        for index, quantity in enumerate(self.representation):
-            total_cost += quantity * data[index][1]  # Accessing the price of the ingredient at the given index
-            for i in range(14):
-                nutritional_values[i] +=quantity + data[index][i + 2]  # Accessing and accumulating nutritional values
-
-        # Calculate penalty for not meeting the nutritional requirements
-
-        penalty = 0
-
-        #min nutrients
-        for i in range(len(min_nutrients)):
-            if nutritional_values[i] < min_nutrients[i][1]:
-                nutrient_range = max_nutrients[i][1] - min_nutrients[i][1]
-                nutrient_penalty = (min_nutrients[i][1] - nutritional_values[i]) / nutrient_range
-                penalty += nutrient_penalty * penalty_size  # Apply a penalty for each nutrient bellow requirement
-
-        #max nutrients
-        for i in range(len(max_nutrients)):
-            if nutritional_values[i] > max_nutrients[i][1]:
-                nutrient_range = max_nutrients[i][1] - min_nutrients[i][1]
-                nutrient_penalty = (nutritional_values[i] - max_nutrients[i][1]) / nutrient_range
-                penalty += nutrient_penalty * 5  # Apply a penalty for each nutrient above requirement
-
-        return total_cost + penalty
-    
-
-    Individual.get_fitness = get_fitness
-
+    # price of the food plus the penalties, with this penalty for nutrients below the minimum
+    problem = Problem(initialize=random_initialization, under_penalty=penalty_size)
 
     for _ in range(50):
         pop = Population(size=50,
                          optim="min",
                          sol_size=len(data),
                          valid_set=range(len(data)),
-                         replacement=True)
+                         replacement=True,
+                         problem=problem)
         start_time = time()
         best_individual, fitness_history = pop.evolve(pop=pop,
                                                      generations=300,
@@ -79,24 +51,11 @@ for penalty_size in penalty_sizes:
                                                      plot=None)
         end_time = time()
 
-        # Initialize counts and metrics
-        num_requirements_met = 0
-        final_cost = 0
-        nutritional_values = [0] * 14
-
-        # Calculate nutritional values and other metrics
-        for index, quantity in enumerate(best_individual.representation):
-            for j in range(14):
-                nutritional_values[j] += data[index][j + 2] * quantity
-
-                if quantity > 0:
-                    final_cost += data[index][1] * quantity
-
-        for j, (nutrient, min_req) in enumerate(min_nutrients):
-            if min_nutrients[j][1] <= nutritional_values[j] <= max_nutrients[j][1]:
-                num_requirements_met += 1
-
-        final_fitness = best_individual.get_fitness()
+        # Metrics cached on the individual when its fitness was computed
+        cached_components(best_individual)
+        final_cost = best_individual.total_cost
+        num_requirements_met = best_individual.requirements_met
+        final_fitness = best_individual.fitness
         num_iterations = len(fitness_history)
         final_qnt_ingredients = sum(best_individual.representation)
 
@@ -109,20 +68,24 @@ for penalty_size in penalty_sizes:
                     'Final Quantity': final_qnt_ingredients,
                     'Number of Requirements met': num_requirements_met}
 
-        results = pd.concat([results, pd.DataFrame(row_data, index=[0])], ignore_index=True)
+        rows.append(row_data)
+        run_ids.append(store.append(experiment='plot_penalty_size', config=row_data['Penalty Size'],
+                                    metrics=row_data, history=fitness_history))
 
         # Save fitness values at each iteration
         penalty_size_fitness_values.append(fitness_history)
 
     fitness_values.append(penalty_size_fitness_values)
 
+results = pd.DataFrame(rows)
 print(results.head(5))
-results.to_csv('results.csv', index=False)
+# this sweep for analytics.py and comparison.py
+print(f"Runs {run_ids[0]}-{run_ids[-1]} in results.db")
 
 # Calculate the mean fitness values for each penalty size
-mean_fitness_values = [np.mean(fitness, axis=0) for fitness in fitness_values]
-min_fitness_values = [np.min(fitness, axis=0) for fitness in fitness_values]
-max_fitness_values = [np.max(fitness, axis=0) for fitness in fitness_values]
+mean_fitness_values = [np.nanmean(pad_histories(fitness), axis=0) for fitness in fitness_values]
+min_fitness_values = [np.nanmin(pad_histories(fitness), axis=0) for fitness in fitness_values]
+max_fitness_values = [np.nanmax(pad_histories(fitness), axis=0) for fitness in fitness_values]
 
 # Create a figure and an axis
 fig, ax = plt.subplots(figsize=(10, 6))
@@ -4,6 +4,9 @@ import numpy as np
 import matplotlib.pyplot as plt
 
 from charles import Population, Individual
+from results_store import ResultsStore
+from analytics import pad_histories
+from fitness import cached_components
 from sdp_data import data, min_nutrients, max_nutrients
 from sdp_run import get_fitness
 
@@ -11,8 +14,10 @@ from selection import fps
 from mutation import random_mutation
 from crossover import multi_point_co
 
-results = pd.DataFrame(columns=['Population Size', 'Time Elapsed', 'Final Fitness', 'Final Cost',
-                                'Number of Iterations', 'Final Quantity', 'Number of Requirements met'])
+store = ResultsStore('results.db')
+# ids of the runs of this sweep: the store also keeps the runs of earlier sweeps
+run_ids = []
+rows = []
 
 population_sizes = [50, 100, 150, 200, 250]
 
@@ -41,24 +46,11 @@ for pop_size in population_sizes:
                                                      plot=None)
         end_time = time()
 
-        # Initialize counts and metrics
-        num_requirements_met = 0
-        final_cost = 0
-        nutritional_values = [0] * 15
-
-        # Calculate nutritional values and other metrics
-        for index, quantity in enumerate(best_individual.representation):
-            for j in range(15):
-                nutritional_values[j] += data[index][j + 2] * quantity
-
-                if quantity > 0:
-                    final_cost += data[index][1] * quantity
-
-        for j, (nutrient, min_req) in enumerate(min_nutrients):
-            if min_nutrients[j][1] <= nutritional_values[j] <= max_nutrients[j][1]:
-                num_requirements_met += 1
-
-        final_fitness = best_individual.get_fitness()
+        # Metrics cached on the individual when its fitness was computed
+        cached_components(best_individual)
+        final_cost = best_individual.total_cost
+        num_requirements_met = best_individual.requirements_met
+        final_fitness = best_individual.fitness
         num_iterations = len(fitness_history)
         final_qnt_ingredients = sum(best_individual.representation)
 
@@ -71,20 +63,24 @@ for pop_size in population_sizes:
                     'Final Quantity': final_qnt_ingredients,
                     'Number of Requirements met': num_requirements_met}
 
-        results = pd.concat([results, pd.DataFrame(row_data, index=[0])], ignore_index=True)
+        rows.append(row_data)
+        run_ids.append(store.append(experiment='plot_pop_size', config=row_data['Population Size'],
+                                    metrics=row_data, history=fitness_history))
 
         # Save fitness values at each iteration
         pop_fitness_values.append(fitness_history)
 
     fitness_values.append(pop_fitness_values)
 
+results = pd.DataFrame(rows)
 print(results.head(5))
-results.to_csv('results.csv', index=False)
+# this sweep for analytics.py and comparison.py
+print(f"Runs {run_ids[0]}-{run_ids[-1]} in results.db")
 
 # Calculate the mean fitness values for each population size
-mean_fitness_values = [np.mean(fitness, axis=0) for fitness in fitness_values]
-min_fitness_values = [np.min(fitness, axis=0) for fitness in fitness_values]
-max_fitness_values = [np.max(fitness, axis=0) for fitness in fitness_values]
+mean_fitness_values = [np.nanmean(pad_histories(fitness), axis=0) for fitness in fitness_values]
+min_fitness_values = [np.nanmin(pad_histories(fitness), axis=0) for fitness in fitness_values]
+max_fitness_values = [np.nanmax(pad_histories(fitness), axis=0) for fitness in fitness_values]
 
 # Create a figure and an axis
 fig, ax = plt.subplots(figsize=(10, 6))
@@ -0,0 +1,57 @@
+from random import seed
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+
+from charles import Population
+from problem import Problem
+from restarts import RestartStrategy
+
+from selection import tournament_selection
+from mutation import random_mutation
+from crossover import multi_point_co
+
+# A single run that stops on stagnation against IPOP-style restarts with the same evaluation budget
+
+problem = Problem()
+budget = 30000  # fitness evaluations per run
+runs = 10
+operators = {'select': tournament_selection, 'mutate': random_mutation, 'mutation_rate': 0.5,
+             'crossover': multi_point_co, 'elite_size': 6}
+
+rows = []
+example = None
+for run_seed in range(runs):
+    seed(run_seed)
+    pop = Population(size=50, optim="min", problem=problem)
+    best_individual, fitness_history = pop.evolve(pop=pop, generations=budget // 44, no_improvement_threshold=20,
+                                                  plot=None, **operators)
+    rows.append({'Strategy': 'Single run', 'Final Fitness': best_individual.fitness,
+                 'Generations': len(fitness_history)})
+
+    seed(run_seed)
+    restarts = RestartStrategy(size=50, optim="min", problem=problem, growth=2, max_size=400,
+                               reseed_fraction=0.1, max_evaluations=budget)
+    best_individual, fitness_history = restarts.evolve(pop=None, generations=1000, no_improvement_threshold=20,
+                                                       plot=None, **operators)
+    rows.append({'Strategy': 'IPOP restarts', 'Final Fitness': best_individual.fitness,
+                 'Generations': len(fitness_history), 'Restarts': len(restarts.restarts) - 1})
+    if example is None:
+        example = (fitness_history, restarts.restarts)
+
+results = pd.DataFrame(rows)
+print(results.groupby('Strategy', sort=False).agg(['median', 'min', 'max']).to_string())
+
+# One run with restarts; the dashed lines are the restart points
+fitness_history, restart_points = example
+fig, ax = plt.subplots(figsize=(10, 6))
+ax.plot(range(len(fitness_history)), fitness_history, label='Best Fitness of the Restart')
+ax.plot(range(len(fitness_history)), np.minimum.accumulate(fitness_history), label='Best So Far')
+for point in restart_points[1:]:
+    ax.axvline(point, color='gray', linestyle='--')
+ax.set_yscale('log')
+ax.set_xlabel('Generations')
+ax.set_ylabel('Best Fitness')
+ax.set_title('IPOP Restarts')
+ax.legend()
+plt.show()
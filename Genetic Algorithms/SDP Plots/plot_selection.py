@@ -6,6 +6,9 @@ import seaborn as sns
 import csv
 
 from charles import Population, Individual
+from results_store import ResultsStore
+from analytics import pad_histories
+from fitness import cached_components
 from sdp_data import data, min_nutrients, max_nutrients
 from sdp_run import get_fitness
 
@@ -13,8 +16,10 @@ from selection import fps, ranking_selection, tournament_selection
 from mutation import insert_delete_mutation, random_mutation
 from crossover import arithmetic_co, geometric_co, single_point_co
 
-results = pd.DataFrame(columns=['Selection Method', 'Time Elapsed', 'Final Fitness', 'Final Cost',
-                                'Number of Iterations', 'Final Quantity', 'Number of Requirements met'])
+store = ResultsStore('results.db')
+# ids of the runs of this sweep: the store also keeps the runs of earlier sweeps
+run_ids = []
+rows = []
 
 selection_methods =[fps, ranking_selection, tournament_selection]
 selection_names= ['Fitness Proportion', 'Ranking', 'Selection']
@@ -46,24 +51,11 @@ for i in range(3):
                                                      plot=None)
         end_time = time()
 
-        # Initialize counts and metrics
-        num_requirements_met = 0
-        final_cost = 0
-        nutritional_values = [0] * 15
-
-        # Calculate nutritional values and other metrics
-        for index, quantity in enumerate(best_individual.representation):
-            for j in range(15):
-                nutritional_values[j] += data[index][j + 2] * quantity
-
-                if quantity > 0:
-                    final_cost += data[index][1] * quantity
-
-        for j, (nutrient, min_req) in enumerate(min_nutrients):
-            if min_nutrients[j][1] <= nutritional_values[j] <= max_nutrients[j][1]:
-                num_requirements_met += 1
-
-        final_fitness = best_individual.get_fitness()
+        # Metrics cached on the individual when its fitness was computed
+        cached_components(best_individual)
+        final_cost = best_individual.total_cost
+        num_requirements_met = best_individual.requirements_met
+        final_fitness = best_individual.fitness
         num_iterations = len(fitness_history)
         final_qnt_ingredients = sum(best_individual.representation)
 
@@ -76,7 +68,9 @@ for i in range(3):
                     'Final Quantity': final_qnt_ingredients,
                     'Number of Requirements met': num_requirements_met}
 
-        results = pd.concat([results, pd.DataFrame(row_data, index=[0])], ignore_index=True)
+        rows.append(row_data)
+        run_ids.append(store.append(experiment='plot_selection', config=row_data['Selection Method'],
+                                    metrics=row_data, history=fitness_history))
 
         # Save fitness values at each iteration
         if selection_methods[i] == fps:
@@ -86,10 +80,10 @@ for i in range(3):
         elif selection_methods[i] == tournament_selection:
             tournament_fitness_values.append(fitness_history)
 
+results = pd.DataFrame(rows)
 print(results.head(5))
-results.to_csv('results.csv', index=False)
 
-df = pd.read_csv('results.csv')
+df = store.runs(experiment='plot_selection', ids=run_ids)
 print(df.head(5))
 
 # Combine fitness values
@@ -103,17 +97,17 @@ fig, ax = plt.subplots(figsize=(10, 6))
 
 
 # Calculate the mean fitness values
-fps_mean_fitness = np.mean(fps_fitness_values, axis=0)
-ranking_mean_fitness = np.mean(ranking_fitness_values, axis=0)
-tournament_mean_fitness = np.mean(tournament_fitness_values, axis=0)
+fps_mean_fitness = np.nanmean(pad_histories(fps_fitness_values), axis=0)
+ranking_mean_fitness = np.nanmean(pad_histories(ranking_fitness_values), axis=0)
+tournament_mean_fitness = np.nanmean(pad_histories(tournament_fitness_values), axis=0)
 
 # Calculate the minimum and maximum fitness 
-fps_min_fitness = np.min(fps_fitness_values, axis=0)
-fps_max_fitness = np.max(fps_fitness_values, axis=0)
-ranking_min_fitness = np.min(ranking_fitness_values, axis=0)
-ranking_max_fitness = np.max(ranking_fitness_values, axis=0)
-tournament_min_fitness = np.min(tournament_fitness_values, axis=0)
-tournament_max_fitness = np.max(tournament_fitness_values, axis=0)
+fps_min_fitness = np.nanmin(pad_histories(fps_fitness_values), axis=0)
+fps_max_fitness = np.nanmax(pad_histories(fps_fitness_values), axis=0)
+ranking_min_fitness = np.nanmin(pad_histories(ranking_fitness_values), axis=0)
+ranking_max_fitness = np.nanmax(pad_histories(ranking_fitness_values), axis=0)
+tournament_min_fitness = np.nanmin(pad_histories(tournament_fitness_values), axis=0)
+tournament_max_fitness = np.nanmax(pad_histories(tournament_fitness_values), axis=0)
 
 # Plot the line chart and fill the range for fps
 ax.plot(range(len(fps_mean_fitness)), fps_mean_fitness, label='Fitness Proportionate')
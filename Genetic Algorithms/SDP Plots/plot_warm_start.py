@@ -0,0 +1,82 @@
+from random import seed
+from time import perf_counter
+import numpy as np
+import matplotlib.pyplot as plt
+
+import fitness as diet_tables
+from charles import Population
+from problem import Problem
+from analytics import pad_histories
+from warm_start import warm_start
+
+from selection import tournament_selection
+from mutation import random_mutation
+from crossover import multi_point_co
+
+# Re-optimisation after a price change: the two foods that cost the most in the best diet
+# become 50% more expensive. A warm start from half of the last population (re-scored for the
+# changed foods only, the other half random) with a third of the budget against a cold start,
+# on the same seeds: the generations and time the cold start needs to recover the fitness the
+# warm start begins with, and the final fitness of both.
+
+runs = 10
+generations = 300
+warm_generations = 100
+operators = {'select': tournament_selection, 'mutate': random_mutation, 'mutation_rate': 0.5,
+             'crossover': multi_point_co, 'elite_size': 6, 'no_improvement_threshold': 1000, 'plot': None}
+
+# the last runs before the change
+final_populations = []
+for run_seed in range(runs):
+    seed(run_seed)
+    pop = Population(size=50, optim="min", problem=Problem())
+    best_individual, _ = pop.evolve(pop=pop, generations=generations, **operators)
+    final_populations.append(pop)
+
+# the new spreadsheet, as the rebuilt cache would load it (a new process would find the old
+# tables in diet_tables.previous.npz)
+old = {name: values.copy() for name, values in diet_tables.tables.items()}
+most_expensive = np.argsort(np.asarray(best_individual.representation) * diet_tables.prices)[-2:]
+diet_tables.prices[most_expensive] *= 1.5
+print("Price increase: " + ", ".join(diet_tables.names[most_expensive]))
+
+histories = {'Cold start': [], 'Warm start': []}
+generation_times = []
+rescore_times = []
+for run_seed in range(runs):
+    seed(run_seed)
+    start_time = perf_counter()
+    pop = Population(size=50, optim="min", problem=Problem())
+    best_individual, fitness_history = pop.evolve(pop=pop, generations=generations, **operators)
+    histories['Cold start'].append(fitness_history)
+    generation_times.append((perf_counter() - start_time) / len(fitness_history))
+
+    seed(run_seed)
+    start_time = perf_counter()
+    pop = warm_start(final_populations[run_seed], size=50, problem=Problem(), old=old, fraction=0.5)
+    rescore_times.append(perf_counter() - start_time)
+    best_individual, fitness_history = pop.evolve(pop=pop, generations=warm_generations, **operators)
+    histories['Warm start'].append(fitness_history)
+
+print(f"Warm start population built in {np.median(rescore_times) * 1e3:.1f} ms")
+recovery = []
+for cold, warm in zip(histories['Cold start'], histories['Warm start']):
+    reached = np.flatnonzero(np.asarray(cold) <= warm[0])
+    recovery.append(reached[0] if len(reached) else np.nan)
+print(f"Cold start to the initial fitness of the warm start: {np.sum(~np.isnan(recovery))}/{runs} runs, "
+      f"median {np.nanmedian(recovery):.0f} generations ({np.nanmedian(recovery) * np.median(generation_times):.2f} s)")
+for name, fitness_values in histories.items():
+    print(f"{name}: median initial fitness {np.median([history[0] for history in fitness_values]):.1f}, "
+          f"median final fitness {np.median([history[-1] for history in fitness_values]):.1f} "
+          f"after {len(fitness_values[0])} generations")
+
+fig, ax = plt.subplots(figsize=(10, 6))
+for name, fitness_values in histories.items():
+    mean_fitness = np.nanmean(pad_histories(fitness_values), axis=0)
+    ax.plot(range(len(mean_fitness)), mean_fitness, label=name)
+ax.set_yscale('log')
+ax.set_xlabel('Generations')
+ax.set_ylabel('Mean Best Fitness')
+ax.set_title('Re-optimisation after a Price Change')
+ax.legend()
+plt.show()
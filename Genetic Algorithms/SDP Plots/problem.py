@@ -0,0 +1,113 @@
+from random import randrange
+from threading import Lock
+
+import fitness as diet_tables
+from fitness import evaluate, batch_fitness
+
+# A Problem is what a Population optimises: the data tables, the fitness of one individual,
+# the initializer, an optional batch fitness for whole matrices and a cache of computed
+# fitness values. Population(problem=...) hands it to every Individual it creates, so
+# populations with different problems can evolve side by side in one process (threads,
+# pool workers) instead of sharing the class attributes set by monkey patching.
+# The reports (utils.print_nutrition, the hall of fame) go through the problem as well:
+# components and describe, so problems with other genomes (meal_plan.MealPlanProblem) report
+# on their own terms instead of against the single-day tables.
+
+
+def random_initialization(individual):
+    '''Same distribution as sdp_run.random_initialization'''
+    return [randrange(201) for _ in range(len(diet_tables.prices))]
+
+
+class Problem:
+    def __init__(self, fitness=None, initialize=random_initialization, batch=None, under_penalty=500000,
+                 over_penalty=5, cache_size=100000, name=None):
+        '''fitness: function of an Individual (e.g. the get_fitness functions of the scripts). By default
+        fitness.evaluate with the given penalties, which also has a batch path (fitness.batch_fitness).
+        initialize: function of an Individual returning its representation.
+        batch: function of a (individuals x foods) matrix, only used with a custom fitness'''
+        self.fitness_function = fitness
+        self.initializer = initialize
+        self.batch_function = batch
+        self.under_penalty = under_penalty
+        self.over_penalty = over_penalty
+        self.cache_size = cache_size
+        self.name = name
+        self.cache = {}
+        self.lock = Lock()
+
+    @property
+    def tables(self):
+        '''The diet tables of fitness.py (names, prices, nutrients, min_values, max_values, ...)'''
+        return diet_tables.tables
+
+    @property
+    def genome_size(self):
+        '''Number of genes of a representation'''
+        return len(diet_tables.prices)
+
+    def initialize(self, individual):
+        return self.initializer(individual)
+
+    def get_fitness(self, individual):
+        '''Cached fitness of an individual. The cache is shared by every thread that uses the problem,
+        so lookups and updates hold the lock; the scoring itself runs outside it'''
+        key = tuple(individual.representation)
+        with self.lock:
+            if key in self.cache:
+                return self.cache[key]
+        value = self.score(individual)
+        with self.lock:
+            while len(self.cache) >= self.cache_size and self.cache and key not in self.cache:
+                self.cache.pop(next(iter(self.cache)))  # oldest entry first
+            self.cache[key] = value
+        return value
+
+    def score(self, individual):
+        '''Fitness of one individual, without the cache'''
+        if self.fitness_function is None:
+            return evaluate(individual, self.under_penalty, self.over_penalty)
+        return self.fitness_function(individual)
+
+    def components(self, individual):
+        '''The individual with the fitness components of the reports: total_cost, nutritional_values,
+        deficit, excess, requirements_met and num_ingredients (kept by fitness.evaluate when it scored it)'''
+        if not hasattr(individual, 'total_cost'):
+            if len(individual.representation) != self.genome_size:
+                raise ValueError(f"Problem {self.name} expects {self.genome_size} genes, "
+                                 f"got {len(individual.representation)}")
+            evaluate(individual, self.under_penalty, self.over_penalty)
+        return individual
+
+    def describe(self, individual):
+        '''Report of one individual: the single-day diet report of utils.print_diet'''
+        from utils import print_diet
+        print_diet(self.components(individual))
+
+    def archive_fitness(self, genomes):
+        '''Fitness the hall of fame ranks a matrix of genomes by: fitness.batch_fitness with the
+        default penalties, whatever penalties the run used'''
+        return batch_fitness(genomes)
+
+    def batch(self, population):
+        '''Fitness of every row of a matrix, for Population.evolve(evaluate=problem.batch)'''
+        if self.fitness_function is None:
+            return batch_fitness(population, self.under_penalty, self.over_penalty)
+        if self.batch_function is None:
+            raise ValueError(f"Problem {self.name} has a custom fitness and no batch function")
+        return self.batch_function(population)
+
+    def __getstate__(self):
+        # the tables are reloaded from diet_tables.npz by every process and the cache is rebuilt,
+        # so only the settings and the references to the functions are pickled
+        state = self.__dict__.copy()
+        state['cache'] = {}
+        del state['lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = Lock()
+
+    def __repr__(self):
+        return f"Problem({self.name or self.fitness_function or 'diet'})"
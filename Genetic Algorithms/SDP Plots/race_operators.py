@@ -0,0 +1,38 @@
+from itertools import product
+
+from charles import Individual
+from sdp_run import get_fitness, random_initialization
+from racing import race, print_trace
+
+from selection import fps, ranking_selection, tournament_selection
+from mutation import random_mutation, geometric_mutation, insert_delete_mutation
+from crossover import single_point_co, uniform_co, multi_point_co, arithmetic_co
+
+# Monkey Patching
+Individual.get_fitness = get_fitness
+Individual.initialize = random_initialization
+
+selection_methods = {'FPS': fps, 'Ranking': ranking_selection, 'Tournament': tournament_selection}
+mutation_methods = {'Random': random_mutation, 'Geometric': geometric_mutation, 'Insert-Delete': insert_delete_mutation}
+crossover_methods = {'Single Point': single_point_co, 'Uniform': uniform_co,
+                     'Multi Point': multi_point_co, 'Arithmetic': arithmetic_co}
+
+# Every operator combination races instead of getting the full 50 x 300 generations grid
+configs = {}
+for (s_name, select), (m_name, mutate), (c_name, crossover) in product(selection_methods.items(),
+                                                                      mutation_methods.items(),
+                                                                      crossover_methods.items()):
+    configs[f'{s_name} / {m_name} / {c_name}'] = {'pop_size': 50,
+                                                 'select': select,
+                                                 'mutate': mutate,
+                                                 'mutation_rate': 0.5,
+                                                 'crossover': crossover,
+                                                 'elite_size': 6}
+
+result = race(configs, min_generations=25, max_generations=300, eta=2)
+
+print_trace(result)
+
+grid_generations = len(configs) * 50 * 300
+print(f"Full grid would use {grid_generations} generations, "
+      f"the race used {result['generations_used']} ({result['generations_used'] / grid_generations:.1%})")
@@ -0,0 +1,138 @@
+from math import ceil, comb
+from random import seed as set_seed
+from time import time
+
+from charles import Population
+
+# Racing of GA configurations: successive halving over seeds and generation budgets.
+# Every round the surviving configurations are run on the same fresh seeds (blocking),
+# the ones that are statistically dominated by the round leader are dropped, then only
+# the best 1/eta by mean rank go on to the next round with eta times more generations.
+
+
+def run_config(config, run_seed, generations):
+    '''Runs one configuration on one seed and returns the best fitness found.
+    config holds the keyword arguments of Population.evolve plus an optional pop_size and problem'''
+    set_seed(run_seed)
+    params = dict(config)
+    pop = Population(size=params.pop('pop_size', 50), optim="min", problem=params.pop('problem', None))
+    params.setdefault('no_improvement_threshold', generations)
+    best_individual, _ = pop.evolve(pop=pop, generations=generations, plot=None, **params)
+    return best_individual.fitness
+
+
+def sign_test(wins, losses):
+    '''One sided exact sign test: probability of at least `wins` successes in wins + losses fair coin flips'''
+    n = wins + losses
+    if n == 0:
+        return 1.0
+    return sum(comb(n, k) for k in range(wins, n + 1)) / 2 ** n
+
+
+def mean_ranks(scores):
+    '''scores: {name: [fitness per seed]}, all lists with the same length (same seeds).
+    Ranks the configurations on each seed (1 is best, ties share the average rank) and averages them'''
+    names = list(scores)
+    n_seeds = len(scores[names[0]])
+    ranks = {name: 0 for name in names}
+    for s in range(n_seeds):
+        ordered = sorted(names, key=lambda name: scores[name][s])
+        i = 0
+        while i < len(ordered):
+            j = i
+            while j + 1 < len(ordered) and scores[ordered[j + 1]][s] == scores[ordered[i]][s]:
+                j += 1
+            for name in ordered[i:j + 1]:
+                ranks[name] += (i + j) / 2 + 1
+            i = j + 1
+    return {name: ranks[name] / n_seeds for name in names}
+
+
+def race(configs, run=run_config, min_generations=25, max_generations=300, eta=2,
+         round_budget=None, min_runs=5, alpha=0.05, first_seed=0, verbose=True):
+    '''Successive halving race between configurations.
+
+    configs: {name: config} where config is passed to run(config, seed, generations).
+    Each round gets the same budget of generations (round_budget, by default the cost of
+    running every configuration min_runs times at min_generations), so the runs freed by
+    eliminated configurations go to the remaining contenders as extra seeds.
+
+    Returns a dict with the winner, the elimination trace, every run and the generations used.'''
+    alive = list(configs)
+    if round_budget is None:
+        round_budget = len(alive) * min_runs * min_generations
+
+    trace = []
+    runs = []
+    generations = min_generations
+    next_seed = first_seed
+    used = 0
+    round_number = 0
+
+    while True:
+        round_number += 1
+        n_runs = max(min_runs, round_budget // (len(alive) * generations))
+        seeds = list(range(next_seed, next_seed + n_runs))
+        next_seed += n_runs
+
+        scores = {name: [] for name in alive}
+        for name in alive:
+            for run_seed in seeds:
+                start_time = time()
+                fitness = run(configs[name], run_seed, generations)
+                runs.append({'round': round_number, 'config': name, 'seed': run_seed,
+                             'generations': generations, 'fitness': fitness,
+                             'time': time() - start_time})
+                scores[name].append(fitness)
+                used += generations
+
+        ranks = mean_ranks(scores)
+        leader = min(alive, key=lambda name: ranks[name])
+
+        # Drop the configurations the leader beats significantly on the shared seeds
+        survivors = []
+        eliminated = {}
+        for name in alive:
+            wins = sum(l < o for l, o in zip(scores[leader], scores[name]))
+            losses = sum(l > o for l, o in zip(scores[leader], scores[name]))
+            p_value = sign_test(wins, losses)
+            if name != leader and p_value < alpha:
+                eliminated[name] = f'dominated by {leader} (sign test p={p_value:.3f})'
+            else:
+                survivors.append(name)
+
+        # Successive halving: keep only the best 1/eta of whatever is left
+        last_round = generations >= max_generations
+        keep = 1 if last_round else ceil(len(alive) / eta)
+        survivors.sort(key=lambda name: ranks[name])
+        for name in survivors[keep:]:
+            eliminated[name] = f'halving, mean rank {ranks[name]:.2f}'
+        survivors = survivors[:keep]
+
+        for name in alive:
+            trace.append({'round': round_number, 'generations': generations, 'runs': n_runs,
+                          'config': name, 'mean_fitness': sum(scores[name]) / n_runs,
+                          'mean_rank': ranks[name], 'eliminated': name in eliminated,
+                          'reason': eliminated.get(name, '')})
+
+        if verbose:
+            print(f"Round {round_number}: {generations} generations x {n_runs} seeds, "
+                  f"{len(alive)} -> {len(survivors)} configurations")
+            for name, reason in eliminated.items():
+                print(f"  dropped {name}: {reason}")
+
+        alive = survivors
+        if len(alive) == 1 or last_round:
+            break
+        generations = min(generations * eta, max_generations)
+
+    return {'best': alive[0], 'trace': trace, 'runs': runs, 'generations_used': used}
+
+
+def print_trace(result):
+    print(f"{'Round':>5} {'Gens':>5} {'Runs':>4}  {'Mean fitness':>14} {'Rank':>6}  Config")
+    for row in result['trace']:
+        status = f"  <- {row['reason']}" if row['eliminated'] else ''
+        print(f"{row['round']:>5} {row['generations']:>5} {row['runs']:>4}  "
+              f"{row['mean_fitness']:>14.2f} {row['mean_rank']:>6.2f}  {row['config']}{status}")
+    print(f"\nBest configuration: {result['best']} ({result['generations_used']} generations used)")
@@ -0,0 +1,173 @@
+import json
+import os
+import socket
+import sqlite3
+from time import time
+
+import numpy as np
+
+# Append-only results store for GA experiments, backed by SQLite.
+# One row per run: run metadata, the final metrics (as JSON) and the per-generation
+# fitness history packed as float32 bytes. WAL mode lets several worker processes
+# append to the same file at once while plots read from it.
+# The store keeps every sweep ever run, so readers pick the runs of one sweep: the ids append
+# returned, or latest_sweep.
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    experiment TEXT NOT NULL,
+    config TEXT NOT NULL,
+    seed INTEGER,
+    created REAL NOT NULL,
+    host TEXT,
+    pid INTEGER,
+    metadata TEXT,
+    metrics TEXT,
+    generations INTEGER,
+    history BLOB
+);
+CREATE INDEX IF NOT EXISTS runs_experiment_config ON runs (experiment, config);
+'''
+
+
+def pack_history(history):
+    if history is None:
+        return None, 0
+    history = np.asarray(history, dtype=np.float32)
+    return history.tobytes(), len(history)
+
+
+def unpack_history(blob):
+    if blob is None:
+        return np.empty(0, dtype=np.float32)
+    return np.frombuffer(blob, dtype=np.float32)
+
+
+class ResultsStore:
+    def __init__(self, path='results.db', timeout=60):
+        self.path = path
+        self.timeout = timeout
+        self._connection = None
+        self._pid = None
+
+    def connection(self):
+        # sqlite connections must not be shared across fork, so every process opens its own
+        if self._connection is None or self._pid != os.getpid():
+            self._connection = sqlite3.connect(self.path, timeout=self.timeout)
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute('PRAGMA synchronous=NORMAL')
+            self._connection.executescript(SCHEMA)
+            self._pid = os.getpid()
+        return self._connection
+
+    def close(self):
+        if self._connection is not None and self._pid == os.getpid():
+            self._connection.close()
+        self._connection = None
+
+    def __getstate__(self):
+        # only the path travels to worker processes
+        return {'path': self.path, 'timeout': self.timeout}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def _row(self, experiment, config, metrics, history=None, seed=None, metadata=None):
+        blob, generations = pack_history(history)
+        return (experiment, str(config), seed, time(), socket.gethostname(), os.getpid(),
+                json.dumps(metadata, default=str) if metadata is not None else None,
+                json.dumps(metrics, default=float), generations, blob)
+
+    def append(self, experiment, config, metrics, history=None, seed=None, metadata=None):
+        '''Appends one run and returns its id'''
+        with self.connection() as conn:
+            cursor = conn.execute(
+                'INSERT INTO runs (experiment, config, seed, created, host, pid, metadata, metrics, '
+                'generations, history) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                self._row(experiment, config, metrics, history, seed, metadata))
+        return cursor.lastrowid
+
+    def append_many(self, runs):
+        '''Appends a batch of runs (dicts with the arguments of append) in one transaction'''
+        with self.connection() as conn:
+            conn.executemany(
+                'INSERT INTO runs (experiment, config, seed, created, host, pid, metadata, metrics, '
+                'generations, history) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                [self._row(**run) for run in runs])
+
+    def _select(self, columns, experiment=None, config=None, ids=None):
+        query = f'SELECT {columns} FROM runs'
+        conditions, params = [], []
+        if experiment is not None:
+            conditions.append('experiment = ?')
+            params.append(experiment)
+        if config is not None:
+            configs = [str(c) for c in config] if isinstance(config, (list, tuple)) else [str(config)]
+            conditions.append(f"config IN ({', '.join('?' * len(configs))})")
+            params.extend(configs)
+        if ids is not None:
+            ids = [int(run_id) for run_id in ids]
+            conditions.append(f"id IN ({', '.join('?' * len(ids))})")
+            params.extend(ids)
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        return self.connection().execute(query + ' ORDER BY id', params).fetchall()
+
+    def latest_sweep(self, experiment):
+        '''Ids of the last sweep of an experiment: the runs written since another process last wrote
+        to it by the process (host and pid) that wrote its last run'''
+        rows = self.connection().execute('SELECT id, host, pid FROM runs WHERE experiment = ? ORDER BY id DESC',
+                                         (experiment,)).fetchall()
+        ids = []
+        for run_id, host, pid in rows:
+            if (host, pid) != rows[0][1:]:
+                break
+            ids.append(run_id)
+        return ids[::-1]
+
+    def sweep_ids(self, experiment, sweep='latest'):
+        '''Run ids for the command lines of analytics.py and comparison.py: "latest" (latest_sweep),
+        "all" (None: every run of the experiment) or a range "first-last" as the scripts print it'''
+        if sweep == 'latest':
+            return self.latest_sweep(experiment)
+        if sweep == 'all':
+            return None
+        try:
+            first, last = (int(run_id) for run_id in sweep.split('-'))
+        except ValueError:
+            raise ValueError(f"Unknown sweep {sweep!r}: latest, all or first-last") from None
+        return list(range(first, last + 1))
+
+    def configs(self, experiment=None):
+        '''Configurations stored for an experiment, in the order they were first written'''
+        query = 'SELECT config FROM runs'
+        params = ()
+        if experiment is not None:
+            query += ' WHERE experiment = ?'
+            params = (experiment,)
+        rows = self.connection().execute(query + ' GROUP BY config ORDER BY MIN(id)', params).fetchall()
+        return [config for config, in rows]
+
+    def runs(self, experiment=None, config=None, ids=None):
+        '''DataFrame with one row per run: metadata columns plus one column per metric.
+        ids: only these runs (e.g. the ids append returned for one sweep)'''
+        import pandas as pd
+
+        rows = self._select('id, experiment, config, seed, created, host, pid, metadata, metrics, generations',
+                            experiment, config, ids)
+        records = []
+        for run_id, exp, conf, seed, created, host, pid, metadata, metrics, generations in rows:
+            record = {'id': run_id, 'experiment': exp, 'config': conf, 'seed': seed, 'created': created,
+                      'host': host, 'pid': pid, 'generations': generations,
+                      'metadata': json.loads(metadata) if metadata else None}
+            record.update(json.loads(metrics))
+            records.append(record)
+        return pd.DataFrame(records)
+
+    def histories(self, experiment=None, config=None, ids=None):
+        '''{config: [float32 fitness history per run]}'''
+        histories = {}
+        for conf, blob in self._select('config, history', experiment, config, ids):
+            histories.setdefault(conf, []).append(unpack_history(blob))
+        return histories
@@ -0,0 +1,23 @@
+import json
+import os
+import socket
+from time import time
+
+# Per-generation records of running GA jobs, one JSON object per line.
+# Every write opens the file in append mode, so several processes can share one log
+# and a reader (the GA Run Monitor page of Visualization/run_app.py) can tail it
+# by remembering how many bytes it has already read.
+
+
+class RunLog:
+    def __init__(self, path='ga_runs.jsonl', run=None, **labels):
+        '''labels (e.g. config="FPS") are added to every record of this run'''
+        self.path = path
+        self.run = run if run is not None else f'{socket.gethostname()}-{os.getpid()}-{int(time() * 1000)}'
+        self.labels = labels
+
+    def write(self, generation, record):
+        line = json.dumps({'run': self.run, 'generation': generation, 'time': time(), **self.labels, **record},
+                          default=float)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
@@ -0,0 +1,228 @@
+import os
+import socket
+import sys
+import traceback
+from collections import deque
+from multiprocessing import Process
+from multiprocessing.managers import BaseManager
+from random import seed as set_seed
+from threading import Lock, Thread
+from time import time, sleep
+
+from charles import Population
+
+# Distributed run queue for sweeps: a coordinator serves (config, seed) tasks over TCP with
+# multiprocessing.managers, workers on any host that can reach it take tasks, run them and
+# send back the metrics and fitness history, and the coordinator alone writes them to the
+# results store. A task is leased to a worker; when the worker raises it is retried up to
+# max_attempts, and when the lease runs out (worker lost) it goes back to the queue.
+#
+#   coordinator: see SDP Plots/distributed_sweep.py
+#   worker:      python run_queue.py worker <host>:<port> [authkey]
+
+AUTHKEY = b'sdp'
+
+
+class TaskBoard:
+    '''The coordinator's task state. Every method runs in the manager's server threads'''
+
+    def __init__(self, tasks, lease=600, max_attempts=3):
+        self.lock = Lock()
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self.pending = deque(tasks)
+        self.leased = {}
+        self.completed = set()
+        self.results = deque()
+        self.failures = []
+
+    def _requeue(self, task, worker, error, front=False):
+        '''A task whose attempt was lost goes back to the queue, or to the failures once it has
+        had max_attempts. Called with the lock held'''
+        if task['attempts'] < self.max_attempts:
+            if front:
+                self.pending.appendleft(task)
+            else:
+                self.pending.append(task)
+        else:
+            self.completed.add(task['id'])
+            self.failures.append({'task': task, 'worker': worker, 'error': error})
+
+    def _reclaim(self, now):
+        '''Takes back the tasks whose lease ran out. Called with the lock held'''
+        for task_id, (task, deadline, worker) in list(self.leased.items()):
+            if deadline < now:
+                # lost worker: the task goes back to the front of the queue
+                del self.leased[task_id]
+                self._requeue(task, worker, f'lease of {self.lease} s expired', front=True)
+
+    def get(self, worker):
+        '''Next task for a worker, or None when nothing is left to hand out right now'''
+        with self.lock:
+            now = time()
+            self._reclaim(now)
+            if not self.pending:
+                return None
+            task = self.pending.popleft()
+            task['attempts'] += 1
+            self.leased[task['id']] = (task, now + self.lease, worker)
+            return task
+
+    def done(self, task_id, worker, metrics, history):
+        with self.lock:
+            if task_id in self.completed:
+                return  # finished twice after a lease ran out: keep the first result
+            task = self.leased.pop(task_id, (None,))[0]
+            if task is None:
+                # lease ran out and the task is queued again: take it off the queue
+                task = next((t for t in self.pending if t['id'] == task_id), None)
+                if task is None:
+                    return
+                self.pending.remove(task)
+            self.completed.add(task_id)
+            self.results.append((task, worker, metrics, history))
+
+    def fail(self, task_id, worker, error):
+        with self.lock:
+            if task_id in self.completed or task_id not in self.leased:
+                return
+            task = self.leased.pop(task_id)[0]
+            self._requeue(task, worker, error)
+
+    def finished(self):
+        with self.lock:
+            # with every worker lost, nobody calls get any more: the expired leases are taken back here
+            self._reclaim(time())
+            return not self.pending and not self.leased
+
+    def take_results(self):
+        with self.lock:
+            results = list(self.results)
+            self.results.clear()
+            return results
+
+    def status(self):
+        with self.lock:
+            return {'pending': len(self.pending), 'leased': len(self.leased),
+                    'completed': len(self.completed), 'failed': len(self.failures)}
+
+    def failed_tasks(self):
+        with self.lock:
+            return list(self.failures)
+
+
+class QueueManager(BaseManager):
+    pass
+
+
+QueueManager.register('board')
+
+
+def sweep_tasks(sweep, seeds, generations):
+    '''One task per configuration and seed. sweep: {name: config}, config as in racing.run_config'''
+    cells = [(name, seed) for seed in seeds for name in sweep]
+    return [{'id': i, 'config': name, 'params': sweep[name], 'seed': seed, 'generations': generations, 'attempts': 0}
+            for i, (name, seed) in enumerate(cells)]
+
+
+def run_task(params, run_seed, generations):
+    '''Runs one GA configuration on one seed; returns the metrics of the plot_ scripts and the fitness history'''
+    from fitness import cached_components
+
+    set_seed(run_seed)
+    params = dict(params)
+    pop = Population(size=params.pop('pop_size', 50), optim="min", problem=params.pop('problem', None))
+    params.setdefault('no_improvement_threshold', generations)
+    start_time = time()
+    best_individual, fitness_history = pop.evolve(pop=pop, generations=generations, plot=None, **params)
+    best_individual = cached_components(best_individual)
+    metrics = {'Time Elapsed': time() - start_time,
+               'Final Fitness': best_individual.fitness,
+               'Final Cost': best_individual.total_cost,
+               'Number of Iterations': len(fitness_history),
+               'Final Quantity': float(sum(best_individual.representation)),
+               'Number of Requirements met': best_individual.requirements_met}
+    return metrics, fitness_history
+
+
+class Coordinator:
+    def __init__(self, sweep, store, experiment, seeds=range(10), generations=300,
+                 address=('', 50000), authkey=AUTHKEY, lease=600, max_attempts=3):
+        self.store = store
+        self.experiment = experiment
+        self.board = TaskBoard(sweep_tasks(sweep, seeds, generations), lease, max_attempts)
+        self.address = address
+        self.authkey = authkey
+
+    def serve(self):
+        '''Starts the manager server in a background thread and returns the port it listens on'''
+        board = self.board
+
+        class CoordinatorManager(QueueManager):
+            pass
+
+        CoordinatorManager.register('board', callable=lambda: board)
+        self.server = CoordinatorManager(address=self.address, authkey=self.authkey).get_server()
+        Thread(target=self.server.serve_forever, daemon=True).start()
+        return self.server.address[1]
+
+    def collect(self):
+        results = self.board.take_results()
+        if results:
+            self.store.append_many([{'experiment': self.experiment, 'config': task['config'], 'metrics': metrics,
+                                     'history': history, 'seed': task['seed'],
+                                     'metadata': {'worker': worker, 'attempts': task['attempts']}}
+                                    for task, worker, metrics, history in results])
+        return len(results)
+
+    def run(self, poll=1.0, verbose=True):
+        '''Writes results to the store as they arrive until every task is done or failed for good'''
+        if not hasattr(self, 'server'):
+            self.serve()
+        while not self.board.finished():
+            sleep(poll)
+            if self.collect() and verbose:
+                print(self.board.status())
+        self.collect()
+        self.server.stop_event.set()
+        return {'status': self.board.status(), 'failed': self.board.failed_tasks()}
+
+
+def worker(address, authkey=AUTHKEY, run=run_task, poll=1.0, name=None):
+    '''Takes tasks from the coordinator at address until it has none left (or goes away)'''
+    import sdp_run  # monkey patches Individual with the diet fitness and initialization
+
+    name = name or f'{socket.gethostname()}-{os.getpid()}'
+    manager = QueueManager(address=address, authkey=authkey)
+    manager.connect()
+    board = manager.board()
+    try:
+        while True:
+            task = board.get(name)
+            if task is None:
+                if board.finished():
+                    break
+                sleep(poll)
+                continue
+            try:
+                metrics, history = run(task['params'], task['seed'], task['generations'])
+            except Exception:
+                board.fail(task['id'], name, traceback.format_exc())
+            else:
+                board.done(task['id'], name, metrics, [float(f) for f in history])
+    except (EOFError, ConnectionError):
+        pass  # coordinator finished and shut down
+
+
+def start_local_workers(n, port, authkey=AUTHKEY, run=run_task):
+    '''n worker processes on this machine, connecting over TCP like remote ones'''
+    workers = [Process(target=worker, args=(('localhost', port), authkey, run), daemon=True) for _ in range(n)]
+    for process in workers:
+        process.start()
+    return workers
+
+
+if __name__ == '__main__':
+    # python run_queue.py worker <host>:<port> [authkey]
+    host, port = sys.argv[2].rsplit(':', 1)
+    worker((host, int(port)), sys.argv[3].encode() if len(sys.argv) > 3 else AUTHKEY)
@@ -1,5 +1,6 @@
 import matplotlib.pyplot as plt
 from sdp_data import min_nutrients, data
+from fitness import cached_components
 
 def plot_c(fitness_history_ga):
     plt.plot(fitness_history_ga)
@@ -9,27 +10,30 @@ def plot_c(fitness_history_ga):
     plt.show()
 
 def print_nutrition(individual):
-    print('Fitness:', individual.get_fitness())
-    total_cost = 0
-    nutritional_values = [0] * 14  # Initialize nutritional values list with 0s
-    ingredients = []
-    requirements_met = 0
-
-    for index, quantity in enumerate(individual.representation):
-        if quantity > 0:
-            ingredients.append([data[index][0], quantity])  # Accessing the name of the ingredient at the given index
-            total_cost += data[index][1] * quantity  # Accessing the price of the ingredient at the given index
-            for i in range(14):
-                nutritional_values[i] += data[index][i + 2] * quantity  # Accessing and accumulating nutritional values
+    # an individual with a problem is reported by it (a meal plan per period and day)
+    problem = getattr(individual, 'problem', None)
+    if problem is not None:
+        problem.describe(individual)
+    else:
+        print_diet(individual)
+
+
+def print_diet(individual):
+    # cost and nutrient totals were kept on the individual when its fitness was computed
+    cached_components(individual)
+    print('Fitness:', individual.fitness)
+    total_cost = individual.total_cost
+    nutritional_values = individual.nutritional_values
+    ingredients = [[data[index][0], quantity] for index, quantity in enumerate(individual.representation) if quantity > 0]
+    # nutrients between minimum and maximum, counted as in the fitness components
+    requirements_met = individual.requirements_met
 
     print(f"Total cost: {total_cost}")
-    print(f"Number of ingredients chosen: {len(ingredients)}\n")
+    print(f"Number of ingredients chosen: {individual.num_ingredients}\n")
 
 
     for i, (nutrient, min_req) in enumerate(min_nutrients):
         nutrient_percentage = (nutritional_values[i] / min_req) * 100
-        if min_nutrients[i][1] <= nutritional_values[i]:
-            requirements_met += 1
         print(f"{nutrient}: {nutritional_values[i]:.2f} ({min_req}) - {nutrient_percentage:.2f}% of minimum requirement met")
 
     requirements_unmet = len(min_nutrients) - requirements_met
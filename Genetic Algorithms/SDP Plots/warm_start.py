@@ -0,0 +1,141 @@
+import numpy as np
+
+import fitness as diet_tables
+from charles import Population
+
+# Warm-start re-optimisation after prices or nutrient data change. When the tables are rebuilt
+# (fitness.load_tables) the old ones are kept in diet_tables.previous.npz. diff_tables finds the
+# foods whose price or nutrients moved (and foods added or removed, matched by name), and
+# rescore updates the fitness of the previous final population or hall of fame from the totals
+# they already carry: only the changed foods' columns are multiplied, O(P x changed foods)
+# instead of O(P x 58). warm_start then builds a population from the best re-scored diets,
+# to be evolved with a smaller budget than a cold start.
+
+
+def load_previous():
+    '''Tables replaced by the last rebuild of the cache, None when there are none'''
+    try:
+        with np.load(diet_tables.PREVIOUS_PATH) as cached:
+            return {name: cached[name] for name in cached.files}
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def diff_tables(old, new=None):
+    '''What changed between two sets of tables (new: the current ones by default).
+    Food indices are positions in the new tables; mapping gives the old position of every new
+    food (-1 for added foods)'''
+    new = diet_tables.tables if new is None else new
+    if not np.array_equal(old['nutrient_names'], new['nutrient_names']):
+        raise ValueError("The nutrients changed; warm start needs the same nutrients in both tables")
+    old_position = {str(name): i for i, name in enumerate(old['names'])}
+    mapping = np.array([old_position.get(str(name), -1) for name in new['names']])
+    kept = np.flatnonzero(mapping >= 0)
+    new_names = set(str(name) for name in new['names'])
+    return {'mapping': mapping,
+            'added': np.flatnonzero(mapping < 0),
+            'removed': np.array([i for i, name in enumerate(old['names']) if str(name) not in new_names], dtype=int),
+            'prices': kept[old['prices'][mapping[kept]] != new['prices'][kept]],
+            'nutrients': kept[np.any(old['nutrients'][mapping[kept]] != new['nutrients'][kept], axis=1)],
+            'bounds': np.flatnonzero((old['min_values'] != new['min_values'])
+                                     | (old['max_values'] != new['max_values']))}
+
+
+def remap(representations, changes):
+    '''Genomes in the old food order to the new one; added foods get quantity 0'''
+    representations = np.asarray(representations, dtype=float)
+    if np.array_equal(changes['mapping'], np.arange(representations.shape[1])):
+        return representations
+    remapped = np.zeros((len(representations), len(changes['mapping'])))
+    kept = changes['mapping'] >= 0
+    remapped[:, kept] = representations[:, changes['mapping'][kept]]
+    return remapped
+
+
+def rescore(representations, old, new=None, changes=None, total_cost=None, nutritional_values=None,
+            under_penalty=500000, over_penalty=5):
+    '''Fitness under the new tables of genomes scored under the old ones, the same value as
+    fitness.batch_fitness with the new tables. total_cost and nutritional_values are the old
+    components of every genome (e.g. kept by fitness.evaluate or the hall of fame); without them
+    they are computed with the old tables first.
+    Returns the genomes in the new food order, their fitness, total cost and nutrient totals'''
+    new = diet_tables.tables if new is None else new
+    changes = diff_tables(old, new) if changes is None else changes
+    representations = np.asarray(representations, dtype=float)
+    if total_cost is None or nutritional_values is None:
+        total_cost = representations @ old['prices']
+        nutritional_values = representations @ old['nutrients']
+    total_cost = np.array(total_cost, dtype=float)
+    nutritional_values = np.array(nutritional_values, dtype=float)
+
+    # removed foods take their old contribution with them
+    removed = changes['removed']
+    if len(removed):
+        total_cost -= representations[:, removed] @ old['prices'][removed]
+        nutritional_values -= representations[:, removed] @ old['nutrients'][removed]
+
+    remapped = remap(representations, changes)
+    moved = changes['prices']
+    if len(moved):
+        total_cost += remapped[:, moved] @ (new['prices'][moved] - old['prices'][changes['mapping'][moved]])
+    moved = changes['nutrients']
+    if len(moved):
+        nutritional_values += remapped[:, moved] @ (new['nutrients'][moved] - old['nutrients'][changes['mapping'][moved]])
+
+    nutrient_range = new['max_values'] - new['min_values']
+    under = np.maximum(new['min_values'] - nutritional_values, 0) / nutrient_range
+    over = np.maximum(nutritional_values - new['max_values'], 0) / nutrient_range
+    fitness = total_cost + under.sum(axis=1) * under_penalty + over.sum(axis=1) * over_penalty
+    return remapped, fitness, total_cost, nutritional_values
+
+
+def previous_components(previous, foods=None):
+    '''Genomes and old fitness components of a population, a list of individuals or a
+    hall_of_fame.HallOfFame; the components are None when not every individual kept them.
+    foods: number of foods of the old tables; archived genomes of another size (meal plans) are left out'''
+    if hasattr(previous, 'entries'):
+        entries = [entry for entry in previous.entries()
+                   if foods is None or len(entry['representation']) == foods]
+        return ([entry['representation'] for entry in entries], [entry['total_cost'] for entry in entries],
+                [entry['nutritional_values'] for entry in entries])
+    individuals = list(previous)
+    representations = [individual.representation for individual in individuals]
+    if all(hasattr(individual, 'nutritional_values') for individual in individuals):
+        return (representations, [individual.total_cost for individual in individuals],
+                [individual.nutritional_values for individual in individuals])
+    return representations, None, None
+
+
+def warm_start(previous, size, optim="min", problem=None, old=None, new=None, fraction=1.0, **kwargs):
+    '''Population of `size` for the new tables, starting from the best distinct diets of `previous`
+    (the final population of a single-day run, its individuals or a HallOfFame) re-scored with rescore.
+    old: the tables previous was scored with (by default diet_tables.previous.npz).
+    fraction: share of the population taken from previous; the rest is initialized as usual, which
+    gives back diversity to a converged population.
+    A problem with its own fitness function is evaluated as usual instead of re-scored.
+    kwargs go to Population (e.g. archive); the changes found are kept in population.changes'''
+    old = load_previous() if old is None else old
+    new = diet_tables.tables if new is None else new
+    if old is None:
+        # nothing to diff against: the tables did not change since the cache was first built
+        old = new
+    representations, total_cost, nutritional_values = previous_components(previous, len(old['names']))
+    changes = diff_tables(old, new)
+
+    under_penalty = problem.under_penalty if problem is not None else 500000
+    over_penalty = problem.over_penalty if problem is not None else 5
+    remapped, fitness, _, _ = rescore(representations, old, new, changes, total_cost, nutritional_values,
+                                      under_penalty, over_penalty)
+    # the same diet only once, best first
+    _, first = np.unique(remapped, axis=0, return_index=True)
+    first = np.sort(first)
+    best = first[np.argsort(fitness[first], kind='stable')][:int(size * fraction)]
+    initial = remapped[best]
+    # back to the genome type of sdp_run.random_initialization when the values are whole
+    if np.all(initial == np.round(initial)):
+        initial = initial.astype(int)
+    custom = problem is not None and problem.fitness_function is not None
+    population = Population(size=size, optim=optim, initial=initial, problem=problem,
+                            initial_fitness=None if custom else fitness[best].tolist(), **kwargs)
+    population.changes = changes
+    return population
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The modules import each other by name from their folder: the algorithm first, then the
+# modules only the plot scripts have (analytics, results_store, comparison)
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for folder in ('SDP Plots', 'SDP Algorithm'):
+    sys.path.insert(0, os.path.join(root, folder))
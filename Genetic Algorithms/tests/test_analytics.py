@@ -0,0 +1,13 @@
+import numpy as np
+
+from analytics import bands, pad_histories
+
+
+def test_empty_history_is_left_out_of_the_bands():
+    padded = pad_histories([[3, 2, 1], [], [5, 4]])
+    assert np.isnan(padded[1]).all()
+    summary = bands(padded)
+    np.testing.assert_allclose(summary['mean'], [4, 3, 2.5])
+    np.testing.assert_allclose(summary['min'], [3, 2, 1])
+    np.testing.assert_allclose(summary['max'], [5, 4, 4])
+    np.testing.assert_allclose(summary[0.5], [4, 3, 2.5])
@@ -0,0 +1,30 @@
+import pytest
+
+from async_population import AsyncPopulation, genome_fitness
+
+
+class Flaky:
+    '''Raises on every `every`-th call'''
+
+    def __init__(self, every):
+        self.every = every
+        self.calls = 0
+
+    def __call__(self, genome):
+        self.calls += 1
+        if self.calls % self.every == 0:
+            raise RuntimeError('service down')
+        return genome_fitness(genome)
+
+
+def test_failed_initial_evaluations_are_redrawn():
+    with AsyncPopulation(size=20, optim="min", evaluator=Flaky(every=4), workers=1) as pop:
+        assert len(pop.individuals) == 20
+        assert pop.initial_failed > 0
+
+
+def test_initial_population_gives_up_and_shuts_its_executor_down():
+    pop = AsyncPopulation.__new__(AsyncPopulation)
+    with pytest.raises(RuntimeError):
+        AsyncPopulation.__init__(pop, size=5, optim="min", evaluator=Flaky(every=1), workers=2)
+    assert pop.executor._shutdown
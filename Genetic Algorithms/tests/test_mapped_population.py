@@ -0,0 +1,17 @@
+import numpy as np
+
+from mapped_population import MappedPopulation
+
+
+def test_breed_pairs_parents_at_random(tmp_path):
+    # every gene of a genome holds its index and every fitness is equal, so the tournaments
+    # pick uniformly and an offspring's genes show the indices of both of its parents
+    size, genes = 1000, 32
+    initial = np.repeat(np.arange(size)[:, None], genes, axis=1)
+    pop = MappedPopulation(size=size, optim="min", directory=str(tmp_path), sol_size=genes, high=size,
+                           seed=0, fitness=lambda genomes: np.zeros(len(genomes)), initial=initial)
+    pop.breed(0, size, mutation_rate=0)
+    offspring = pop.genomes[1].astype(int)
+    gap = offspring.max(axis=1) - offspring.min(axis=1)
+    # random pairing: mean gap about size / 3; pairing by rank would keep it near 0
+    assert gap.mean() > size / 5
@@ -0,0 +1,24 @@
+from random import seed
+
+import pytest
+
+from charles import Individual, Population
+from fitness import cached_components
+from hall_of_fame import HallOfFame
+from meal_plan import MealPlanProblem
+
+
+def test_meal_plans_report_and_archive_through_their_problem(tmp_path):
+    seed(0)
+    problem = MealPlanProblem(days=7, max_consecutive=3)
+    best = min(Population(size=10, optim="min", problem=problem), key=lambda individual: individual.fitness)
+    cached_components(best)
+    assert best.nutritional_values.shape == (1, 14)
+
+    archive = HallOfFame(str(tmp_path / 'hall_of_fame.db'))
+    archive.add(best)
+    assert archive.seeds(5) == []
+    assert archive.seeds(5, problem) == [best.representation]
+
+    with pytest.raises(ValueError):
+        cached_components(Individual(representation=best.representation, fitness=0.0))
@@ -0,0 +1,32 @@
+from random import seed
+
+import pytest
+
+from crossover import uniform_co
+from fitness import evaluate
+from mutation import random_mutation
+from problem import Problem
+from restarts import RestartStrategy
+from selection import tournament_selection
+
+
+class CountingFitness:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, individual):
+        self.calls += 1
+        return evaluate(individual)
+
+
+@pytest.mark.parametrize('generations, elite_size', [(5, 2), (5, 3), (1000, 2)])
+def test_restarts_stay_within_the_evaluation_budget(generations, elite_size):
+    seed(0)
+    fitness = CountingFitness()
+    # no cache: every offspring is scored, so the calls are the evaluations spent
+    strategy = RestartStrategy(size=20, optim="min", problem=Problem(fitness=fitness, cache_size=0), growth=2,
+                               max_evaluations=500)
+    strategy.evolve(pop=None, generations=generations, select=tournament_selection, mutate=random_mutation,
+                    mutation_rate=0.5, crossover=uniform_co, elite_size=elite_size, no_improvement_threshold=3,
+                    plot=None)
+    assert fitness.calls <= strategy.evaluations <= 500
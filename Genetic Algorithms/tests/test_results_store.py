@@ -0,0 +1,27 @@
+from multiprocessing import Process
+
+from analytics import load_histories
+from results_store import ResultsStore
+
+
+def earlier_sweep(path):
+    store = ResultsStore(path)
+    for config in ('a', 'b'):
+        store.append('sweep', config, {'Final Fitness': 1.0}, history=[3, 2, 1])
+
+
+def test_readers_see_only_one_sweep(tmp_path):
+    path = str(tmp_path / 'results.db')
+    process = Process(target=earlier_sweep, args=(path,))
+    process.start()
+    process.join()
+
+    store = ResultsStore(path)
+    run_ids = [store.append('sweep', config, {'Final Fitness': 2.0}, history=[5, 4]) for config in ('a', 'b')]
+    assert store.latest_sweep('sweep') == run_ids
+    assert store.sweep_ids('sweep', f'{run_ids[0]}-{run_ids[-1]}') == run_ids
+    assert store.sweep_ids('sweep', 'all') is None
+    assert list(store.runs('sweep', ids=run_ids)['Final Fitness']) == [2.0, 2.0]
+    assert len(store.runs('sweep')) == 4
+    assert {name: padded.shape for name, padded in load_histories(store, 'sweep', ids=run_ids).items()} == \
+        {'a': (1, 2), 'b': (1, 2)}
@@ -25,6 +25,7 @@ from scipy.stats import zscore
 
 import json
 import os
+import time
 
 # Named colors for color dropdown
 NAMED_COLORS = [
@@ -64,6 +65,84 @@ def save_presets(presets):
 if 'presets' not in st.session_state:
     st.session_state['presets'] = load_presets()
 
+###########################################
+# 0) Page Selection / GA Run Monitor
+###########################################
+page = st.sidebar.radio("Page", ["Interactive Plotting", "GA Run Monitor"])
+
+def tail_run_log(path):
+    """
+    Returns every record of a JSON-lines run log (written by run_log.RunLog
+    while GA jobs are running), reading only the bytes appended since the
+    last refresh. A half-written last line is kept until it is complete.
+    """
+    logs = st.session_state.setdefault('run_logs', {})
+    log = logs.get(path)
+    size = os.path.getsize(path)
+    if log is None or size < log['offset']:
+        # first read, or the log was truncated / replaced
+        log = {'offset': 0, 'partial': b'', 'records': []}
+        logs[path] = log
+    if size > log['offset']:
+        with open(path, 'rb') as f:
+            f.seek(log['offset'])
+            chunk = f.read(size - log['offset'])
+        log['offset'] += len(chunk)
+        lines = (log['partial'] + chunk).split(b'\n')
+        log['partial'] = lines.pop()
+        for line in lines:
+            if line.strip():
+                log['records'].append(json.loads(line))
+    return log['records']
+
+if page == "GA Run Monitor":
+    st.title("GA Run Monitor")
+    st.write("""
+Follow running GA jobs without stopping them. Pass `log=RunLog('ga_runs.jsonl')`
+to `Population.evolve` and point this page at the same file.
+""")
+    log_path = st.text_input("Run log (JSON lines)", "ga_runs.jsonl")
+    auto_refresh = st.checkbox("Auto refresh", value=True)
+    refresh_seconds = st.number_input("Refresh every (seconds)", min_value=1, max_value=60, value=2)
+
+    if not os.path.exists(log_path):
+        st.info(f"No run log at '{log_path}' yet.")
+    else:
+        records = tail_run_log(log_path)
+        if records:
+            runs_df = pd.DataFrame(records)
+            run_ids = list(dict.fromkeys(runs_df['run']))
+            max_runs = st.slider("Show the last N runs", 1, max(1, len(run_ids)), min(10, len(run_ids)))
+            shown = runs_df[runs_df['run'].isin(run_ids[-max_runs:])]
+            st.write(f"{len(records)} generations from {len(run_ids)} runs "
+                     f"({st.session_state['run_logs'][log_path]['offset']} bytes read)")
+
+            fig, axs = plt.subplots(ncols=2, figsize=(14, 5))
+            for run_id, run in shown.groupby('run', sort=False):
+                line, = axs[0].plot(run['generation'], run['best'], label=f"{run_id} best")
+                if 'mean' in run:
+                    axs[0].plot(run['generation'], run['mean'], linestyle='--', color=line.get_color())
+                if 'diversity' in run and run['diversity'].notna().any():
+                    axs[1].plot(run['generation'], run['diversity'], color=line.get_color(), label=run_id)
+            axs[0].set_yscale('log')
+            axs[0].set_xlabel('Generation')
+            axs[0].set_ylabel('Fitness (best solid, mean dashed)')
+            axs[1].set_xlabel('Generation')
+            axs[1].set_ylabel('Diversity (mean L1 distance)')
+            if len(shown['run'].unique()) <= 10:
+                axs[0].legend(fontsize=8)
+            st.pyplot(fig)
+
+            last = shown.groupby('run', sort=False).tail(1)
+            st.dataframe(last.set_index('run'))
+        else:
+            st.info("The run log is empty so far.")
+
+    if auto_refresh:
+        time.sleep(refresh_seconds)
+        (st.rerun if hasattr(st, 'rerun') else st.experimental_rerun)()
+    st.stop()
+
 ###########################################
 # 1) Title and Intro
 ###########################################